@@ -14,11 +14,10 @@ from accounts.forms import ProfileUpdateForm, StudentProfileImageForm
 from assignments.models import Assignment, AssignmentSubmission
 from examsection.models import ExamProfile
 from timetable.models import TimetableEntry
-from django.db.models import Q
-from attendance.models import AttendanceRecord, AttendanceSession
+from attendance.models import AttendanceSession, AttendanceTally
 from .models import Department, StudentProfile, FacultyProfile, OTPVerification
 from django.contrib import messages
-from notifications.models import Notification, NotificationRecipient
+from notifications.services import get_inbox_page
 User = get_user_model()
 
 def home_view(request):
@@ -348,11 +347,7 @@ def faculty_dashboard_view(request):
 
     active_assignments_count = active_assignments.count()
 
-    notifications = Notification.objects.filter(
-        Q(is_global=True) |
-        Q(target_role="FACULTY") |
-        Q(course_offering__in=offerings)
-    ).order_by("-created_at")[:5]
+    notifications, _ = get_inbox_page(request.user, size=5)
 
     context = {
         "courses_count": courses_count,
@@ -436,18 +431,19 @@ def student_dashboard_view(request):
     # ------------------------------------------------
     # Attendance Summary
     # ------------------------------------------------
-    attendance_records = AttendanceRecord.objects.filter(
-        student=user,
-        session__course_offering__in=offerings
-    ).select_related(
-        "session__course_offering__course"
-    )
+    tallies = {
+        tally.offering_id: tally
+        for tally in AttendanceTally.objects.filter(
+            student=user,
+            offering__in=offerings
+        )
+    }
 
-    total_classes = attendance_records.count()
+    total_classes = sum(
+        tally.attended + tally.absent for tally in tallies.values()
+    )
 
-    present_count = attendance_records.filter(
-        status=AttendanceRecord.STATUS_PRESENT
-    ).count()
+    present_count = sum(tally.present for tally in tallies.values())
 
     overall_percentage = 0
     if total_classes > 0:
@@ -471,14 +467,10 @@ def student_dashboard_view(request):
     subject_attendance = []
 
     for offering in offerings:
-        records = attendance_records.filter(
-            session__course_offering=offering
-        )
+        tally = tallies.get(offering.id)
 
-        total = records.count()
-        present = records.filter(
-            status=AttendanceRecord.STATUS_PRESENT
-        ).count()
+        total = tally.attended + tally.absent if tally else 0
+        present = tally.present if tally else 0
 
         percentage = 0
         if total > 0:
@@ -522,11 +514,7 @@ def student_dashboard_view(request):
     # ------------------------------------------------
     # Notifications
     # ------------------------------------------------
-    notifications = Notification.objects.filter(
-        Q(is_global=True) |
-        Q(target_role="STUDENT") |
-        Q(course_offering__in=offerings)
-    ).order_by("-created_at")[:5]
+    notifications, _ = get_inbox_page(request.user, size=5)
 
     context = {
         "overall_percentage": overall_percentage,
@@ -3,6 +3,8 @@ from .models import (
     AttendanceSession,
     AttendanceRecord,
     AttendanceEditLog,
+    AttendanceRollup,
+    AttendanceTally,
     AttendanceWindowConfig
 )
 @admin.register(AttendanceSession)
@@ -91,3 +93,44 @@ class AttendanceWindowConfigAdmin(admin.ModelAdmin):
         if obj.active:
             AttendanceWindowConfig.objects.exclude(pk=obj.pk).update(active=False)
         super().save_model(request, obj, form, change)
+@admin.register(AttendanceTally)
+class AttendanceTallyAdmin(admin.ModelAdmin):
+    list_display = (
+        "student",
+        "offering",
+        "present",
+        "late",
+        "excused",
+        "absent",
+        "total_sessions",
+    )
+
+    list_filter = ("offering",)
+
+    search_fields = ("student__username",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+@admin.register(AttendanceRollup)
+class AttendanceRollupAdmin(admin.ModelAdmin):
+    list_display = (
+        "offering",
+        "period",
+        "period_start",
+        "sessions",
+        "present",
+        "late",
+        "excused",
+        "absent",
+    )
+
+    list_filter = ("period", "offering")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,193 @@
+import time
+from datetime import date, time as clock, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import Department
+from academics.models import AcademicYear, Course, CourseOffering, Enrollment, Semester
+from attendance.models import AttendanceRecord, AttendanceSession
+from attendance import rollups, services
+
+User = get_user_model()
+
+STATUS_CYCLE = (
+    AttendanceRecord.STATUS_PRESENT,
+    AttendanceRecord.STATUS_PRESENT,
+    AttendanceRecord.STATUS_PRESENT,
+    AttendanceRecord.STATUS_LATE,
+    AttendanceRecord.STATUS_ABSENT,
+    AttendanceRecord.STATUS_EXCUSED,
+    AttendanceRecord.STATUS_PRESENT,
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway attendance dataset, run the attendance service "
+        "functions against it and report timings, query counts and query plans. "
+        "Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=120)
+        parser.add_argument("--offerings", type=int, default=6)
+        parser.add_argument("--sessions", type=int, default=40, help="Sessions per offering.")
+        parser.add_argument("--output", help="Also write the report to this file.")
+        parser.add_argument("--no-plans", action="store_true", help="Skip EXPLAIN output.")
+
+    def handle(self, *args, **options):
+        self.lines = []
+
+        try:
+            with transaction.atomic():
+                data = self.seed(options)
+                self.run_benchmarks(data, explain=not options["no_plans"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        report = "\n".join(self.lines)
+        self.stdout.write(report)
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(report + "\n")
+
+    def log(self, line=""):
+        self.lines.append(line)
+
+    def seed(self, options):
+        started = time.perf_counter()
+
+        department = Department.objects.create(name="BENCH")
+        academic_year = AcademicYear.objects.create(start_year=1990, end_year=1991)
+        semester = Semester.objects.create(academic_year=academic_year, year=1, semester=1)
+        faculty = User.objects.create(username="bench_fac", email="bench_fac@bench.local", role="FACULTY")
+
+        students = User.objects.bulk_create([
+            User(
+                username=f"bench{i:05d}",
+                email=f"bench{i:05d}@bench.local",
+                role="STUDENT"
+            )
+            for i in range(options["students"])
+        ])
+
+        offerings = []
+        for i in range(options["offerings"]):
+            course = Course.objects.create(
+                course_code=f"BN{i:03d}",
+                course_title=f"Benchmark {i}",
+                credits=3,
+                category="PCC",
+                department=department
+            )
+            offerings.append(CourseOffering.objects.create(
+                course=course,
+                academic_year=academic_year,
+                semester=semester,
+                department=department,
+                year=1,
+                section="A"
+            ))
+
+        Enrollment.objects.bulk_create([
+            Enrollment(student=student, offering=offering)
+            for offering in offerings
+            for student in students
+        ])
+
+        first_day = date.today() - timedelta(days=options["sessions"])
+        sessions = AttendanceSession.objects.bulk_create([
+            AttendanceSession(
+                course_offering=offering,
+                faculty=faculty,
+                date=first_day + timedelta(days=day),
+                start_time=clock(9),
+                end_time=clock(10)
+            )
+            for offering in offerings
+            for day in range(options["sessions"])
+        ])
+
+        AttendanceRecord.objects.bulk_create(
+            [
+                AttendanceRecord(
+                    session=session,
+                    student=student,
+                    status=STATUS_CYCLE[(s + n) % len(STATUS_CYCLE)]
+                )
+                for s, session in enumerate(sessions)
+                for n, student in enumerate(students)
+            ],
+            batch_size=5000
+        )
+
+        services.rebuild_attendance_tallies(offerings)
+        rollups.rebuild_attendance_rollups(offerings)
+
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("ANALYZE")
+
+        self.log(
+            f"Seeded {len(students)} students x {len(offerings)} offerings x "
+            f"{options['sessions']} sessions in {time.perf_counter() - started:.2f}s"
+        )
+        self.log()
+
+        return {"students": students, "offerings": offerings, "faculty": faculty}
+
+    def run_benchmarks(self, data, explain):
+        student = data["students"][0]
+        offering = data["offerings"][0]
+
+        cases = [
+            ("get_student_attendance_summary", lambda: services.get_student_attendance_summary(student)),
+            ("get_students_below_threshold", lambda: services.get_students_below_threshold(offering)),
+            ("get_course_attendance_stats", lambda: services.get_course_attendance_stats(offering, student)),
+            ("get_attendance_trend(week)", lambda: rollups.get_attendance_trend(offering, "week")),
+            ("iter_attendance_matrix", lambda: list(services.iter_attendance_matrix(
+                CourseOffering.objects.filter(id__in=[o.id for o in data["offerings"]])
+            ))),
+            ("find_tally_drift(offering)", lambda: services.find_tally_drift(
+                CourseOffering.objects.filter(id=offering.id)
+            )),
+            ("auto_lock_expired_sessions", lambda: services.auto_lock_expired_sessions()),
+        ]
+
+        for name, func in cases:
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                func()
+                elapsed = time.perf_counter() - started
+
+            self.log(f"== {name}: {elapsed * 1000:.1f} ms, {len(ctx.captured_queries)} queries")
+
+            if explain:
+                for query in ctx.captured_queries:
+                    self.log_plan(query["sql"])
+            self.log()
+
+    def log_plan(self, sql):
+        # Plain EXPLAIN does not execute the statement, so writes are safe too
+        if not sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            return
+
+        self.log(f"   {sql[:200]}{'...' if len(sql) > 200 else ''}")
+
+        prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(prefix + sql)
+                for row in cursor.fetchall():
+                    self.log("     | " + " ".join(str(col) for col in row))
+        except Exception as exc:
+            self.log(f"     | plan unavailable: {exc}")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from attendance.services import auto_lock_expired_sessions
+
+
+class Command(BaseCommand):
+    help = "Lock every open attendance session whose edit window has expired."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lock-without-window",
+            action="store_true",
+            help="Lock every open session when no attendance window config is active.",
+        )
+
+    def handle(self, *args, **options):
+        locked = auto_lock_expired_sessions(
+            lock_without_window=options["lock_without_window"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Locked {locked} attendance session(s)."))
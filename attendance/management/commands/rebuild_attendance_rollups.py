@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from academics.models import CourseOffering
+from attendance.rollups import rebuild_attendance_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily/weekly AttendanceRollup rows from attendance records."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--offering",
+            type=int,
+            action="append",
+            dest="offerings",
+            help="Limit to a course offering id (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        offerings = None
+        if options["offerings"]:
+            offerings = CourseOffering.objects.filter(id__in=options["offerings"])
+
+        written = rebuild_attendance_rollups(offerings)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} attendance rollup row(s)."))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from academics.models import CourseOffering
+from attendance.services import find_tally_drift, rebuild_attendance_tallies
+
+
+class Command(BaseCommand):
+    help = "Rebuild AttendanceTally counters from attendance records, or check them for drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--offering",
+            type=int,
+            action="append",
+            dest="offerings",
+            help="Limit to a course offering id (repeatable).",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drift, do not write anything.",
+        )
+
+    def handle(self, *args, **options):
+        offerings = None
+        if options["offerings"]:
+            offerings = CourseOffering.objects.filter(id__in=options["offerings"])
+
+        if options["check"]:
+            drift = find_tally_drift(offerings)
+
+            for student_id, offering_id, expected, stored in drift:
+                self.stdout.write(
+                    f"student={student_id} offering={offering_id} "
+                    f"expected={expected} stored={stored}"
+                )
+
+            if drift:
+                self.stdout.write(self.style.WARNING(f"{len(drift)} tally row(s) drifted."))
+            else:
+                self.stdout.write(self.style.SUCCESS("Attendance tallies are in sync."))
+            return
+
+        written = rebuild_attendance_tallies(offerings)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} attendance tally row(s)."))
@@ -0,0 +1,19 @@
+from attendance.models import _window_snapshot
+
+
+class AttendanceWindowSnapshotMiddleware:
+    """
+    Pins the active AttendanceWindowConfig for the duration of a request,
+    so every editability check in it sees the same window and the
+    config is fetched at most once.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _window_snapshot.set({})
+        try:
+            return self.get_response(request)
+        finally:
+            _window_snapshot.reset(token)
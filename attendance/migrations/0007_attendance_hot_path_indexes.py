@@ -0,0 +1,32 @@
+# Generated by Django 5.2.11 on 2026-10-18 12:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0004_alter_academicyear_id_alter_course_id_and_more'),
+        ('attendance', '0006_attendancerollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['student', 'status'], name='att_record_student_status'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['session', 'status'], name='att_record_session_status'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(fields=['course_offering', 'status', 'date'], name='att_session_offering_status'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(condition=models.Q(('status', 'open')), fields=['date', 'end_time'], name='att_session_open_end'),
+        ),
+    ]
@@ -1,9 +1,16 @@
+import time
+from contextvars import ContextVar
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from datetime import datetime, timedelta
 
 User = settings.AUTH_USER_MODEL
+
+# Active AttendanceWindowConfig pinned for the current request,
+# see attendance.middleware.AttendanceWindowSnapshotMiddleware
+_window_snapshot = ContextVar("attendance_window_snapshot", default=None)
+
 class AttendanceSession(models.Model):
     """
     Represents ONE class block (theory or lab).
@@ -49,6 +56,18 @@ class AttendanceSession(models.Model):
             "start_time",
         )
         ordering = ["-date", "-start_time"]
+        indexes = [
+            models.Index(
+                fields=["course_offering", "status", "date"],
+                name="att_session_offering_status"
+            ),
+            # Only open sessions are ever scanned by the auto-lock job
+            models.Index(
+                fields=["date", "end_time"],
+                name="att_session_open_end",
+                condition=models.Q(status="open")
+            ),
+        ]
 
     def __str__(self):
         return f"{self.course_offering} | {self.date} {self.start_time}"
@@ -116,6 +135,16 @@ class AttendanceRecord(models.Model):
 
     class Meta:
         unique_together = ("session", "student")
+        indexes = [
+            models.Index(
+                fields=["student", "status"],
+                name="att_record_student_status"
+            ),
+            models.Index(
+                fields=["session", "status"],
+                name="att_record_session_status"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student} | {self.session} | {self.status}"
@@ -158,9 +187,116 @@ class AttendanceWindowConfig(models.Model):
 
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Process-local cache of the active config, dropped on save/delete
+    # (see attendance.signals).
+    # The TTL bounds staleness for changes made by other processes.
+    CACHE_TTL = 60
+    _cached = None
+
     @classmethod
     def get_active_config(cls):
-        return cls.objects.filter(active=True).first()
+        snapshot = _window_snapshot.get()
+        if snapshot is not None and "config" in snapshot:
+            return snapshot["config"]
+
+        cached = cls._cached
+        if cached is not None and cached[0] > time.monotonic():
+            config = cached[1]
+        else:
+            config = cls.objects.filter(active=True).first()
+            cls._cached = (time.monotonic() + cls.CACHE_TTL, config)
+
+        if snapshot is not None:
+            snapshot["config"] = config
+        return config
+
+    @classmethod
+    def clear_cache(cls):
+        cls._cached = None
 
     def __str__(self):
         return f"Attendance Edit Window: {self.edit_window_days} days"
+
+class AttendanceTally(models.Model):
+    """
+    Denormalized attendance counters for one student in one course offering.
+    Kept in step with AttendanceRecord writes by attendance.services and
+    rebuilt with `manage.py rebuild_attendance_tallies`.
+    """
+
+    student = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="attendance_tallies"
+    )
+
+    offering = models.ForeignKey(
+        "academics.CourseOffering",
+        on_delete=models.CASCADE,
+        related_name="attendance_tallies"
+    )
+
+    present = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+
+    # Sessions of the offering with attendance recorded, whether or not
+    # the student has a record in them
+    total_sessions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("student", "offering")
+
+    def __str__(self):
+        return f"{self.student} | {self.offering} | {self.attended}/{self.total_sessions}"
+
+    @property
+    def attended(self):
+        return self.present + self.late + self.excused
+class AttendanceRollup(models.Model):
+    """
+    Daily / weekly attendance aggregates per course offering, refreshed
+    whenever a session of the period is marked or edited. Serves the
+    trend charts without scanning AttendanceRecord.
+    """
+
+    PERIOD_DAY = "day"
+    PERIOD_WEEK = "week"
+
+    PERIOD_CHOICES = [
+        (PERIOD_DAY, "Day"),
+        (PERIOD_WEEK, "Week"),
+    ]
+
+    offering = models.ForeignKey(
+        "academics.CourseOffering",
+        on_delete=models.CASCADE,
+        related_name="attendance_rollups"
+    )
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+
+    # The day itself, or the Monday of the week
+    period_start = models.DateField()
+
+    sessions = models.PositiveIntegerField(default=0)
+    present = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("offering", "period", "period_start")
+        ordering = ["period_start"]
+
+    def __str__(self):
+        return f"{self.offering} | {self.period} {self.period_start}"
+
+    @property
+    def presence_rate(self):
+        attended = self.present + self.late + self.excused
+        total = attended + self.absent
+        return round(attended / total * 100, 2) if total else None
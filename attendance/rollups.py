@@ -0,0 +1,146 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from attendance.models import AttendanceRecord, AttendanceRollup
+
+
+def _rollup_counts(records):
+    return records.aggregate(
+        sessions=Count("session", distinct=True),
+        present=Count("id", filter=Q(status=AttendanceRecord.STATUS_PRESENT)),
+        late=Count("id", filter=Q(status=AttendanceRecord.STATUS_LATE)),
+        excused=Count("id", filter=Q(status=AttendanceRecord.STATUS_EXCUSED)),
+        absent=Count("id", filter=Q(status=AttendanceRecord.STATUS_ABSENT)),
+    )
+
+
+def refresh_attendance_rollups(offering_id, day):
+    """
+    Recomputes the day and week rollups of the offering that contain day.
+    Each is one aggregate over that period's sessions only.
+    """
+
+    week_start = day - timedelta(days=day.weekday())
+
+    periods = (
+        (AttendanceRollup.PERIOD_DAY, day, day),
+        (AttendanceRollup.PERIOD_WEEK, week_start, week_start + timedelta(days=6)),
+    )
+
+    for period, start, end in periods:
+        counts = _rollup_counts(
+            AttendanceRecord.objects.filter(
+                session__course_offering_id=offering_id,
+                session__date__range=(start, end)
+            )
+        )
+
+        AttendanceRollup.objects.update_or_create(
+            offering_id=offering_id,
+            period=period,
+            period_start=start,
+            defaults=counts
+        )
+
+
+def rebuild_attendance_rollups(offerings=None, batch_size=1000):
+    """
+    Recomputes every rollup from the records with one grouped query.
+    Returns the number of rows written.
+    """
+
+    records = AttendanceRecord.objects.order_by()
+    if offerings is not None:
+        records = records.filter(session__course_offering__in=offerings)
+
+    daily = records.values(
+        "session__course_offering_id",
+        "session__date"
+    ).annotate(
+        sessions=Count("session", distinct=True),
+        present=Count("id", filter=Q(status=AttendanceRecord.STATUS_PRESENT)),
+        late=Count("id", filter=Q(status=AttendanceRecord.STATUS_LATE)),
+        excused=Count("id", filter=Q(status=AttendanceRecord.STATUS_EXCUSED)),
+        absent=Count("id", filter=Q(status=AttendanceRecord.STATUS_ABSENT)),
+    )
+
+    counters = ("sessions", "present", "late", "excused", "absent")
+    rollups = []
+    weeks = {}
+
+    for row in daily:
+        offering_id = row["session__course_offering_id"]
+        day = row["session__date"]
+        counts = {field: row[field] for field in counters}
+
+        rollups.append(AttendanceRollup(
+            offering_id=offering_id,
+            period=AttendanceRollup.PERIOD_DAY,
+            period_start=day,
+            **counts
+        ))
+
+        week_start = day - timedelta(days=day.weekday())
+        week = weeks.setdefault((offering_id, week_start), AttendanceRollup(
+            offering_id=offering_id,
+            period=AttendanceRollup.PERIOD_WEEK,
+            period_start=week_start
+        ))
+        for field in counters:
+            setattr(week, field, getattr(week, field) + counts[field])
+
+    rollups.extend(weeks.values())
+
+    existing = AttendanceRollup.objects.all()
+    if offerings is not None:
+        existing = existing.filter(offering__in=offerings)
+
+    with transaction.atomic():
+        existing.delete()
+        AttendanceRollup.objects.bulk_create(rollups, batch_size=batch_size)
+
+    return len(rollups)
+
+
+def get_attendance_trend(offering, period, start=None, end=None):
+    """
+    Returns the rollup series of an offering as a list of dicts,
+    each with the presence rate and its change from the previous point.
+    """
+
+    rollups = AttendanceRollup.objects.filter(
+        offering=offering,
+        period=period
+    ).order_by("period_start")
+
+    if start:
+        rollups = rollups.filter(period_start__gte=start)
+    if end:
+        rollups = rollups.filter(period_start__lte=end)
+
+    series = []
+    previous = None
+
+    for rollup in rollups:
+        rate = rollup.presence_rate
+
+        series.append({
+            "period_start": rollup.period_start.isoformat(),
+            "sessions": rollup.sessions,
+            "present": rollup.present,
+            "late": rollup.late,
+            "excused": rollup.excused,
+            "absent": rollup.absent,
+            "presence_rate": rate,
+            "change": (
+                round(rate - previous, 2)
+                if rate is not None and previous is not None else None
+            ),
+        })
+
+        if rate is not None:
+            previous = rate
+
+    return series
@@ -1,60 +1,102 @@
+from collections import defaultdict
+from datetime import timedelta
 from django.utils import timezone
-from django.db.models import Count, Q
-from attendance.models import AttendanceSession, AttendanceRecord
-from academics.models import Enrollment
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_date, parse_time
+from attendance.models import (
+    AttendanceSession,
+    AttendanceRecord,
+    AttendanceEditLog,
+    AttendanceTally,
+    AttendanceWindowConfig
+)
+from attendance.signals import attendance_changed
+from academics.models import CourseOffering, Enrollment
 
-def auto_lock_expired_sessions(course_offering):
+TALLY_FIELDS = ("present", "late", "excused", "absent", "total_sessions")
+
+VALID_STATUSES = {status for status, _ in AttendanceRecord.STATUS_CHOICES}
+
+def auto_lock_expired_sessions(course_offering=None, lock_without_window=False):
     """
-    Automatically locks attendance sessions whose edit window has expired.
-    Should be called whenever attendance history is accessed.
+    Locks every open session whose edit window has expired, in one UPDATE.
+    Runs periodically (attendance.tasks) and from the
+    lock_expired_attendance_sessions management command.
+
+    Without an active AttendanceWindowConfig nothing is locked, so
+    deactivating the config for a moment cannot lock every open session;
+    pass lock_without_window=True to lock them all in that case.
+    Returns the number of sessions locked.
     """
 
+    config = AttendanceWindowConfig.get_active_config()
+
+    if not config and not lock_without_window:
+        return 0
+
     sessions = AttendanceSession.objects.filter(
-        course_offering=course_offering,
         status=AttendanceSession.STATUS_OPEN
     )
 
+    if course_offering is not None:
+        sessions = sessions.filter(course_offering=course_offering)
+
     now = timezone.now()
 
-    for session in sessions:
-        if not session.is_editable():
-            session.status = AttendanceSession.STATUS_LOCKED
-            session.locked_at = now
-            session.save(update_fields=["status", "locked_at"])
+    if config:
+        cutoff = timezone.localtime(now) - timedelta(days=config.edit_window_days)
+
+        sessions = sessions.filter(
+            Q(date__lt=cutoff.date()) |
+            Q(date=cutoff.date(), end_time__lt=cutoff.time())
+        )
+
+    return sessions.update(
+        status=AttendanceSession.STATUS_LOCKED,
+        locked_at=now
+    )
 
 def get_course_attendance_stats(course_offering, student):
     """
     Returns attendance statistics for ONE student in ONE course offering.
     """
 
-    # Only sessions that actually exist
-    total_sessions = AttendanceSession.objects.filter(
-        course_offering=course_offering
-    ).count()
+    tally = AttendanceTally.objects.filter(
+        offering=course_offering,
+        student=student
+    ).first()
+
+    if tally is None:
+        return get_tally_stats(
+            None, held_sessions([course_offering.id]).get(course_offering.id, 0)
+        )
+
+    return get_tally_stats(tally)
+
+
+def build_attendance_stats(total_sessions, counts):
+    """
+    Builds the stats dict from the session total and per-status counts.
+    Late and excused records count towards presence.
+    """
 
     if total_sessions == 0:
         return {
             "total": 0,
             "present": 0,
             "absent": 0,
+            "late": 0,
+            "excused": 0,
             "percentage": 0.0,
             "status": "NO_DATA",
         }
 
-    # Count attendance by status
-    status_counts = AttendanceRecord.objects.filter(
-        session__course_offering=course_offering,
-        student=student
-    ).values("status").annotate(count=Count("id"))
-
-    counts = {row["status"]: row["count"] for row in status_counts}
-
-    present = (
-        counts.get(AttendanceRecord.STATUS_PRESENT, 0)
-        + counts.get(AttendanceRecord.STATUS_LATE, 0)
-        + counts.get(AttendanceRecord.STATUS_EXCUSED, 0)
-    )
+    late = counts.get(AttendanceRecord.STATUS_LATE, 0)
+    excused = counts.get(AttendanceRecord.STATUS_EXCUSED, 0)
 
+    present = counts.get(AttendanceRecord.STATUS_PRESENT, 0) + late + excused
     absent = counts.get(AttendanceRecord.STATUS_ABSENT, 0)
 
     percentage = (present / total_sessions) * 100
@@ -63,10 +105,624 @@ def get_course_attendance_stats(course_offering, student):
         "total": total_sessions,
         "present": present,
         "absent": absent,
+        "late": late,
+        "excused": excused,
         "percentage": round(percentage, 2),
         "status": get_attendance_status(percentage),
     }
 
+
+def annotate_attendance_counts(enrollments):
+    """
+    Annotates an Enrollment queryset with the session total of its offering
+    and the student's per-status record counts in that offering.
+
+    Everything is computed in the same grouped query, so callers can walk
+    any number of (student, offering) pairs without further queries.
+    """
+
+    session_totals = AttendanceSession.objects.filter(
+        Exists(AttendanceRecord.objects.filter(session=OuterRef("pk"))),
+        course_offering=OuterRef("offering")
+    ).order_by().values("course_offering").annotate(
+        total=Count("id")
+    ).values("total")
+
+    in_offering = Q(
+        student__attendance_records__session__course_offering=F("offering")
+    )
+
+    def status_count(status):
+        return Count(
+            "student__attendance_records",
+            filter=in_offering & Q(student__attendance_records__status=status)
+        )
+
+    return enrollments.annotate(
+        total_sessions=Coalesce(
+            Subquery(session_totals, output_field=IntegerField()), 0
+        ),
+        present_count=status_count(AttendanceRecord.STATUS_PRESENT),
+        absent_count=status_count(AttendanceRecord.STATUS_ABSENT),
+        late_count=status_count(AttendanceRecord.STATUS_LATE),
+        excused_count=status_count(AttendanceRecord.STATUS_EXCUSED),
+    )
+
+
+def held_sessions(offering_ids):
+    """
+    {offering_id: number of sessions held}. A session counts as held once
+    attendance has been recorded for it, which is also when the tallies
+    count it.
+    """
+
+    return dict(
+        AttendanceSession.objects.filter(
+            Exists(AttendanceRecord.objects.filter(session=OuterRef("pk"))),
+            course_offering_id__in=offering_ids
+        ).order_by().values("course_offering_id").annotate(
+            held=Count("id")
+        ).values_list("course_offering_id", "held")
+    )
+
+
+def get_tally_stats(tally, held=0):
+    """
+    Stats dict for an AttendanceTally row. A student without a row (enrolled
+    after the last session) has no records, so counts as absent for the
+    `held` sessions of the offering.
+    """
+
+    if tally is None:
+        return build_attendance_stats(held, {})
+
+    return build_attendance_stats(tally.total_sessions, {
+        AttendanceRecord.STATUS_PRESENT: tally.present,
+        AttendanceRecord.STATUS_ABSENT: tally.absent,
+        AttendanceRecord.STATUS_LATE: tally.late,
+        AttendanceRecord.STATUS_EXCUSED: tally.excused,
+    })
+
+
+def ensure_attendance_tallies(offering_id):
+    """
+    Creates the missing tally rows for students enrolled in the offering.
+    New rows start with the sessions already held in the offering.
+    """
+
+    existing = AttendanceTally.objects.filter(
+        offering_id=offering_id
+    ).values_list("student_id", flat=True)
+
+    student_ids = Enrollment.objects.filter(
+        offering_id=offering_id
+    ).exclude(
+        student_id__in=existing
+    ).values_list("student_id", flat=True)
+
+    student_ids = list(student_ids)
+    if not student_ids:
+        return
+
+    held = held_sessions([offering_id]).get(offering_id, 0)
+
+    AttendanceTally.objects.bulk_create(
+        [
+            AttendanceTally(
+                student_id=student_id,
+                offering_id=offering_id,
+                total_sessions=held
+            )
+            for student_id in student_ids
+        ],
+        ignore_conflicts=True
+    )
+
+
+def record_session_in_tallies(session, records):
+    """
+    Applies a freshly marked session and its records to the tallies.
+    Must run in the same transaction as the record inserts, once per
+    session: the session starts counting as held with its first records.
+    """
+
+    if not records:
+        return
+
+    offering_id = session.course_offering_id
+
+    AttendanceTally.objects.filter(
+        offering_id=offering_id
+    ).update(total_sessions=F("total_sessions") + 1)
+
+    # Rows created here already count the new session
+    ensure_attendance_tallies(offering_id)
+
+    by_status = defaultdict(list)
+    for record in records:
+        by_status[record.status].append(record.student_id)
+
+    for status, student_ids in by_status.items():
+        AttendanceTally.objects.filter(
+            offering_id=offering_id,
+            student_id__in=student_ids
+        ).update(**{status: F(status) + 1})
+
+    attendance_changed.send(
+        sender=AttendanceSession,
+        session=session,
+        changes=[(record.student_id, None, record.status) for record in records]
+    )
+
+
+def apply_status_changes_to_tallies(session, changes):
+    """
+    Moves tally counts for records edited in the session.
+    changes → iterable of (student_id, old_status, new_status)
+    """
+
+    offering_id = session.course_offering_id
+
+    by_transition = defaultdict(list)
+    for student_id, old_status, new_status in changes:
+        if old_status != new_status:
+            by_transition[(old_status, new_status)].append(student_id)
+
+    for (old_status, new_status), student_ids in by_transition.items():
+        AttendanceTally.objects.filter(
+            offering_id=offering_id,
+            student_id__in=student_ids
+        ).update(**{
+            old_status: F(old_status) - 1,
+            new_status: F(new_status) + 1,
+        })
+
+    attendance_changed.send(
+        sender=AttendanceSession,
+        session=session,
+        changes=[change for change in changes if change[1] != change[2]]
+    )
+
+
+def apply_attendance_edits(session, statuses, edited_by, reason=""):
+    """
+    Applies posted statuses to a session's records in one transaction:
+    one bulk_update of the records, one bulk_create of edit logs and the
+    matching tally moves.
+
+    statuses → {student_id: new_status}; unknown students and invalid
+    statuses are ignored.
+
+    Returns a change summary:
+    {"changed": [{"student_id", "old_status", "new_status"}, ...],
+     "unchanged": int, "ignored": int}
+    """
+
+    changed = []
+    logs = []
+    updated_records = []
+    unchanged = 0
+
+    with transaction.atomic():
+        records = AttendanceRecord.objects.select_for_update().filter(
+            session=session
+        ).only("id", "student_id", "status")
+
+        for record in records:
+            new_status = statuses.get(record.student_id)
+
+            if new_status == record.status:
+                unchanged += 1
+                continue
+
+            if new_status not in VALID_STATUSES:
+                continue
+
+            changed.append({
+                "student_id": record.student_id,
+                "old_status": record.status,
+                "new_status": new_status,
+            })
+
+            logs.append(
+                AttendanceEditLog(
+                    attendance_record=record,
+                    edited_by=edited_by,
+                    old_status=record.status,
+                    new_status=new_status,
+                    reason=reason
+                )
+            )
+
+            record.status = new_status
+            updated_records.append(record)
+
+        if updated_records:
+            AttendanceRecord.objects.bulk_update(updated_records, ["status"])
+            AttendanceEditLog.objects.bulk_create(logs)
+
+            apply_status_changes_to_tallies(
+                session,
+                [
+                    (change["student_id"], change["old_status"], change["new_status"])
+                    for change in changed
+                ]
+            )
+
+    return {
+        "changed": changed,
+        "unchanged": unchanged,
+        "ignored": len(statuses) - len(changed) - unchanged,
+    }
+
+
+def _parse_or_none(parser, value):
+    try:
+        return parser(str(value))
+    except ValueError:
+        return None
+
+
+def _parse_id(value):
+    # JSON clients send ids as numbers or numeric strings
+    return int(value) if str(value).isdigit() else None
+
+
+def _existing_sessions(offering_ids, dates):
+    """
+    {(offering_id, date, start_time): session} annotated with has_records.
+    """
+    return {
+        (session.course_offering_id, session.date, session.start_time): session
+        for session in AttendanceSession.objects.filter(
+            course_offering_id__in=offering_ids,
+            date__in=dates
+        ).annotate(
+            has_records=Exists(
+                AttendanceRecord.objects.filter(session=OuterRef("pk"))
+            )
+        )
+    }
+
+
+def _write_planned_sessions(planned):
+    """
+    Inserts the new sessions and all records of the planned entries with
+    batched inserts and applies them to the tallies. Safe to retry after
+    a rolled back attempt.
+    """
+
+    new_sessions = []
+    for _, session, records, is_new in planned:
+        if is_new:
+            session.pk = None
+            new_sessions.append(session)
+
+    AttendanceSession.objects.bulk_create(new_sessions)
+
+    for _, session, records, _ in planned:
+        for record in records:
+            record.pk = None
+            record.session = session
+
+    AttendanceRecord.objects.bulk_create(
+        [record for _, _, records, _ in planned for record in records],
+        batch_size=1000
+    )
+
+    for _, session, records, _ in planned:
+        record_session_in_tallies(session, records)
+
+    return [
+        {
+            "index": index,
+            "session_id": session.id,
+            "records": len(records),
+        }
+        for index, session, records, _ in planned
+    ]
+
+
+def mark_sessions_bulk(faculty, entries):
+    """
+    Marks many sessions at once (e.g. a whole day submitted from the
+    bulk/offline client) with batched inserts.
+
+    entries → list of dicts with offering_id, date, start_time, end_time
+    and statuses ({student_id: status}). Enrolled students missing from
+    statuses are marked absent, like the single-session form.
+
+    Ownership, enrollment and existing sessions are preloaded once, so
+    validation runs no per-entry queries. A session marked concurrently
+    by another request is reported as a conflict of its entry. Returns
+    {"created": [{"index", "session_id", "records"}],
+     "conflicts": [{"index", "errors", "session_id"?}]}
+    """
+
+    today = timezone.localdate()
+
+    offering_ids = {_parse_id(entry.get("offering_id")) for entry in entries}
+
+    own_offerings = set(
+        CourseOffering.objects.filter(
+            id__in=offering_ids - {None},
+            facultyassignment__faculty=faculty
+        ).values_list("id", flat=True)
+    )
+
+    enrolled = defaultdict(set)
+    for offering_id, student_id in Enrollment.objects.filter(
+        offering_id__in=own_offerings
+    ).values_list("offering_id", "student_id"):
+        enrolled[offering_id].add(student_id)
+
+    existing = _existing_sessions(
+        own_offerings,
+        {_parse_or_none(parse_date, entry.get("date")) for entry in entries} - {None}
+    )
+
+    created = []
+    conflicts = []
+    planned = []
+    seen_keys = set()
+
+    for index, entry in enumerate(entries):
+        errors = []
+
+        offering_id = _parse_id(entry.get("offering_id"))
+        session_date = _parse_or_none(parse_date, entry.get("date"))
+        start_time = _parse_or_none(parse_time, entry.get("start_time"))
+        end_time = _parse_or_none(parse_time, entry.get("end_time"))
+        statuses = entry.get("statuses") or {}
+
+        if offering_id not in own_offerings:
+            errors.append("Course offering not assigned to you.")
+        if session_date is None or start_time is None or end_time is None:
+            errors.append("Invalid date or time.")
+        elif session_date > today:
+            errors.append("Cannot mark attendance for future dates.")
+        if not isinstance(statuses, dict):
+            errors.append("statuses must map student ids to a status.")
+            statuses = {}
+
+        if errors:
+            conflicts.append({"index": index, "errors": errors})
+            continue
+
+        key = (offering_id, session_date, start_time)
+
+        if key in seen_keys:
+            conflicts.append({"index": index, "errors": ["Duplicate session in this submission."]})
+            continue
+        seen_keys.add(key)
+
+        session = existing.get(key)
+        if session is not None and (session.has_records or session.faculty_id != faculty.id):
+            conflicts.append({
+                "index": index,
+                "session_id": session.id,
+                "errors": ["Attendance already marked for this session."],
+            })
+            continue
+
+        students = enrolled[offering_id]
+        if not students:
+            conflicts.append({"index": index, "errors": ["No students enrolled in this course."]})
+            continue
+
+        marked = {}
+        for student_id, status in statuses.items():
+            student_id = _parse_id(student_id)
+
+            if student_id not in students:
+                errors.append(f"Student {student_id} is not enrolled in this course.")
+            elif status not in VALID_STATUSES:
+                errors.append(f"Invalid status '{status}' for student {student_id}.")
+            else:
+                marked[student_id] = status
+
+        if errors:
+            conflicts.append({"index": index, "errors": errors})
+            continue
+
+        is_new = session is None
+        if is_new:
+            session = AttendanceSession(
+                course_offering_id=offering_id,
+                faculty=faculty,
+                date=session_date,
+                start_time=start_time,
+                end_time=end_time
+            )
+
+        planned.append((index, session, [
+            AttendanceRecord(
+                student_id=student_id,
+                status=marked.get(student_id, AttendanceRecord.STATUS_ABSENT)
+            )
+            for student_id in students
+        ], is_new))
+
+    if not planned:
+        return {"created": created, "conflicts": conflicts}
+
+    try:
+        with transaction.atomic():
+            created = _write_planned_sessions(planned)
+    except IntegrityError:
+        # A session was marked concurrently: retry entry by entry, each
+        # in its own savepoint, and report the ones that still collide
+        for entry in planned:
+            try:
+                with transaction.atomic():
+                    created += _write_planned_sessions([entry])
+            except IntegrityError:
+                conflicts.append({
+                    "index": entry[0],
+                    "errors": ["Attendance already marked for this session."],
+                })
+
+        conflicts.sort(key=lambda conflict: conflict["index"])
+
+    return {"created": created, "conflicts": conflicts}
+
+
+def compute_attendance_tallies(offerings=None):
+    """
+    Yields unsaved AttendanceTally objects recomputed from the records.
+    """
+
+    enrollments = Enrollment.objects.order_by()
+    if offerings is not None:
+        enrollments = enrollments.filter(offering__in=offerings)
+
+    for enrollment in annotate_attendance_counts(enrollments).iterator():
+        yield AttendanceTally(
+            student_id=enrollment.student_id,
+            offering_id=enrollment.offering_id,
+            present=enrollment.present_count,
+            late=enrollment.late_count,
+            excused=enrollment.excused_count,
+            absent=enrollment.absent_count,
+            total_sessions=enrollment.total_sessions,
+        )
+
+
+def rebuild_attendance_tallies(offerings=None, batch_size=1000):
+    """
+    Recomputes the tallies from scratch. Returns the number of rows written.
+    """
+
+    tallies = list(compute_attendance_tallies(offerings))
+
+    existing = AttendanceTally.objects.all()
+    if offerings is not None:
+        existing = existing.filter(offering__in=offerings)
+
+    with transaction.atomic():
+        existing.delete()
+        AttendanceTally.objects.bulk_create(tallies, batch_size=batch_size)
+
+    return len(tallies)
+
+
+def find_tally_drift(offerings=None):
+    """
+    Compares the stored tallies against the records.
+    Returns a list of (student_id, offering_id, expected, stored) where
+    expected/stored are dicts of the counter fields. stored is None when
+    the row is missing although the student has records, expected is None
+    when the student is no longer enrolled.
+    """
+
+    stored = AttendanceTally.objects.all()
+    if offerings is not None:
+        stored = stored.filter(offering__in=offerings)
+
+    stored_map = {
+        (row["student_id"], row["offering_id"]): row
+        for row in stored.values("student_id", "offering_id", *TALLY_FIELDS)
+    }
+
+    drift = []
+
+    for tally in compute_attendance_tallies(offerings):
+        key = (tally.student_id, tally.offering_id)
+        expected = {field: getattr(tally, field) for field in TALLY_FIELDS}
+
+        row = stored_map.pop(key, None)
+
+        if row is None:
+            # A missing row reads as "no records", which is only wrong
+            # once the student has records
+            if any(expected[field] for field in TALLY_FIELDS if field != "total_sessions"):
+                drift.append((*key, expected, None))
+            continue
+
+        actual = {field: row[field] for field in TALLY_FIELDS}
+
+        if actual != expected:
+            drift.append((*key, expected, actual))
+
+    # Rows left over belong to students who are no longer enrolled
+    for key, row in stored_map.items():
+        actual = {field: row[field] for field in TALLY_FIELDS}
+        drift.append((*key, None, actual))
+
+    return drift
+
+def iter_attendance_matrix(offerings, chunk_size=2000):
+    """
+    Yields a header row, then one row per enrolled student with the
+    attendance percentage of every course in the offerings (blank where
+    the student is not enrolled or no session was held yet).
+
+    Enrollments are read through a server-side cursor in student order,
+    with their tally counters as subqueries, and folded into rows one
+    student at a time, so memory stays flat no matter how many students
+    are exported.
+    """
+
+    offerings = list(offerings.select_related("course").order_by("course__course_code"))
+
+    columns = {}
+    for offering in offerings:
+        columns.setdefault(offering.course_id, (len(columns), offering.course.course_code))
+    column_of = {offering.id: columns[offering.course_id][0] for offering in offerings}
+
+    yield ["Roll No", "Student Name"] + [code for _, code in columns.values()]
+
+    offering_ids = [offering.id for offering in offerings]
+
+    # Students without a tally row have no records yet
+    held = held_sessions(offering_ids)
+
+    tally = AttendanceTally.objects.filter(
+        student=OuterRef("student"),
+        offering=OuterRef("offering")
+    )
+
+    enrollments = Enrollment.objects.filter(
+        offering__in=offering_ids
+    ).annotate(
+        attended=Subquery(
+            tally.annotate(
+                attended=F("present") + F("late") + F("excused")
+            ).values("attended")[:1]
+        ),
+        total=Subquery(tally.values("total_sessions")[:1]),
+    ).order_by(
+        "student__username", "student_id"
+    ).values_list(
+        "student_id",
+        "student__username",
+        "student__first_name",
+        "student__last_name",
+        "offering_id",
+        "attended",
+        "total",
+    ).iterator(chunk_size=chunk_size)
+
+    row = None
+    current = None
+
+    for student_id, username, first_name, last_name, offering_id, attended, total in enrollments:
+        if student_id != current:
+            if row is not None:
+                yield row
+            current = student_id
+            row = [username, f"{first_name} {last_name}".strip()] + [""] * len(columns)
+
+        if total is None:
+            attended, total = 0, held.get(offering_id, 0)
+
+        if total:
+            row[2 + column_of[offering_id]] = round(attended / total * 100, 2)
+
+    if row is not None:
+        yield row
+
+
 def get_attendance_status(percentage):
     """
     Institutional attendance policy.
@@ -83,8 +739,6 @@ def get_student_attendance_summary(student):
     Used in student dashboard.
     """
 
-    summary = []
-
     enrollments = Enrollment.objects.filter(
         student=student
     ).select_related(
@@ -92,34 +746,64 @@ def get_student_attendance_summary(student):
         "offering__course"
     )
 
-    for enrollment in enrollments:
-        stats = get_course_attendance_stats(
-            enrollment.offering,
-            student
-        )
+    tallies = {
+        tally.offering_id: tally
+        for tally in AttendanceTally.objects.filter(student=student)
+    }
+
+    enrollments = list(enrollments)
 
-        summary.append({
+    # Only offerings without a tally row need their session count
+    missing = [e.offering_id for e in enrollments if e.offering_id not in tallies]
+    held = held_sessions(missing) if missing else {}
+
+    return [
+        {
             "course_code": enrollment.offering.course.course_code,
             "course_title": enrollment.offering.course.course_title,
-            **stats
-        })
+            **get_tally_stats(
+                tallies.get(enrollment.offering_id),
+                held.get(enrollment.offering_id, 0)
+            )
+        }
+        for enrollment in enrollments
+    ]
 
-    return summary
 
+def get_enrollment_stats(course_offering):
+    """
+    [(student, stats)] for every student enrolled in the offering.
+    """
 
-def get_students_below_threshold(course_offering):
-    risky_students = []
+    enrollments = list(
+        Enrollment.objects.filter(
+            offering=course_offering
+        ).select_related("student")
+    )
 
-    enrollments = Enrollment.objects.filter(
-        offering=course_offering
-    ).select_related("student")
+    tallies = {
+        tally.student_id: tally
+        for tally in AttendanceTally.objects.filter(offering=course_offering)
+    }
 
-    for enrollment in enrollments:
-        stats = get_course_attendance_stats(
-            course_offering,
-            enrollment.student
-        )
-        if stats["status"] == "SHORTAGE":
-            risky_students.append(enrollment.student)
+    held = 0
+    if any(e.student_id not in tallies for e in enrollments):
+        held = held_sessions([course_offering.id]).get(course_offering.id, 0)
+
+    return [
+        (enrollment.student, get_tally_stats(tallies.get(enrollment.student_id), held))
+        for enrollment in enrollments
+    ]
+
+
+def get_students_below_threshold(course_offering):
+    """
+    Returns students of the offering whose attendance falls under
+    the detention limit.
+    """
 
-    return risky_students
+    return [
+        student
+        for student, stats in get_enrollment_stats(course_offering)
+        if stats["status"] == "DETENTION"
+    ]
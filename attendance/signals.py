@@ -1,23 +1,106 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from attendance.models import AttendanceRecord
-from notifications.models import Notification, NotificationRecipient
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from academics.models import CourseOffering
+from attendance.models import AttendanceRecord, AttendanceTally, AttendanceWindowConfig
+from attendance.rollups import refresh_attendance_rollups
+from notifications.models import Notification
+from notifications.services import MAX_EXPLICIT_RECIPIENTS, send_notification
 
+SHORTAGE_THRESHOLD = 75
 
-@receiver(post_save, sender=AttendanceRecord)
-def check_attendance_shortage(sender, instance, **kwargs):
+# No warnings until enough sessions were held for the percentage to mean
+# something (one absence in the first class would otherwise be 0%)
+SHORTAGE_MIN_SESSIONS = 5
 
-    percentage = instance.calculate_percentage()
+ATTENDED_STATUSES = {
+    AttendanceRecord.STATUS_PRESENT,
+    AttendanceRecord.STATUS_LATE,
+    AttendanceRecord.STATUS_EXCUSED,
+}
 
-    if percentage < 75:
-        notification = Notification.objects.create(
-            title="Attendance Warning",
-            message=f"Your attendance in {instance.offering.course.name} is below 75%.",
-            notification_type="WARNING",
-            course_offering=instance.offering
+# Sent once per marked or edited session, after the tallies were updated.
+# changes → list of (student_id, old_status, new_status); old_status is
+# None for records created by marking.
+attendance_changed = Signal()
+
+
+@receiver(post_save, sender=AttendanceWindowConfig)
+@receiver(post_delete, sender=AttendanceWindowConfig)
+def clear_window_config_cache(sender, **kwargs):
+    sender.clear_cache()
+
+
+@receiver(attendance_changed)
+def check_attendance_shortage(sender, session, changes, **kwargs):
+    """
+    Warns the students whose attendance dropped below the threshold
+    because of this session. Runs after commit, reads the affected
+    tallies in one query and sends one shared notification.
+    """
+
+    changes = list(changes)
+    if not changes:
+        return
+
+    offering_id = session.course_offering_id
+
+    transaction.on_commit(
+        lambda: notify_new_shortages(offering_id, changes)
+    )
+
+
+@receiver(attendance_changed)
+def refresh_session_rollups(sender, session, changes, **kwargs):
+    refresh_attendance_rollups(session.course_offering_id, session.date)
+
+
+def notify_new_shortages(offering_id, changes):
+    delta = {}
+    for student_id, old_status, new_status in changes:
+        # Undo this change to get the student's attendance before it
+        attended = (new_status in ATTENDED_STATUSES) - (old_status in ATTENDED_STATUSES)
+        held = 1 if old_status is None else 0
+        delta[student_id] = (attended, held)
+
+    tallies = AttendanceTally.objects.filter(
+        offering_id=offering_id,
+        student_id__in=delta
+    ).values_list("student_id", "present", "late", "excused", "total_sessions")
+
+    crossed = []
+
+    for student_id, present, late, excused, total in tallies:
+        attended = present + late + excused
+        attended_delta, held_delta = delta[student_id]
+
+        before_total = total - held_delta
+        before_attended = attended - attended_delta
+
+        is_short = (
+            total >= SHORTAGE_MIN_SESSIONS and
+            attended * 100 < SHORTAGE_THRESHOLD * total
         )
+        was_short = (
+            before_total >= SHORTAGE_MIN_SESSIONS and
+            before_attended * 100 < SHORTAGE_THRESHOLD * before_total
+        )
+
+        if is_short and not was_short:
+            crossed.append(student_id)
+
+    if not crossed:
+        return
 
-        NotificationRecipient.objects.create(
-            notification=notification,
-            user=instance.student
+    course = CourseOffering.objects.select_related("course").get(id=offering_id).course
+
+    for start in range(0, len(crossed), MAX_EXPLICIT_RECIPIENTS):
+        send_notification(
+            title="Attendance Warning",
+            message=(
+                f"Your attendance in {course.course_code} - {course.course_title} "
+                f"is below {SHORTAGE_THRESHOLD}%."
+            ),
+            recipients=crossed[start:start + MAX_EXPLICIT_RECIPIENTS],
+            notification_type=Notification.WARNING,
         )
@@ -1,31 +1,15 @@
-from datetime import timedelta
-from django.utils import timezone
-from attendance.models import AttendanceSession, AttendanceRecord
+from attendance.models import AttendanceTally
+from attendance.services import held_sessions
 from academics.models import Enrollment
 
 DETENTION_THRESHOLD = 75
 
 
-def get_course_attendance_stats(course_offering, student):
-    """
-    Returns attendance statistics for a student in a course offering.
-    """
-
-    total_sessions = AttendanceSession.objects.filter(
-        course_offering=course_offering
-    ).count()
-
-    present_count = AttendanceRecord.objects.filter(
-        session__course_offering=course_offering,
-        student=student,
-        status="present"
-    ).count()
-
-    absent_count = AttendanceRecord.objects.filter(
-        session__course_offering=course_offering,
-        student=student,
-        status="absent"
-    ).count()
+def _tally_stats(tally, held=0):
+    # No tally row: no records, absent for every session held
+    total_sessions = tally.total_sessions if tally else held
+    present_count = tally.present if tally else 0
+    absent_count = tally.absent if tally else 0
 
     percentage = (
         (present_count / total_sessions) * 100
@@ -41,6 +25,24 @@ def get_course_attendance_stats(course_offering, student):
     }
 
 
+def get_course_attendance_stats(course_offering, student):
+    """
+    Returns attendance statistics for a student in a course offering.
+    """
+
+    tally = AttendanceTally.objects.filter(
+        offering=course_offering,
+        student=student
+    ).first()
+
+    if tally is None:
+        return _tally_stats(
+            None, held_sessions([course_offering.id]).get(course_offering.id, 0)
+        )
+
+    return _tally_stats(tally)
+
+
 def is_student_detained(course_offering, student):
     return get_course_attendance_stats(course_offering, student)["is_detained"]
 
@@ -52,17 +54,23 @@ def get_students_below_threshold(course_offering, threshold=DETENTION_THRESHOLD)
 
     students = []
 
-    enrolled_students = Enrollment.objects.filter(
+    enrollments = Enrollment.objects.filter(
         offering=course_offering
     ).select_related("student")
 
-    for enrollment in enrolled_students:
-        student = enrollment.student
-        stats = get_course_attendance_stats(course_offering, student)
+    tallies = {
+        tally.student_id: tally
+        for tally in AttendanceTally.objects.filter(offering=course_offering)
+    }
+
+    held = held_sessions([course_offering.id]).get(course_offering.id, 0)
+
+    for enrollment in enrollments:
+        stats = _tally_stats(tallies.get(enrollment.student_id), held)
 
         if stats["percentage"] < threshold:
             students.append({
-                "student": student,
+                "student": enrollment.student,
                 "percentage": stats["percentage"]
             })
 
@@ -79,10 +87,18 @@ def get_student_attendance_summary(student):
     enrollments = Enrollment.objects.filter(student=student)\
         .select_related("offering", "offering__course")
 
+    tallies = {
+        tally.offering_id: tally
+        for tally in AttendanceTally.objects.filter(student=student)
+    }
+
+    missing = [e.offering_id for e in enrollments if e.offering_id not in tallies]
+    held = held_sessions(missing) if missing else {}
+
     for enrollment in enrollments:
-        stats = get_course_attendance_stats(
-            enrollment.offering,
-            student
+        stats = _tally_stats(
+            tallies.get(enrollment.offering_id),
+            held.get(enrollment.offering_id, 0)
         )
 
         summary.append({
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from attendance.services import auto_lock_expired_sessions
+
+
+@shared_task
+def lock_expired_sessions_task():
+    return auto_lock_expired_sessions()
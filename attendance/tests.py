@@ -1,3 +1,710 @@
+import csv
+import datetime
+import json
+from io import BytesIO, StringIO
+from unittest import mock
+
+import openpyxl
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from academics.models import (
+    AcademicYear,
+    Course,
+    CourseOffering,
+    Enrollment,
+    FacultyAssignment,
+    Semester,
+)
+from accounts.models import Department, FacultyProfile, StudentProfile, User
+from notifications.models import Notification, NotificationRecipient
+from notifications.services import dispatch_notification
+from notifications.tasks import dispatch_notification_task
+from attendance.models import (
+    AttendanceEditLog,
+    AttendanceRecord,
+    AttendanceRollup,
+    AttendanceSession,
+    AttendanceTally,
+    AttendanceWindowConfig,
+)
+from attendance import services
+from attendance.rollups import rebuild_attendance_rollups
+from attendance.signals import SHORTAGE_MIN_SESSIONS
+from attendance.services import (
+    apply_attendance_edits,
+    auto_lock_expired_sessions,
+    find_tally_drift,
+    get_course_attendance_stats,
+    get_student_attendance_summary,
+    get_students_below_threshold,
+    mark_sessions_bulk,
+)
+
+PRESENT = AttendanceRecord.STATUS_PRESENT
+ABSENT = AttendanceRecord.STATUS_ABSENT
+LATE = AttendanceRecord.STATUS_LATE
+EXCUSED = AttendanceRecord.STATUS_EXCUSED
+
+
+class AttendanceTestCase(TestCase):
+    """
+    One department, one faculty member teaching two offerings of four
+    enrolled students each.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="CSE")
+        cls.academic_year = AcademicYear.objects.create(
+            start_year=2025, end_year=2026, is_active=True
+        )
+        cls.semester = Semester.objects.create(
+            academic_year=cls.academic_year, year=2, semester=1
+        )
+
+        cls.faculty = User.objects.create_user(
+            username="fac1", email="fac1@example.com", password="pw", role="FACULTY"
+        )
+        FacultyProfile.objects.create(
+            user=cls.faculty, department=cls.department, designation="Assistant Professor"
+        )
+
+        cls.offering = cls.make_offering("CS201")
+        cls.other_offering = cls.make_offering("CS202")
+
+        cls.students = []
+        for i in range(4):
+            student = User.objects.create_user(
+                username=f"21cs{i:03d}",
+                email=f"21cs{i:03d}@example.com",
+                password="pw",
+                role="STUDENT",
+                first_name=f"Student{i}",
+            )
+            StudentProfile.objects.create(
+                user=student, department=cls.department, year=2, section="A"
+            )
+            for offering in (cls.offering, cls.other_offering):
+                Enrollment.objects.create(student=student, offering=offering)
+            cls.students.append(student)
+
+        AttendanceWindowConfig.objects.create(edit_window_days=2)
+
+    @classmethod
+    def make_offering(cls, code, department=None):
+        department = department or cls.department
+        course = Course.objects.create(
+            course_code=code,
+            course_title=f"Course {code}",
+            credits=4,
+            category="PCC",
+            department=department,
+        )
+        offering = CourseOffering.objects.create(
+            course=course,
+            academic_year=cls.academic_year,
+            semester=cls.semester,
+            department=department,
+            year=2,
+            section="A",
+        )
+        FacultyAssignment.objects.create(faculty=cls.faculty, offering=offering)
+        return offering
+
+    def setUp(self):
+        # The window config is cached per process; rollbacks don't clear it
+        AttendanceWindowConfig.clear_cache()
+
+    def mark(self, statuses, offering=None, day=None, start="09:00", end="10:00"):
+        """
+        Marks one session through the bulk service; statuses is a list
+        aligned with self.students.
+        """
+        offering = offering or self.offering
+        day = day or timezone.localdate()
+
+        result = mark_sessions_bulk(self.faculty, [{
+            "offering_id": offering.id,
+            "date": day.isoformat(),
+            "start_time": start,
+            "end_time": end,
+            "statuses": {
+                str(student.id): status
+                for student, status in zip(self.students, statuses)
+            },
+        }])
+        self.assertEqual(result["conflicts"], [])
+        return result["created"][0]["session_id"]
+
+
+class AttendanceStatsTests(AttendanceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        today = timezone.localdate()
+        self.mark([PRESENT, ABSENT, LATE, ABSENT], day=today - datetime.timedelta(days=1))
+        self.mark([PRESENT, ABSENT, EXCUSED, PRESENT], day=today)
+        self.mark([ABSENT, ABSENT, ABSENT, ABSENT], offering=self.other_offering)
+
+    def test_course_stats_count_late_and_excused_as_present(self):
+        stats = get_course_attendance_stats(self.offering, self.students[2])
+
+        self.assertEqual(stats["total"], 2)
+        self.assertEqual(stats["present"], 2)
+        self.assertEqual(stats["late"], 1)
+        self.assertEqual(stats["excused"], 1)
+        self.assertEqual(stats["percentage"], 100.0)
+        self.assertEqual(stats["status"], "SAFE")
+
+    def test_student_summary_covers_every_enrollment_in_fixed_queries(self):
+        with self.assertNumQueries(2):
+            summary = get_student_attendance_summary(self.students[3])
+
+        by_code = {row["course_code"]: row for row in summary}
+        self.assertEqual(by_code["CS201"]["percentage"], 50.0)
+        self.assertEqual(by_code["CS201"]["status"], "DETENTION")
+        self.assertEqual(by_code["CS202"]["percentage"], 0.0)
+
+    def test_students_below_threshold(self):
+        below = get_students_below_threshold(self.offering)
+
+        self.assertEqual(
+            sorted(student.username for student in below),
+            ["21cs001", "21cs003"]
+        )
+
+    def test_export_csv_has_one_row_per_enrolled_student(self):
+        self.client.force_login(self.faculty)
+
+        response = self.client.get(
+            reverse("attendance:export_attendance_csv", args=[self.offering.id])
+        )
+
+        lines = response.content.decode().strip().splitlines()
+        self.assertEqual(lines[0], "Roll No,Student Name,Present,Absent,Percentage,Status")
+        self.assertEqual(len(lines), 1 + len(self.students))
+        self.assertIn("21cs001,Student1,0,2,0.0,DETENTION", lines)
+
+
+class AttendanceTallyTests(AttendanceTestCase):
+
+    def tally(self, student, offering=None):
+        return AttendanceTally.objects.get(
+            student=student, offering=offering or self.offering
+        )
+
+    def test_marking_and_editing_keep_tallies_equal_to_a_recount(self):
+        session_id = self.mark([PRESENT, ABSENT, LATE, EXCUSED])
+        self.mark([ABSENT, ABSENT, PRESENT, PRESENT], start="11:00", end="12:00")
+
+        apply_attendance_edits(
+            AttendanceSession.objects.get(pk=session_id),
+            {self.students[1].id: PRESENT, self.students[3].id: ABSENT},
+            edited_by=self.faculty,
+        )
+
+        self.assertEqual(find_tally_drift(), [])
+
+        tally = self.tally(self.students[1])
+        self.assertEqual((tally.present, tally.absent, tally.total_sessions), (1, 1, 2))
+
+    def test_session_without_records_is_counted_once_when_marked(self):
+        # e.g. left behind by an interrupted request
+        AttendanceSession.objects.create(
+            course_offering=self.offering,
+            faculty=self.faculty,
+            date=timezone.localdate(),
+            start_time=datetime.time(9),
+            end_time=datetime.time(10),
+        )
+
+        self.client.force_login(self.faculty)
+        self.client.post(
+            reverse("attendance:faculty_attendance_mark", args=[self.offering.id]),
+            {
+                "date": timezone.localdate().isoformat(),
+                "start_time": "09:00",
+                "end_time": "10:00",
+                f"status_{self.students[0].id}": PRESENT,
+            },
+        )
+
+        self.assertEqual(AttendanceSession.objects.filter(course_offering=self.offering).count(), 1)
+        self.assertEqual(self.tally(self.students[0]).total_sessions, 1)
+        self.assertEqual(find_tally_drift(), [])
+
+    def test_rebuild_command_reports_and_fixes_drift(self):
+        self.mark([PRESENT, PRESENT, PRESENT, PRESENT])
+        AttendanceTally.objects.filter(student=self.students[0]).update(present=5)
+
+        out = StringIO()
+        call_command("rebuild_attendance_tallies", "--check", stdout=out)
+        self.assertIn("1 tally row(s) drifted", out.getvalue())
+
+        call_command("rebuild_attendance_tallies", stdout=StringIO())
+        self.assertEqual(find_tally_drift(), [])
+
+    def test_student_without_tally_row_is_absent_for_sessions_held(self):
+        self.mark([PRESENT, PRESENT, PRESENT, PRESENT])
+
+        late_joiner = User.objects.create_user(
+            username="21cs099", email="21cs099@example.com", password="pw", role="STUDENT"
+        )
+        Enrollment.objects.create(student=late_joiner, offering=self.offering)
+
+        stats = get_course_attendance_stats(self.offering, late_joiner)
+
+        self.assertEqual(stats["total"], 1)
+        self.assertEqual(stats["status"], "DETENTION")
+        self.assertIn(late_joiner, get_students_below_threshold(self.offering))
+
+
+class AutoLockTests(AttendanceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        today = timezone.localdate()
+        self.expired = AttendanceSession.objects.get(
+            pk=self.mark([PRESENT] * 4, day=today - datetime.timedelta(days=5))
+        )
+        self.fresh = AttendanceSession.objects.get(pk=self.mark([PRESENT] * 4, day=today))
+
+    def assertStatus(self, session, status):
+        session.refresh_from_db()
+        self.assertEqual(session.status, status)
+
+    def test_locks_only_sessions_past_the_edit_window(self):
+        with self.assertNumQueries(2):
+            locked = auto_lock_expired_sessions()
+
+        self.assertEqual(locked, 1)
+        self.assertStatus(self.expired, AttendanceSession.STATUS_LOCKED)
+        self.assertStatus(self.fresh, AttendanceSession.STATUS_OPEN)
+
+    def test_without_active_config_nothing_is_locked_unless_asked(self):
+        AttendanceWindowConfig.objects.update(active=False)
+        AttendanceWindowConfig.clear_cache()
+
+        self.assertEqual(auto_lock_expired_sessions(), 0)
+        self.assertStatus(self.fresh, AttendanceSession.STATUS_OPEN)
+
+        call_command("lock_expired_attendance_sessions", "--lock-without-window", stdout=StringIO())
+        self.assertStatus(self.expired, AttendanceSession.STATUS_LOCKED)
+        self.assertStatus(self.fresh, AttendanceSession.STATUS_LOCKED)
+
+    def test_history_page_is_read_only(self):
+        self.client.force_login(self.faculty)
+
+        response = self.client.get(
+            reverse("attendance:attendance_history", args=[self.offering.id])
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertStatus(self.expired, AttendanceSession.STATUS_OPEN)
+        editable = {row["obj"].id: row["editable"] for row in response.context["sessions"]}
+        self.assertEqual(editable, {self.expired.id: False, self.fresh.id: True})
+
+
+class WindowConfigCacheTests(AttendanceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.session = AttendanceSession.objects.get(pk=self.mark([PRESENT] * 4))
+
+    def test_editability_checks_hit_the_database_once(self):
+        with self.assertNumQueries(1):
+            for _ in range(10):
+                self.assertTrue(self.session.is_editable())
+
+    def test_saving_the_config_invalidates_the_cache(self):
+        self.assertTrue(self.session.is_editable())
+
+        config = AttendanceWindowConfig.objects.get()
+        config.active = False
+        config.save()
+
+        self.assertFalse(self.session.is_editable())
+
+    def test_history_page_reads_the_config_once(self):
+        self.mark([PRESENT] * 4, start="11:00", end="12:00")
+        self.client.force_login(self.faculty)
+
+        # Drop the process cache so the request has to fetch the config
+        AttendanceWindowConfig.clear_cache()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("attendance:attendance_history", args=[self.offering.id]))
+
+        config_queries = [
+            q for q in queries.captured_queries
+            if "attendance_attendancewindowconfig" in q["sql"]
+        ]
+        self.assertEqual(len(config_queries), 1)
+
+
+class AttendanceEditTests(AttendanceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.session = AttendanceSession.objects.get(
+            pk=self.mark([PRESENT, ABSENT, PRESENT, ABSENT])
+        )
+
+    def test_edits_are_written_in_bulk_and_summarised(self):
+        statuses = {
+            self.students[0].id: PRESENT,    # unchanged
+            self.students[1].id: LATE,
+            self.students[2].id: ABSENT,
+            self.students[3].id: "asleep",   # invalid
+        }
+
+        summary = apply_attendance_edits(self.session, statuses, self.faculty, reason="recount")
+
+        self.assertEqual(
+            summary["changed"],
+            [
+                {"student_id": self.students[1].id, "old_status": ABSENT, "new_status": LATE},
+                {"student_id": self.students[2].id, "old_status": PRESENT, "new_status": ABSENT},
+            ]
+        )
+        self.assertEqual(summary["unchanged"], 1)
+        self.assertEqual(summary["ignored"], 1)
+
+        logs = AttendanceEditLog.objects.filter(attendance_record__session=self.session)
+        self.assertEqual(logs.count(), 2)
+        self.assertTrue(all(log.reason == "recount" for log in logs))
+        self.assertEqual(
+            AttendanceRecord.objects.get(session=self.session, student=self.students[3]).status,
+            ABSENT
+        )
+
+    def test_query_count_does_not_grow_with_changes(self):
+        def edit(students):
+            with CaptureQueriesContext(connection) as queries:
+                apply_attendance_edits(
+                    self.session,
+                    {student.id: LATE for student in students},
+                    self.faculty
+                )
+            return len(queries)
+
+        # One present → late change vs two absent → late changes
+        self.assertEqual(
+            edit([self.students[0]]),
+            edit([self.students[1], self.students[3]])
+        )
+
+
+class BulkMarkingTests(AttendanceTestCase):
+
+    def entry(self, offering=None, start="09:00", **extra):
+        return {
+            "offering_id": (offering or self.offering).id,
+            "date": timezone.localdate().isoformat(),
+            "start_time": start,
+            "end_time": "10:00",
+            "statuses": {str(self.students[0].id): PRESENT},
+            **extra,
+        }
+
+    def test_creates_sessions_and_reports_conflicts_per_entry(self):
+        outsider = User.objects.create_user(
+            username="21cs900", email="21cs900@example.com", password="pw", role="STUDENT"
+        )
+
+        result = mark_sessions_bulk(self.faculty, [
+            self.entry(),
+            self.entry(offering=self.other_offering, offering_id=str(self.other_offering.id)),
+            self.entry(),
+            self.entry(start="11:00", statuses={str(outsider.id): PRESENT}),
+            self.entry(offering_id=999),
+        ])
+
+        self.assertEqual([row["index"] for row in result["created"]], [0, 1])
+        self.assertEqual([row["records"] for row in result["created"]], [4, 4])
+        self.assertEqual(
+            {conflict["index"]: conflict["errors"][0] for conflict in result["conflicts"]},
+            {
+                2: "Duplicate session in this submission.",
+                3: f"Student {outsider.id} is not enrolled in this course.",
+                4: "Course offering not assigned to you.",
+            }
+        )
+        self.assertEqual(
+            AttendanceRecord.objects.get(
+                session_id=result["created"][0]["session_id"], student=self.students[1]
+            ).status,
+            ABSENT
+        )
+
+    def test_already_marked_session_is_a_conflict(self):
+        session_id = self.mark([PRESENT] * 4)
+
+        result = mark_sessions_bulk(self.faculty, [self.entry()])
+
+        self.assertEqual(result["created"], [])
+        self.assertEqual(result["conflicts"][0]["session_id"], session_id)
+
+    def test_session_created_concurrently_only_fails_its_own_entry(self):
+        # Another request marks the first session after the preload
+        self.mark([PRESENT] * 4)
+
+        with mock.patch.object(services, "_existing_sessions", return_value={}):
+            result = mark_sessions_bulk(self.faculty, [
+                self.entry(),
+                self.entry(offering=self.other_offering),
+            ])
+
+        self.assertEqual([row["index"] for row in result["created"]], [1])
+        self.assertEqual([conflict["index"] for conflict in result["conflicts"]], [0])
+        self.assertEqual(find_tally_drift(), [])
+
+    def test_endpoint(self):
+        self.client.force_login(self.faculty)
+        url = reverse("attendance:bulk_mark_attendance")
+
+        response = self.client.post(
+            url, json.dumps({"sessions": [self.entry()]}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["created"]), 1)
+
+        response = self.client.post(
+            url, json.dumps({"sessions": [self.entry()]}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 409)
+
+        response = self.client.post(url, "not json", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+
+class AttendanceReportExportTests(AttendanceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.mark([PRESENT, ABSENT, PRESENT, LATE])
+
+        self.late_joiner = User.objects.create_user(
+            username="21cs099", email="21cs099@example.com", password="pw", role="STUDENT"
+        )
+        Enrollment.objects.create(student=self.late_joiner, offering=self.offering)
+
+        self.exam_user = User.objects.create_user(
+            username="exam", email="exam@example.com", password="pw", role="EXAM_SECTION"
+        )
+        self.client.force_login(self.exam_user)
+        self.url = reverse("attendance:export_attendance_report")
+
+    def test_csv_has_a_row_for_every_enrolled_student(self):
+        response = self.client.get(self.url, {"department": self.department.id, "year": 2})
+
+        rows = list(csv.reader(
+            b"".join(response.streaming_content).decode().splitlines()
+        ))
+
+        self.assertEqual(rows[0], ["Roll No", "Student Name", "CS201", "CS202"])
+        self.assertEqual(len(rows), 1 + len(self.students) + 1)
+        # No session held yet in CS202
+        self.assertIn(["21cs001", "Student1", "0.0", ""], rows)
+        self.assertIn(["21cs099", "", "0.0", ""], rows)
+
+    def test_xlsx(self):
+        response = self.client.get(self.url, {"format": "xlsx"})
+
+        workbook = openpyxl.load_workbook(BytesIO(b"".join(response.streaming_content)))
+        rows = list(workbook.active.iter_rows(values_only=True))
+
+        self.assertEqual(rows[0], ("Roll No", "Student Name", "CS201", "CS202"))
+        self.assertEqual(len(rows), 6)
+
+    def test_non_numeric_filter_is_a_bad_request(self):
+        self.assertEqual(self.client.get(self.url, {"year": "second"}).status_code, 400)
+
+    def test_students_are_forbidden(self):
+        self.client.force_login(self.students[0])
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class ShortageNotificationTests(AttendanceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Run the dispatch inline instead of through the broker
+        patcher = mock.patch.object(
+            dispatch_notification_task, "delay", side_effect=dispatch_notification
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def mark_session(self, number, statuses):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.mark(
+                statuses,
+                day=timezone.localdate() - datetime.timedelta(days=number)
+            )
+
+    def warned(self):
+        return sorted(
+            NotificationRecipient.objects.filter(
+                notification__title="Attendance Warning"
+            ).values_list("user__username", flat=True)
+        )
+
+    def test_no_warning_before_the_minimum_number_of_sessions(self):
+        self.mark_session(0, [ABSENT, PRESENT, PRESENT, PRESENT])
+
+        self.assertEqual(self.warned(), [])
+
+    def test_warns_once_when_a_student_crosses_the_threshold(self):
+        for number in range(SHORTAGE_MIN_SESSIONS - 1):
+            self.mark_session(number, [PRESENT, ABSENT, PRESENT, PRESENT])
+        self.assertEqual(self.warned(), [])
+
+        # The minimum is reached: student 1 (0%) is now short
+        self.mark_session(10, [ABSENT, ABSENT, PRESENT, PRESENT])
+        self.assertEqual(self.warned(), ["21cs001"])
+
+        # Still short, not warned again; student 0 drops to 4/6 = 66%
+        self.mark_session(11, [ABSENT, ABSENT, PRESENT, PRESENT])
+        self.assertEqual(self.warned(), ["21cs000", "21cs001"])
+        self.assertEqual(
+            Notification.objects.filter(title="Attendance Warning").count(), 2
+        )
+
+
+class AttendanceRollupTests(AttendanceTestCase):
+
+    def rollups(self, period):
+        return list(
+            AttendanceRollup.objects.filter(
+                offering=self.offering, period=period
+            ).order_by("period_start").values_list(
+                "period_start", "sessions", "present", "absent"
+            )
+        )
+
+    def test_marking_and_editing_refresh_the_rollups(self):
+        today = timezone.localdate()
+        week_start = today - datetime.timedelta(days=today.weekday())
+
+        session_id = self.mark([PRESENT, PRESENT, ABSENT, ABSENT])
+        self.mark([PRESENT, PRESENT, PRESENT, PRESENT], start="11:00", end="12:00")
+
+        self.assertEqual(self.rollups(AttendanceRollup.PERIOD_DAY), [(today, 2, 6, 2)])
+        self.assertEqual(self.rollups(AttendanceRollup.PERIOD_WEEK), [(week_start, 2, 6, 2)])
+
+        apply_attendance_edits(
+            AttendanceSession.objects.get(pk=session_id),
+            {self.students[2].id: PRESENT},
+            edited_by=self.faculty,
+        )
+
+        self.assertEqual(self.rollups(AttendanceRollup.PERIOD_DAY), [(today, 2, 7, 1)])
+
+    def test_rebuild_matches_the_incremental_rollups(self):
+        self.mark([PRESENT, ABSENT, PRESENT, ABSENT])
+        self.mark(
+            [PRESENT, PRESENT, PRESENT, ABSENT],
+            day=timezone.localdate() - datetime.timedelta(days=1),
+        )
+        expected = {
+            period: self.rollups(period)
+            for period in (AttendanceRollup.PERIOD_DAY, AttendanceRollup.PERIOD_WEEK)
+        }
+
+        AttendanceRollup.objects.all().delete()
+        rebuild_attendance_rollups()
+
+        for period, rows in expected.items():
+            self.assertEqual(self.rollups(period), rows)
+
+    def test_trend_rejects_an_unknown_period(self):
+        self.client.force_login(self.faculty)
+
+        response = self.client.get(
+            reverse("attendance:attendance_trend", args=[self.offering.id]),
+            {"period": "month"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+class MarkAttendanceFormTests(AttendanceTestCase):
+
+    def post(self, **data):
+        self.client.force_login(self.faculty)
+        form = {"start_time": "09:00", "end_time": "10:00"}
+        form.update(data)
+        form.update({f"status_{student.id}": PRESENT for student in self.students})
+        return self.client.post(
+            reverse("attendance:faculty_attendance_mark", args=[self.offering.id]),
+            form,
+        )
+
+    def test_form_marking_stores_a_parsed_date_and_rolls_it_up(self):
+        day = timezone.localdate() - datetime.timedelta(days=1)
+
+        self.post(date=day.isoformat())
+
+        session = AttendanceSession.objects.get(course_offering=self.offering)
+        self.assertEqual(session.date, day)
+        self.assertEqual(session.start_time, datetime.time(9, 0))
+        self.assertTrue(
+            AttendanceRollup.objects.filter(
+                offering=self.offering,
+                period=AttendanceRollup.PERIOD_DAY,
+                period_start=day,
+                present=4,
+            ).exists()
+        )
+
+    def test_invalid_or_future_dates_are_rejected(self):
+        tomorrow = timezone.localdate() + datetime.timedelta(days=1)
+
+        for value in ("not-a-date", "2025-02-30", tomorrow.isoformat()):
+            response = self.post(date=value)
+            self.assertRedirects(
+                response,
+                reverse("attendance:faculty_attendance"),
+                fetch_redirect_response=False,
+            )
+
+        self.assertFalse(AttendanceSession.objects.exists())
+
+
+class AttendanceIndexTests(TestCase):
+
+    def index_names(self, model):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, model._meta.db_table
+            )
+        return {name for name, info in constraints.items() if info["index"]}
+
+    def test_hot_path_indexes_exist(self):
+        self.assertTrue(
+            {"att_record_student_status", "att_record_session_status"}
+            <= self.index_names(AttendanceRecord)
+        )
+        self.assertTrue(
+            {"att_session_offering_status", "att_session_open_end"}
+            <= self.index_names(AttendanceSession)
+        )
+
+    def test_benchmark_runs_and_rolls_back(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_attendance",
+            students=6, offerings=2, sessions=3, no_plans=True,
+            stdout=out,
+        )
 
-# Create your tests here.
+        self.assertIn("queries", out.getvalue())
+        self.assertFalse(AttendanceSession.objects.exists())
+        self.assertFalse(Department.objects.filter(name="BENCH").exists())
@@ -1,18 +1,26 @@
 import csv
+import json
+import tempfile
 from urllib import request
+
+import openpyxl
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, get_object_or_404, redirect
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
 from accounts.decorators import faculty_required, student_required
-from academics.models import CourseOffering, Enrollment
+from accounts.utils import is_exam_section, is_hod
+from academics.models import CourseOffering, Enrollment, FacultyAssignment
 from attendance.models import (
     AttendanceSession,
     AttendanceRecord,
-    AttendanceEditLog
+    AttendanceRollup
 )
-from attendance.services import auto_lock_expired_sessions, get_student_attendance_summary, get_course_attendance_stats, get_students_below_threshold
+from attendance.rollups import get_attendance_trend
+from attendance.services import VALID_STATUSES, apply_attendance_edits, get_student_attendance_summary, get_enrollment_stats, iter_attendance_matrix, mark_sessions_bulk, record_session_in_tallies
 
 @faculty_required
 def faculty_attendance_landing(request):
@@ -41,11 +49,18 @@ def mark_attendance(request, offering_id):
 
     if request.method == "POST":
 
-        session_date = request.POST["date"]
-        start_time = request.POST["start_time"]
-        end_time = request.POST["end_time"]
+        try:
+            session_date = parse_date(request.POST.get("date", ""))
+            start_time = parse_time(request.POST.get("start_time", ""))
+            end_time = parse_time(request.POST.get("end_time", ""))
+        except ValueError:
+            session_date = None
+
+        if session_date is None or start_time is None or end_time is None:
+            messages.error(request, "Invalid date or time.")
+            return redirect("attendance:faculty_attendance")
 
-        if session_date > str(timezone.now().date()):
+        if session_date > timezone.localdate():
             messages.error(request, "Cannot mark attendance for future dates.")
             return redirect("attendance:faculty_attendance")
 
@@ -57,37 +72,41 @@ def mark_attendance(request, offering_id):
                 "today": timezone.now().date()
             })
 
-        session, created = AttendanceSession.objects.get_or_create(
-            course_offering=offering,
-            faculty=request.user,
-            date=session_date,
-            start_time=start_time,
-            defaults={"end_time": end_time}
-        )
+        with transaction.atomic():
+            session, created = AttendanceSession.objects.get_or_create(
+                course_offering=offering,
+                faculty=request.user,
+                date=session_date,
+                start_time=start_time,
+                defaults={"end_time": end_time}
+            )
 
-        if AttendanceRecord.objects.filter(session=session).exists():
-            messages.error(request, "Attendance already marked for this session.")
-            return redirect("attendance:attendance_history", offering_id=offering.id)
+            if AttendanceRecord.objects.filter(session=session).exists():
+                messages.error(request, "Attendance already marked for this session.")
+                return redirect("attendance:attendance_history", offering_id=offering.id)
 
-        records = []
+            records = []
 
-        for enrollment in students:
+            for enrollment in students:
 
-            status = request.POST.get(
-                f"status_{enrollment.student.id}",
-                AttendanceRecord.STATUS_ABSENT
-            )
+                status = request.POST.get(
+                    f"status_{enrollment.student.id}",
+                    AttendanceRecord.STATUS_ABSENT
+                )
 
-            records.append(
-                AttendanceRecord(
-                    session=session,
-                    student=enrollment.student,
-                    status=status
+                if status not in VALID_STATUSES:
+                    status = AttendanceRecord.STATUS_ABSENT
+
+                records.append(
+                    AttendanceRecord(
+                        session=session,
+                        student=enrollment.student,
+                        status=status
+                    )
                 )
-            )
 
-        with transaction.atomic():
             AttendanceRecord.objects.bulk_create(records)
+            record_session_in_tallies(session, records)
 
         messages.success(request, "Attendance marked successfully.")
 
@@ -102,6 +121,27 @@ def mark_attendance(request, offering_id):
         "today": timezone.now().date()
     })
 
+@faculty_required
+@require_POST
+def bulk_mark_attendance(request):
+    """
+    JSON API for submitting several sessions at once:
+    {"sessions": [{"offering_id", "date", "start_time", "end_time",
+                   "statuses": {"<student_id>": "present", ...}}, ...]}
+    """
+    try:
+        payload = json.loads(request.body)
+        entries = payload["sessions"]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Expected a JSON body with a 'sessions' list."}, status=400)
+
+    if not isinstance(entries, list) or not all(isinstance(e, dict) for e in entries):
+        return JsonResponse({"error": "'sessions' must be a list of objects."}, status=400)
+
+    result = mark_sessions_bulk(request.user, entries)
+
+    return JsonResponse(result, status=200 if result["created"] or not entries else 409)
+
 @faculty_required
 def attendance_history(request, offering_id):
     faculty = request.user
@@ -118,12 +158,8 @@ def attendance_history(request, offering_id):
 
     session_data = []
 
+    # Expired sessions are locked by attendance.tasks; this page only reads
     for session in sessions:
-
-        # auto lock expired sessions
-        if not session.is_editable() and session.status != AttendanceSession.STATUS_LOCKED:
-            session.lock()
-
         session_data.append({
             "obj": session,
             "editable": session.is_editable()
@@ -162,24 +198,26 @@ def edit_attendance(request, session_id):
         })
     
     if request.method == "POST":
-        for record in records:
-            new_status = request.POST.get(f"status_{record.student.id}")
-
-            if new_status and new_status != record.status:
-                AttendanceEditLog.objects.create(
-                    attendance_record=record,
-                    edited_by=faculty,
-                    old_status=record.status,
-                    new_status=new_status,
-                    reason=request.POST.get("reason", "")
-                )
+        statuses = {
+            int(key[len("status_"):]): value
+            for key, value in request.POST.items()
+            if key.startswith("status_") and key[len("status_"):].isdigit()
+        }
+
+        summary = apply_attendance_edits(
+            session,
+            statuses,
+            edited_by=faculty,
+            reason=request.POST.get("reason", "")
+        )
 
-                record.status = new_status
-                record.save(update_fields=["status"])
-        messages.success(request, "Attendance updated successfully.")
+        messages.success(
+            request,
+            f"Attendance updated successfully. {len(summary['changed'])} record(s) changed."
+        )
         return redirect(
             "attendance:attendance_history",
-            offering_id=session.course_offering.id
+            offering_id=session.course_offering_id
         )
 
     return render(request, "dashboard/faculty_attendance_edit.html", {
@@ -219,14 +257,7 @@ def export_attendance_csv(request, offering_id):
         "Status"
     ])
 
-    enrollments = Enrollment.objects.filter(
-        offering=offering
-    ).select_related("student")
-
-    for enrollment in enrollments:
-        student = enrollment.student
-        stats = get_course_attendance_stats(offering, student)
-
+    for student, stats in get_enrollment_stats(offering):
         writer.writerow([
             student.username,
             student.get_full_name(),
@@ -237,3 +268,113 @@ def export_attendance_csv(request, offering_id):
         ])
 
     return response
+
+
+class _Echo:
+    """File-like object that hands each CSV line straight back."""
+
+    def write(self, value):
+        return value
+
+
+@login_required
+def export_attendance_report(request):
+    """
+    Department / year / semester wide attendance export for the exam cell
+    (and HODs for their own department): one row per student, one column
+    per course. ?format=xlsx for a spreadsheet, CSV otherwise.
+    """
+    hod = is_hod(request.user)
+
+    if not (is_exam_section(request.user) or hod):
+        return HttpResponseForbidden()
+
+    offerings = CourseOffering.objects.all()
+
+    department_id = request.GET.get("department")
+    year = request.GET.get("year")
+    semester_id = request.GET.get("semester")
+
+    for name, value in (("department", department_id), ("year", year), ("semester", semester_id)):
+        if value and not value.isdigit():
+            return HttpResponseBadRequest(f"{name} must be a number.")
+
+    if hod and not is_exam_section(request.user):
+        department_id = request.user.facultyprofile.department_id
+
+    if department_id:
+        offerings = offerings.filter(department_id=department_id)
+    if year:
+        offerings = offerings.filter(year=year)
+    if semester_id:
+        offerings = offerings.filter(semester_id=semester_id)
+
+    rows = iter_attendance_matrix(offerings)
+
+    if request.GET.get("format") == "xlsx":
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Attendance")
+
+        for row in rows:
+            ws.append(row)
+
+        # Write-only rows are flushed to disk as they are appended
+        output = tempfile.TemporaryFile()
+        wb.save(output)
+        output.seek(0)
+
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename="attendance_report.xlsx",
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+
+    writer = csv.writer(_Echo())
+
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in rows),
+        content_type="text/csv"
+    )
+    response["Content-Disposition"] = 'attachment; filename="attendance_report.csv"'
+
+    return response
+
+
+@login_required
+def attendance_trend(request, offering_id):
+    """
+    JSON series of daily or weekly presence rates for an offering, served
+    from AttendanceRollup. ?period=day|week&start=YYYY-MM-DD&end=YYYY-MM-DD
+    """
+    offering = get_object_or_404(
+        CourseOffering.objects.select_related("course"),
+        id=offering_id
+    )
+
+    user = request.user
+    allowed = (
+        is_exam_section(user)
+        or (is_hod(user) and user.facultyprofile.department_id == offering.department_id)
+        or FacultyAssignment.objects.filter(faculty=user, offering=offering).exists()
+    )
+
+    if not allowed:
+        return HttpResponseForbidden()
+
+    period = request.GET.get("period", AttendanceRollup.PERIOD_DAY)
+    if period not in (AttendanceRollup.PERIOD_DAY, AttendanceRollup.PERIOD_WEEK):
+        return JsonResponse({"error": "period must be 'day' or 'week'."}, status=400)
+
+    try:
+        start = parse_date(request.GET.get("start", ""))
+        end = parse_date(request.GET.get("end", ""))
+    except ValueError:
+        return JsonResponse({"error": "Invalid start or end date."}, status=400)
+
+    return JsonResponse({
+        "offering_id": offering.id,
+        "course_code": offering.course.course_code,
+        "period": period,
+        "series": get_attendance_trend(offering, period, start, end),
+    })
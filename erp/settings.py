@@ -59,6 +59,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'attendance.middleware.AttendanceWindowSnapshotMiddleware',
 ]
 
 ROOT_URLCONF = 'erp.urls'
@@ -157,6 +158,23 @@ MEDIA_ROOT = BASE_DIR / "media"
 CELERY_BROKER_URL = 'redis://redis:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
+CELERY_BEAT_SCHEDULE = {
+    'lock-expired-attendance-sessions': {
+        'task': 'attendance.tasks.lock_expired_sessions_task',
+        'schedule': 60 * 60,
+    },
+    'archive-read-notifications': {
+        'task': 'notifications.tasks.archive_read_notifications_task',
+        'schedule': 60 * 60 * 24,
+    },
+}
+NOTIFICATION_RETENTION_DAYS = config('NOTIFICATION_RETENTION_DAYS', default=180, cast=int)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('REDIS_CACHE_URL', default='redis://redis:6379/1'),
+    }
+}
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
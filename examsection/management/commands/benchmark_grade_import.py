@@ -0,0 +1,138 @@
+import io
+import time
+
+import openpyxl
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import Department, StudentProfile
+from academics.models import AcademicYear, Course, CourseOffering, Enrollment, Semester
+from examsection.services.excel_grade_import import process_grade_excel
+from grades.utils.grade_validations import ALLOWED_GRADES
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a synthetic grades workbook (students x courses rows), import it "
+        "with process_grade_excel and report timing and query count. "
+        "Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=1000)
+        parser.add_argument("--courses", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                semester, exam_user = self.seed(options)
+                workbook = self.build_workbook(semester)
+                self.run(workbook, semester, exam_user)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def seed(self, options):
+        started = time.perf_counter()
+
+        department = Department.objects.create(name="BENCH")
+        academic_year = AcademicYear.objects.create(start_year=1990, end_year=1991)
+        semester = Semester.objects.create(academic_year=academic_year, year=1, semester=1)
+        exam_user = User.objects.create(
+            username="bench_exam", email="bench_exam@bench.local", role="EXAM_SECTION"
+        )
+
+        User.objects.bulk_create([
+            User(username=f"bench{i:05d}", email=f"bench{i:05d}@bench.local", role="STUDENT")
+            for i in range(options["students"])
+        ])
+        students = list(User.objects.filter(username__startswith="bench0"))
+
+        StudentProfile.objects.bulk_create([
+            StudentProfile(user=student, department=department, year=1, section="A")
+            for student in students
+        ])
+
+        offerings = []
+        for i in range(options["courses"]):
+            course = Course.objects.create(
+                course_code=f"BN{i:03d}",
+                course_title=f"Benchmark {i}",
+                credits=3,
+                category="PCC",
+                department=department
+            )
+            offerings.append(CourseOffering.objects.create(
+                course=course,
+                academic_year=academic_year,
+                semester=semester,
+                department=department,
+                year=1,
+                section="A"
+            ))
+
+        Enrollment.objects.bulk_create(
+            [
+                Enrollment(student=student, offering=offering)
+                for offering in offerings
+                for student in students
+            ],
+            batch_size=5000
+        )
+
+        self.stdout.write(
+            f"Seeded {len(students)} students x {len(offerings)} courses "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+        self.enrollments = [
+            (student.username, offering.course)
+            for student in students
+            for offering in offerings
+        ]
+
+        return semester, exam_user
+
+    def build_workbook(self, semester):
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(["Roll No", "Name", "Course Code", "Course Name", "Grade"])
+
+        for n, (username, course) in enumerate(self.enrollments):
+            ws.append([
+                username,
+                username,
+                course.course_code,
+                course.course_title,
+                ALLOWED_GRADES[n % len(ALLOWED_GRADES)]
+            ])
+
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        buffer.seek(0)
+
+        self.stdout.write(f"Workbook: {len(self.enrollments)} rows, {buffer.getbuffer().nbytes} bytes")
+        return buffer
+
+    def run(self, workbook, semester, exam_user):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            result = process_grade_excel(workbook, semester, exam_user)
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"process_grade_excel: {elapsed:.2f}s, {len(ctx.captured_queries)} queries, "
+            f"result={ {k: v for k, v in result.items() if k != 'errors'} }"
+        )
+
+        if result.get("errors"):
+            self.stdout.write(f"First errors: {result['errors'][:5]}")
@@ -1,4 +1,4 @@
-# grades/services/excel_grades_submit.py
+# examsection/services/excel_grade_import.py
 
 import openpyxl
 
@@ -6,8 +6,10 @@ from django.db import transaction
 
 from accounts.models import StudentProfile
 
-from academics.models import Course
+from academics.models import Course, Enrollment
 from grades.models import FinalGrade
+from grades.services.grade_points import is_backlog_grade
+from grades.services.progress import invalidate_offering_progress
 
 from grades.utils.grade_validations import (
     validate_grade,
@@ -16,21 +18,109 @@ from grades.utils.grade_validations import (
 )
 
 
+def _read_rows(file):
+    """
+    Streams the sheet and returns cleaned rows with their row numbers.
+    """
+
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+
+    try:
+        rows = []
+
+        for row_index, row in enumerate(
+            workbook.active.iter_rows(min_row=2, values_only=True), start=2
+        ):
+            row = tuple(row[:5]) + (None,) * (5 - len(row))
+
+            if all(value is None for value in row):
+                continue
+
+            rows.append((row_index,) + row)
+    finally:
+        workbook.close()
+
+    return rows
+
+
+def _load_lookups(rows, semester):
+    """
+    Preloads everything the row validation needs with four queries:
+    students by username, the known course codes, the semester's
+    enrollments by (student, course_code) and the students' existing grades.
+
+    Courses are resolved through the student's enrollment rather than the
+    student's department, so common and service courses offered by other
+    departments are found too.
+    """
+
+    usernames = {str(r[1]).strip() for r in rows if r[1] is not None}
+    course_codes = {str(r[3]).strip() for r in rows if r[3] is not None}
+
+    students = dict(
+        StudentProfile.objects.filter(
+            user__username__in=usernames
+        ).values_list("user__username", "user_id")
+    )
+
+    known_codes = set(
+        Course.objects.filter(
+            course_code__in=course_codes
+        ).values_list("course_code", flat=True)
+    )
+
+    offerings = {
+        (student_id, code): (course_id, offering_id)
+        for student_id, code, course_id, offering_id in Enrollment.objects.filter(
+            student_id__in=students.values(),
+            offering__semester=semester,
+            offering__course__course_code__in=known_codes,
+            is_active=True
+        ).values_list(
+            "student_id",
+            "offering__course__course_code",
+            "offering__course_id",
+            "offering_id"
+        )
+    }
+
+    existing = set()
+    last_attempts = {}
+
+    for student_id, course_id, semester_id, attempt in FinalGrade.objects.filter(
+        student_id__in=students.values(),
+        course_id__in={course_id for course_id, _ in offerings.values()}
+    ).values_list(
+        "student_id", "course_id", "course_offering__semester_id", "attempt_number"
+    ):
+        key = (student_id, course_id)
+        if semester_id == semester.id:
+            existing.add(key)
+        last_attempts[key] = max(attempt, last_attempts.get(key, 0))
+
+    return students, known_codes, offerings, existing, last_attempts
+
+
 def process_grade_excel(file, semester, uploaded_by):
 
-    workbook = openpyxl.load_workbook(file)
-    sheet = workbook.active
+    try:
+        rows = _read_rows(file)
+    except Exception:
+        return {
+            "success": False,
+            "errors": ["Invalid Excel file"]
+        }
+
+    students, known_codes, offerings, existing, last_attempts = _load_lookups(
+        rows, semester
+    )
 
     errors = []
     grade_objects = []
 
     seen_records = set()
 
-    for row_index, row in enumerate(
-        sheet.iter_rows(min_row=2, values_only=True), start=2
-    ):
-
-        roll_no, student_name, course_code, course_name, grade = row
+    for row_index, roll_no, student_name, course_code, course_name, grade in rows:
 
         # ----------------------------
         # Roll number validation
@@ -58,7 +148,7 @@ def process_grade_excel(file, semester, uploaded_by):
 
         roll_no = str(roll_no).strip()
         course_code = str(course_code).strip()
-        grade = str(grade).strip()
+        grade = str(grade).strip().upper()
 
         # ----------------------------
         # Duplicate detection
@@ -78,41 +168,39 @@ def process_grade_excel(file, semester, uploaded_by):
         # Student lookup
         # ----------------------------
 
-        try:
-            student = StudentProfile.user.objects.get(roll_no=roll_no)
-
-        except StudentProfile.DoesNotExist:
-
+        if roll_no not in students:
             errors.append(
                 f"Row {row_index}: Student {roll_no} not found"
             )
             continue
 
+        student_id = students[roll_no]
+
         # ----------------------------
-        # Course lookup
+        # Course lookup (student's enrollment this semester)
         # ----------------------------
 
-        try:
-            course = Course.objects.get(code=course_code)
+        if course_code not in known_codes:
+            errors.append(
+                f"Row {row_index}: Course {course_code} not found"
+            )
+            continue
 
-        except Course.DoesNotExist:
+        enrolled = offerings.get((student_id, course_code))
 
+        if enrolled is None:
             errors.append(
-                f"Row {row_index}: Course {course_code} not found"
+                f"Row {row_index}: {roll_no} is not enrolled in {course_code} this semester"
             )
             continue
 
+        course_id, offering_id = enrolled
+
         # ----------------------------
         # Prevent duplicate grades
         # ----------------------------
 
-        existing = FinalGrade.objects.filter(
-            student=student,
-            course=course,
-            semester=semester
-        ).exists()
-
-        if existing:
+        if (student_id, course_id) in existing:
             errors.append(
                 f"Row {row_index}: Grade already exists for {roll_no}"
             )
@@ -120,12 +208,13 @@ def process_grade_excel(file, semester, uploaded_by):
 
         grade_objects.append(
             FinalGrade(
-                student=student,
-                course=course,
-                semester=semester,
-                grade=grade,
-                uploaded_by=uploaded_by,
-                status="draft"
+                student_id=student_id,
+                course_id=course_id,
+                course_offering_id=offering_id,
+                grade_letter=grade,
+                attempt_number=last_attempts.get((student_id, course_id), 0) + 1,
+                is_backlog=is_backlog_grade(grade),
+                published_by=uploaded_by
             )
         )
 
@@ -145,9 +234,11 @@ def process_grade_excel(file, semester, uploaded_by):
 
     with transaction.atomic():
 
-        FinalGrade.objects.bulk_create(grade_objects)
+        FinalGrade.objects.bulk_create(grade_objects, batch_size=1000)
+
+    invalidate_offering_progress(semester.id)
 
     return {
         "success": True,
         "records_inserted": len(grade_objects)
-    }
\ No newline at end of file
+    }
@@ -1,3 +1,160 @@
+from io import BytesIO
+
+import openpyxl
 from django.test import TestCase
 
-# Create your tests here.
+from academics.models import AcademicYear, Course, CourseOffering, Enrollment, Semester
+from accounts.models import Department, StudentProfile, User
+from examsection.services.excel_grade_import import process_grade_excel
+from grades.models import FinalGrade
+
+HEADER = ["Roll No", "Name", "Course Code", "Course Name", "Grade"]
+
+
+def make_workbook(rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(HEADER)
+    for row in rows:
+        ws.append(row)
+    output = BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
+class ExcelGradeImportTests(TestCase):
+    """
+    CSE students taking their own CS101 and MA101, a service course owned
+    by the maths department.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cse = Department.objects.create(name="CSE")
+        cls.maths = Department.objects.create(name="MATHS")
+        academic_year = AcademicYear.objects.create(start_year=2025, end_year=2026)
+        cls.semester = Semester.objects.create(academic_year=academic_year, year=1, semester=1)
+        cls.next_semester = Semester.objects.create(academic_year=academic_year, year=1, semester=2)
+
+        cls.exam = User.objects.create_user(
+            username="exam", email="exam@example.com", password="pw", role="EXAM_SECTION"
+        )
+
+        cls.programming = Course.objects.create(
+            course_code="CS101", course_title="Programming", credits=4,
+            category="ESC", department=cls.cse,
+        )
+        cls.calculus = Course.objects.create(
+            course_code="MA101", course_title="Calculus", credits=4,
+            category="BSC", department=cls.maths,
+        )
+        Course.objects.create(
+            course_code="PH101", course_title="Physics", credits=3,
+            category="BSC", department=cls.cse,
+        )
+
+        cls.offerings = {}
+        for semester in (cls.semester, cls.next_semester):
+            for course in (cls.programming, cls.calculus):
+                cls.offerings[semester, course] = CourseOffering.objects.create(
+                    course=course, academic_year=academic_year, semester=semester,
+                    department=cls.cse, year=1, section="A",
+                )
+
+        cls.students = []
+        for i in range(3):
+            student = User.objects.create_user(
+                username=f"25cs{i:03d}", email=f"25cs{i:03d}@example.com",
+                password="pw", role="STUDENT",
+            )
+            StudentProfile.objects.create(
+                user=student, department=cls.cse, year=1, section="A"
+            )
+            for course in (cls.programming, cls.calculus):
+                Enrollment.objects.create(
+                    student=student, offering=cls.offerings[cls.semester, course]
+                )
+            cls.students.append(student)
+
+    def test_grades_of_service_courses_are_imported(self):
+        rows = [
+            [student.username, "", code, "", grade]
+            for student in self.students
+            for code, grade in (("CS101", "A"), ("MA101", "f"))
+        ]
+
+        result = process_grade_excel(make_workbook(rows), self.semester, self.exam)
+
+        self.assertEqual(result, {"success": True, "records_inserted": 6})
+        calculus = FinalGrade.objects.filter(course=self.calculus)
+        self.assertEqual(calculus.count(), 3)
+        self.assertEqual(
+            set(calculus.values_list("course_offering", "grade_letter", "is_backlog")),
+            {(self.offerings[self.semester, self.calculus].id, "F", True)},
+        )
+
+    def test_every_row_error_is_reported_and_nothing_written(self):
+        first, second, _ = self.students
+        FinalGrade.objects.create(
+            student=second, course=self.programming,
+            course_offering=self.offerings[self.semester, self.programming],
+            grade_letter="B", published_by=self.exam,
+        )
+
+        result = process_grade_excel(make_workbook([
+            [first.username, "", "CS101", "", "A"],
+            [first.username, "", "CS101", "", "B"],
+            [first.username, "", "XX999", "", "A"],
+            [first.username, "", "PH101", "", "A"],
+            [second.username, "", "CS101", "", "A"],
+            ["99zz999", "", "CS101", "", "A"],
+            [first.username, "", "MA101", "", "Q"],
+        ]), self.semester, self.exam)
+
+        self.assertFalse(result["success"])
+        self.assertEqual(result["errors"], [
+            f"Row 3: Duplicate record for {first.username} CS101",
+            "Row 4: Course XX999 not found",
+            f"Row 5: {first.username} is not enrolled in PH101 this semester",
+            f"Row 6: Grade already exists for {second.username}",
+            "Row 7: Student 99zz999 not found",
+            "Row 8: Invalid grade 'Q'",
+        ])
+        self.assertEqual(FinalGrade.objects.count(), 1)
+
+    def test_repeat_students_get_the_next_attempt(self):
+        student = self.students[0]
+        FinalGrade.objects.create(
+            student=student, course=self.calculus,
+            course_offering=self.offerings[self.semester, self.calculus],
+            grade_letter="F", is_backlog=True, published_by=self.exam,
+        )
+        Enrollment.objects.create(
+            student=student,
+            offering=self.offerings[self.next_semester, self.calculus],
+            is_repeat=True,
+        )
+
+        result = process_grade_excel(
+            make_workbook([[student.username, "", "MA101", "", "C"]]),
+            self.next_semester,
+            self.exam,
+        )
+
+        self.assertTrue(result["success"])
+        retake = FinalGrade.objects.get(
+            course_offering=self.offerings[self.next_semester, self.calculus]
+        )
+        self.assertEqual((retake.attempt_number, retake.is_backlog), (2, False))
+
+    def test_query_count_does_not_grow_with_the_rows(self):
+        rows = [
+            [student.username, "", code, "", "B"]
+            for student in self.students
+            for code in ("CS101", "MA101")
+        ]
+
+        # Four lookups, then one insert in a savepoint
+        with self.assertNumQueries(7):
+            process_grade_excel(make_workbook(rows), self.semester, self.exam)
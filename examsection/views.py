@@ -4,6 +4,7 @@ from django.contrib.auth.decorators import login_required
 from academics.models import CourseOffering
 from accounts.utils import is_exam_section, is_faculty
 from grades.models import FinalGrade, MarksSubmission
+from grades.services.progress import get_offering_progress
 
 from django.db.models import Count, Q
 from django.http import HttpResponse
@@ -16,8 +17,6 @@ def exam_dashboard(request):
     if not is_exam_section(request.user):
         return HttpResponseForbidden()
 
-    offerings = CourseOffering.objects.select_related("course", "semester")
-
     year_map = {
         1: [],
         2: [],
@@ -25,32 +24,12 @@ def exam_dashboard(request):
         4: []
     }
 
-    for offering in offerings:
+    for row in get_offering_progress():
 
-        sem_number = offering.semester.semester
+        sem_number = row["offering"].semester.semester
         year = (sem_number + 1) // 2   # 1→Year1, 3→Year2 etc.
 
-        submissions = MarksSubmission.objects.filter(course_offering=offering)
-        grades = FinalGrade.objects.filter(course_offering=offering)
-
-        total_students = submissions.count()
-        locked = submissions.filter(is_locked=True).count()
-
-        grades_uploaded = grades.count()
-        frozen = grades.filter(is_frozen=True).count()
-
-        ready = (
-            total_students > 0 and
-            locked == total_students and
-            grades_uploaded == total_students and
-            frozen == total_students
-        )
-
-        year_map[year].append({
-            "offering": offering,
-            "total_students": total_students,
-            "ready": ready
-        })
+        year_map[year].append(row)
 
     return render(request, "exam/dashboard.html", {
         "year_map": year_map
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.models import CourseOffering
+from grades.services.relative_grading import compute_relative_grades
+
+
+class Command(BaseCommand):
+    help = "Compute relative (curve) grades for a course offering from its locked marks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("offering", type=int, help="Course offering id.")
+        parser.add_argument(
+            "--by",
+            required=True,
+            help="Username recorded as publisher of the computed grades.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the computed grades without saving them.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            offering = CourseOffering.objects.select_related("course").get(
+                pk=options["offering"]
+            )
+            user = get_user_model().objects.get(username=options["by"])
+        except (CourseOffering.DoesNotExist, get_user_model().DoesNotExist) as e:
+            raise CommandError(str(e))
+
+        result = compute_relative_grades(offering, user, dry_run=options["dry_run"])
+
+        self.stdout.write(f"Mean {result['mean']}, std {result['std']}")
+        for row in result["grades"]:
+            self.stdout.write(
+                f"{row['roll_no']:<15} {row['total']:>7.2f} {row['z']:>6.2f}  {row['grade']}"
+            )
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run: nothing saved."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Saved {result['written']} grade(s)."))
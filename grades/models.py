@@ -1,13 +1,130 @@
-from django.db import models
+from django.db import models, router
+from django.db.models.signals import post_save, pre_save
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
+from django.dispatch import Signal
 
 from academics.models import Course
 
 User = get_user_model()
 
+# Sent after offering rows were locked by a queryset UPDATE, which sends no
+# post_save; semester_ids → semesters of the locked rows' offerings.
+offering_rows_locked = Signal()
 
-class MarksSubmission(models.Model):
+
+class LockableQuerySet(models.QuerySet):
+
+    def lock_all(self):
+        """
+        Locks every row of the queryset with one UPDATE.
+        """
+        field = self.model.lock_field
+        return self.filter(**{field: False}).update(**{field: True})
+
+
+class OfferingLockableQuerySet(LockableQuerySet):
+    """
+    Lockable rows that belong to a course offering (marks and grades).
+    """
+
+    def lock_all(self):
+        semester_ids = set(
+            self.filter(**{self.model.lock_field: False}).order_by().values_list(
+                "course_offering__semester_id", flat=True
+            ).distinct()
+        )
+
+        updated = super().lock_all()
+
+        if updated:
+            offering_rows_locked.send(
+                sender=self.model,
+                semester_ids=semester_ids
+            )
+
+        return updated
+
+
+class FinalGradeQuerySet(OfferingLockableQuerySet):
+
+    def freeze_all(self):
+        return self.lock_all()
+
+
+class LockableModel(models.Model):
+    """
+    Rows whose lock_field is set are immutable. Saving an existing row is
+    one UPDATE ... WHERE <lock_field> = false; only when it matches nothing
+    is the row looked up, to tell a locked row from a deleted one. A stale
+    in-memory copy therefore cannot overwrite a row locked since loading.
+    """
+    lock_field = "is_locked"
+    lock_error = "Locked record cannot be modified."
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self.pk is None or kwargs.get("force_insert"):
+            return super().save(*args, **kwargs)
+
+        cls = type(self)
+        using = kwargs.get("using") or router.db_for_write(cls, instance=self)
+        update_fields = kwargs.get("update_fields")
+
+        if update_fields is not None:
+            update_fields = frozenset(update_fields)
+            if not update_fields:
+                return
+        elif deferred := self.get_deferred_fields():
+            # Like Model.save(): only the loaded fields of a deferred instance
+            update_fields = frozenset(
+                field.attname for field in self._meta.concrete_fields
+                if field.attname not in deferred
+            )
+
+        pre_save.send(
+            sender=cls, instance=self, raw=False, using=using,
+            update_fields=update_fields
+        )
+
+        values = {
+            field.attname: field.pre_save(self, False)
+            for field in self._meta.concrete_fields
+            if not field.primary_key and (
+                update_fields is None or
+                field.name in update_fields or
+                field.attname in update_fields
+            )
+        }
+
+        rows = cls._base_manager.using(using).filter(pk=self.pk)
+
+        if not rows.filter(**{self.lock_field: False}).update(**values):
+            if rows.exists():
+                raise ValidationError(self.lock_error)
+
+            # Deleted meanwhile: insert it again, as Model.save() would
+            self._state.adding = True
+            return super().save(*args, **kwargs)
+
+        self._state.db = using
+        post_save.send(
+            sender=cls, instance=self, created=False, update_fields=update_fields,
+            raw=False, using=using
+        )
+
+    def lock(self):
+        """
+        Locks the row with one UPDATE. Only the lock flag is persisted;
+        other unsaved changes on the instance are not written.
+        """
+        type(self).objects.filter(pk=self.pk).lock_all()
+        setattr(self, self.lock_field, True)
+
+
+class MarksSubmission(LockableModel):
     student = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -42,18 +159,11 @@ class MarksSubmission(models.Model):
             models.Index(fields=["student"])
         ]
 
-    def save(self, *args, **kwargs):
-        if self.pk:
-            old = MarksSubmission.objects.get(pk=self.pk)
-            if old.is_locked:
-                raise ValidationError("Locked marks cannot be modified.")
-        super().save(*args, **kwargs)
+    lock_error = "Locked marks cannot be modified."
 
-    def lock(self):
-        self.is_locked = True
-        self.save()
+    objects = OfferingLockableQuerySet.as_manager()
 
-class FinalGrade(models.Model):
+class FinalGrade(LockableModel):
     student = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -83,18 +193,15 @@ class FinalGrade(models.Model):
     class Meta:
         unique_together = ["student", "course", "attempt_number"]
 
-    def save(self, *args, **kwargs):
-        if self.pk:
-            old = FinalGrade.objects.get(pk=self.pk)
-            if old.is_frozen:
-                raise ValidationError("Frozen grades cannot be modified.")
-        super().save(*args, **kwargs)
+    lock_field = "is_frozen"
+    lock_error = "Frozen grades cannot be modified."
+
+    objects = FinalGradeQuerySet.as_manager()
 
     def freeze(self):
-        self.is_frozen = True
-        self.save()
+        self.lock()
 
-class SemesterResult(models.Model):
+class SemesterResult(LockableModel):
     student = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -123,13 +230,85 @@ class SemesterResult(models.Model):
     class Meta:
         unique_together = ("student", "semester")
 
-    def save(self, *args, **kwargs):
-        if self.pk:
-            old = SemesterResult.objects.get(pk=self.pk)
-            if old.is_locked:
-                raise ValidationError("Locked semester result cannot be modified.")
-        super().save(*args, **kwargs)
+    lock_error = "Locked semester result cannot be modified."
 
-    def lock(self):
-        self.is_locked = True
-        self.save()
\ No newline at end of file
+    objects = LockableQuerySet.as_manager()
+
+class GradeImportJob(models.Model):
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("parsing", "Parsing"),
+        ("ready", "Ready for review"),
+        ("failed", "Failed"),
+        ("applied", "Applied"),
+    )
+
+    course_offering = models.ForeignKey(
+        "academics.CourseOffering",
+        on_delete=models.CASCADE,
+        related_name="grade_import_jobs"
+    )
+
+    file = models.FileField(upload_to="grade_imports/")
+
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name="grade_import_jobs"
+    )
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+
+    # Problems that concern the whole file rather than a single row
+    message = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Grade import #{self.pk} ({self.status})"
+
+    @property
+    def progress(self):
+        if not self.total_rows:
+            return 0
+        return round(self.processed_rows * 100 / self.total_rows)
+
+
+class GradeImportRow(models.Model):
+    """
+    Staged row of a GradeImportJob; only copied to FinalGrade on confirm.
+    """
+    job = models.ForeignKey(
+        GradeImportJob,
+        on_delete=models.CASCADE,
+        related_name="rows"
+    )
+
+    row_number = models.PositiveIntegerField()
+    roll_no = models.CharField(max_length=50)
+    name = models.CharField(max_length=200, blank=True)
+    grade_letter = models.CharField(max_length=2, blank=True)
+
+    student = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+
+    error = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ["row_number"]
+        indexes = [
+            models.Index(fields=["job", "row_number"]),
+        ]
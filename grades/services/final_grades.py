@@ -0,0 +1,75 @@
+# grades/services/final_grades.py
+
+from django.db import transaction
+from django.db.models import Max
+
+from grades.models import FinalGrade
+from grades.services.grade_points import is_backlog_grade
+from grades.services.progress import invalidate_offering_progress
+
+
+def upsert_final_grades(offering, grades, published_by):
+    """
+    Writes {student_id: grade_letter} for an offering with one bulk_update
+    and one bulk_create. Frozen grades are left untouched; new rows of
+    repeat students get the attempt after their last one.
+
+    Returns the number of grades written.
+    """
+
+    existing = {
+        g.student_id: g
+        for g in FinalGrade.objects.filter(course_offering=offering)
+    }
+
+    to_update = []
+    new_students = []
+
+    for student_id, letter in grades.items():
+        grade = existing.get(student_id)
+
+        if grade is None:
+            new_students.append(student_id)
+            continue
+
+        if grade.is_frozen:
+            continue
+
+        grade.grade_letter = letter
+        grade.is_backlog = is_backlog_grade(letter)
+        grade.published_by = published_by
+        to_update.append(grade)
+
+    last_attempts = dict(
+        FinalGrade.objects.filter(
+            course_id=offering.course_id,
+            student_id__in=new_students
+        ).values("student_id").annotate(
+            last=Max("attempt_number")
+        ).values_list("student_id", "last")
+    ) if new_students else {}
+
+    to_create = [
+        FinalGrade(
+            student_id=student_id,
+            course_id=offering.course_id,
+            course_offering=offering,
+            grade_letter=grades[student_id],
+            attempt_number=last_attempts.get(student_id, 0) + 1,
+            is_backlog=is_backlog_grade(grades[student_id]),
+            published_by=published_by,
+        )
+        for student_id in new_students
+    ]
+
+    with transaction.atomic():
+        FinalGrade.objects.bulk_update(
+            to_update,
+            ["grade_letter", "is_backlog", "published_by"],
+            batch_size=1000
+        )
+        FinalGrade.objects.bulk_create(to_create, batch_size=1000)
+
+    invalidate_offering_progress(offering.semester_id)
+
+    return len(to_update) + len(to_create)
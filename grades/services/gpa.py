@@ -0,0 +1,116 @@
+# grades/services/gpa.py
+
+from itertools import groupby
+from operator import attrgetter
+
+from django.db.models import Q
+
+from grades.models import FinalGrade
+from grades.services.grade_points import (
+    best_attempts,
+    grade_point,
+    is_backlog_grade,
+)
+
+PUBLISHED = Q(is_published=True)
+FROZEN = Q(is_frozen=True)
+
+
+def _weighted_average(grades):
+    total_points = 0
+    total_credits = 0
+
+    for g in grades:
+        credits = g.course.credits
+        if not credits:
+            continue
+        total_points += grade_point(g.grade_letter) * credits
+        total_credits += credits
+
+    if total_credits == 0:
+        return 0, 0
+
+    return round(total_points / total_credits, 2), total_credits
+
+
+def summarize_grades(grades):
+    """
+    Computes SGPA per semester, best-attempt CGPA and backlogs for ONE
+    student from already loaded FinalGrade rows (course and
+    course_offering__semester selected). Runs no queries.
+    """
+
+    grades = list(grades)
+
+    by_semester = {}
+
+    for g in grades:
+        by_semester.setdefault(g.course_offering.semester_id, []).append(g)
+
+    best = best_attempts(grades)
+
+    semester_results = []
+
+    for semester_grades in by_semester.values():
+        semester = semester_grades[0].course_offering.semester
+        sgpa, credits = _weighted_average(semester_grades)
+
+        semester_results.append({
+            "semester": semester,
+            "sgpa": sgpa,
+            "credits": credits,
+        })
+
+    semester_results.sort(key=lambda r: (
+        r["semester"].academic_year.start_year,
+        r["semester"].year,
+        r["semester"].semester,
+    ))
+
+    cgpa, _ = _weighted_average(best.values())
+
+    return {
+        "grades": grades,
+        "semester_results": semester_results,
+        "cgpa": cgpa,
+        "backlogs": [
+            g for g in best.values()
+            if is_backlog_grade(g.grade_letter)
+        ],
+    }
+
+
+def _gpa_grades(grade_filter):
+    return FinalGrade.objects.filter(grade_filter).select_related(
+        "course",
+        "course_offering__course",
+        "course_offering__semester__academic_year",
+    )
+
+
+def get_student_gpa(student, grade_filter=PUBLISHED):
+    """
+    SGPAs, CGPA and backlogs of one student from a single query.
+    """
+    return summarize_grades(
+        _gpa_grades(grade_filter).filter(student=student)
+    )
+
+
+def get_cohort_gpa(students, grade_filter=PUBLISHED, chunk_size=2000):
+    """
+    Batch variant: {student_id: summary} for a queryset / list of students,
+    streamed from one query ordered by student.
+    """
+
+    grades = _gpa_grades(grade_filter).filter(
+        student__in=students
+    ).order_by("student_id", "course_offering__semester_id")
+
+    return {
+        student_id: summarize_grades(student_grades)
+        for student_id, student_grades in groupby(
+            grades.iterator(chunk_size=chunk_size),
+            key=attrgetter("student_id")
+        )
+    }
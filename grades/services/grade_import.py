@@ -0,0 +1,228 @@
+# grades/services/grade_import.py
+
+import logging
+
+import openpyxl
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from grades.models import GradeImportJob, GradeImportRow, MarksSubmission
+from grades.services.final_grades import upsert_final_grades
+from grades.utils.grade_validations import ALLOWED_GRADES
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+GRADE_HEADERS = ["Roll No", "Name", "Course Code", "Course Name", "Grade"]
+CHUNK_SIZE = 500
+
+
+class GradeImportError(Exception):
+    """The uploaded file cannot be staged at all."""
+
+
+def _resolve_students(roll_nos):
+    """
+    {lowercase roll_no: student_id} for a batch of roll numbers, one query.
+    """
+    return dict(
+        User.objects.annotate(
+            roll=Lower("username")
+        ).filter(
+            roll__in=roll_nos
+        ).values_list("roll", "id")
+    )
+
+
+def _stage_chunk(job, chunk, roster, seen):
+    """
+    Validates a chunk of raw rows and bulk-inserts them as GradeImportRow.
+    """
+
+    students = _resolve_students({roll.lower() for _, roll, _, _ in chunk})
+
+    rows = []
+
+    for row_number, roll_no, name, grade in chunk:
+        student_id = students.get(roll_no.lower())
+        error = ""
+
+        if not roll_no:
+            error = "Missing Roll No"
+        elif student_id is None:
+            error = f"Student not found ({roll_no})"
+        elif student_id not in roster:
+            error = "Not in this course"
+        elif student_id in seen:
+            error = "Duplicate Roll No"
+        elif grade not in ALLOWED_GRADES:
+            error = "Invalid grade"
+
+        if student_id is not None and not error:
+            seen.add(student_id)
+
+        rows.append(GradeImportRow(
+            job=job,
+            row_number=row_number,
+            roll_no=roll_no[:50],
+            name=name[:200],
+            grade_letter=grade[:2],
+            student_id=student_id,
+            error=error,
+        ))
+
+    GradeImportRow.objects.bulk_create(rows)
+
+    GradeImportJob.objects.filter(pk=job.pk).update(
+        processed_rows=F("processed_rows") + len(rows)
+    )
+
+
+def parse_grade_import(job):
+    """
+    Streams the uploaded workbook into the staging table, validating every
+    row against the offering's roster. Leaves the job "ready" (possibly
+    with errors to review) or "failed" if the file is unusable.
+    """
+
+    job.status = "parsing"
+    job.save(update_fields=["status"])
+
+    try:
+        roster = set(
+            MarksSubmission.objects.filter(
+                course_offering_id=job.course_offering_id
+            ).values_list("student_id", flat=True)
+        )
+
+        with job.file.open("rb") as file:
+            try:
+                wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+            except Exception:
+                raise GradeImportError("Invalid Excel file")
+
+            valid_students = _stage_workbook(job, wb, roster)
+
+        job.refresh_from_db()
+        job.total_rows = job.processed_rows
+        job.error_count = job.rows.exclude(error="").count()
+
+        if valid_students != len(roster):
+            job.message = (
+                f"File must contain ALL students "
+                f"({valid_students} of {len(roster)} valid)"
+            )
+
+        job.status = "ready"
+        job.finished_at = timezone.now()
+        job.save()
+    except GradeImportError as e:
+        return _fail(job, str(e))
+    except Exception:
+        # Never leave the job stuck in "parsing"
+        logger.exception("Grade import #%s failed", job.pk)
+        return _fail(job, "The file could not be processed")
+
+    return job
+
+
+def _stage_workbook(job, wb, roster):
+    """
+    Returns the number of distinct valid students.
+    """
+
+    try:
+        sheet = wb.active
+        rows = sheet.iter_rows(values_only=True)
+
+        headers = list(next(rows, ()))[:len(GRADE_HEADERS)]
+        if headers != GRADE_HEADERS:
+            raise GradeImportError(f"Invalid format. Expected {GRADE_HEADERS}")
+
+        GradeImportJob.objects.filter(pk=job.pk).update(
+            total_rows=max((sheet.max_row or 1) - 1, 0)
+        )
+
+        seen = set()
+        chunk = []
+
+        for row_number, row in enumerate(rows, start=2):
+            row = tuple(row) + (None,) * (len(GRADE_HEADERS) - len(row))
+
+            if all(value is None for value in row):
+                continue
+
+            roll_no, name, _, _, grade = row[:len(GRADE_HEADERS)]
+
+            chunk.append((
+                row_number,
+                str(roll_no).strip() if roll_no is not None else "",
+                str(name or "").strip(),
+                str(grade or "").strip().upper(),
+            ))
+
+            if len(chunk) >= CHUNK_SIZE:
+                _stage_chunk(job, chunk, roster, seen)
+                chunk = []
+
+        if chunk:
+            _stage_chunk(job, chunk, roster, seen)
+    finally:
+        wb.close()
+
+    return len(seen)
+
+
+def _delete_upload(job):
+    """
+    Removes the uploaded workbook once the job is applied or failed;
+    the staged rows are all that is kept.
+    """
+    if job.file:
+        job.file.delete(save=False)
+
+
+def _fail(job, message):
+    # Rows of a half-staged file are never shown or applied
+    job.rows.all().delete()
+    _delete_upload(job)
+
+    job.status = "failed"
+    job.message = message
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "message", "finished_at", "file"])
+    return job
+
+
+def can_apply(job):
+    return job.status == "ready" and not job.error_count and not job.message
+
+
+def apply_grade_import(job, user):
+    """
+    Bulk-upserts the staged grades into FinalGrade.
+    """
+
+    if not can_apply(job):
+        return 0
+
+    grades = dict(
+        job.rows.filter(error="").values_list("student_id", "grade_letter")
+    )
+
+    with transaction.atomic():
+        written = upsert_final_grades(job.course_offering, grades, user)
+
+        job.status = "applied"
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "finished_at"])
+
+    _delete_upload(job)
+    job.save(update_fields=["file"])
+
+    return written
@@ -0,0 +1,58 @@
+# grades/services/grade_points.py
+
+from functools import lru_cache
+
+GRADE_POINTS = {
+    "EX": 10,
+    "A": 9,
+    "B": 8,
+    "C": 7,
+    "D": 6,
+    "P": 5,
+    "M": 4,
+    "F": 0,
+    "X": 0,
+    "R": 0
+}
+
+BACKLOG_GRADES = frozenset(
+    letter for letter, points in GRADE_POINTS.items() if points == 0
+)
+
+
+@lru_cache(maxsize=None)
+def grade_point(grade_letter):
+    """
+    Grade point of a letter; unknown letters count as 0.
+    """
+    if grade_letter is None:
+        return 0
+    return GRADE_POINTS.get(str(grade_letter).strip().upper(), 0)
+
+
+def is_backlog_grade(grade_letter):
+    return grade_point(grade_letter) == 0
+
+
+def is_better_attempt(grade, other):
+    """
+    Best-attempt rule: higher grade point wins, ties go to the later attempt.
+    """
+    return (
+        (grade_point(grade.grade_letter), grade.attempt_number) >
+        (grade_point(other.grade_letter), other.attempt_number)
+    )
+
+
+def best_attempts(grades):
+    """
+    {course_id: FinalGrade} keeping the best attempt of every course.
+    """
+    best = {}
+
+    for g in grades:
+        current = best.get(g.course_id)
+        if current is None or is_better_attempt(g, current):
+            best[g.course_id] = g
+
+    return best
@@ -0,0 +1,135 @@
+# grades/services/marks_import.py
+
+import openpyxl
+
+from django.db import transaction
+from django.utils import timezone
+
+from grades.models import MarksSubmission
+from grades.services.progress import invalidate_offering_progress
+
+MARKS_HEADERS = ["Roll No", "Minor1", "Minor2", "Mid", "End"]
+MARK_FIELDS = ["minor1", "minor2", "mid", "end"]
+MAX_MARK = 100
+
+
+class MarksSheetError(Exception):
+    """The uploaded file cannot be read as a marks sheet at all."""
+
+
+def _parse_mark(value):
+    """
+    Returns (mark, ok). Blank cells are a valid "not entered yet".
+    """
+    if value is None or value == "" or value == "None":
+        return None, True
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None, False
+    if value < 0 or value > MAX_MARK:
+        return None, False
+    return value, True
+
+
+def parse_marks_sheet(file, student_map):
+    """
+    Streams the sheet in read-only mode and validates every row against
+    student_map ({roll_no: student_id}).
+
+    Returns (marks, errors) where marks is {student_id: [minor1, minor2,
+    mid, end]}; all row errors are collected in one pass.
+    """
+
+    try:
+        wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except Exception:
+        raise MarksSheetError("Invalid Excel file.")
+
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+
+        headers = list(next(rows, ()))[:len(MARKS_HEADERS)]
+        if headers != MARKS_HEADERS:
+            raise MarksSheetError(f"Invalid format. Expected: {MARKS_HEADERS}")
+
+        marks = {}
+        errors = []
+        width = len(MARKS_HEADERS)
+
+        for row_index, row in enumerate(rows, start=2):
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+
+            if all(value is None for value in row):
+                continue
+
+            roll_no = str(row[0]).strip() if row[0] is not None else ""
+
+            if not roll_no:
+                errors.append(f"Row {row_index}: Missing Roll No")
+                continue
+
+            student_id = student_map.get(roll_no)
+            if student_id is None:
+                errors.append(f"Row {row_index}: Student not found")
+                continue
+
+            if student_id in marks:
+                errors.append(f"Row {row_index}: Duplicate Roll No")
+                continue
+
+            values = []
+            for header, raw in zip(MARKS_HEADERS[1:], row[1:]):
+                value, ok = _parse_mark(raw)
+                if not ok:
+                    errors.append(f"Row {row_index}: Invalid {header}")
+                values.append(value)
+
+            marks[student_id] = values
+    finally:
+        wb.close()
+
+    if len(marks) != len(student_map):
+        errors.append("File must contain ALL students exactly once.")
+
+    return marks, errors
+
+
+def save_marks(offering, marks, submitted_by, submission_map):
+    """
+    Writes parsed marks with one bulk_update and one bulk_create.
+    submission_map is {student_id: MarksSubmission} of the offering.
+    """
+
+    to_update = []
+    to_create = []
+    now = timezone.now()
+
+    for student_id, values in marks.items():
+        submission = submission_map.get(student_id)
+
+        if submission is None:
+            submission = MarksSubmission(
+                student_id=student_id,
+                course_offering=offering
+            )
+            to_create.append(submission)
+        else:
+            to_update.append(submission)
+
+        for field, value in zip(MARK_FIELDS, values):
+            setattr(submission, field, value)
+        submission.submitted_by = submitted_by
+        submission.submitted_at = now
+
+    with transaction.atomic():
+        MarksSubmission.objects.bulk_create(to_create, batch_size=1000)
+        MarksSubmission.objects.bulk_update(
+            to_update,
+            MARK_FIELDS + ["submitted_by", "submitted_at"],
+            batch_size=1000
+        )
+
+    invalidate_offering_progress(offering.semester_id)
+
+    return len(to_create), len(to_update)
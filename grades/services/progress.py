@@ -0,0 +1,103 @@
+# grades/services/progress.py
+
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from academics.models import CourseOffering, Semester
+from grades.models import FinalGrade, MarksSubmission
+
+CACHE_TTL = 60
+CACHE_KEY = "grades:offering_progress:{}"
+
+
+def _count(model, condition=None):
+    """
+    Correlated COUNT(*) of model rows for the outer offering.
+    """
+    rows = model.objects.filter(course_offering=OuterRef("pk"))
+    if condition is not None:
+        rows = rows.filter(condition)
+
+    return Coalesce(
+        Subquery(
+            rows.order_by().values("course_offering").annotate(
+                n=Count("pk")
+            ).values("n"),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def annotate_offering_progress(offerings):
+    """
+    Marks/grades progress of every offering in one query.
+    """
+    return offerings.annotate(
+        total_students=_count(MarksSubmission),
+        locked_marks=_count(MarksSubmission, Q(is_locked=True)),
+        grades_uploaded=_count(FinalGrade),
+        frozen_results=_count(FinalGrade, Q(is_frozen=True)),
+    )
+
+
+def _progress_row(offering):
+    total = offering.total_students
+
+    return {
+        "offering": offering,
+        "total_students": total,
+        "locked_marks": offering.locked_marks,
+        "grades_uploaded": offering.grades_uploaded,
+        "frozen_results": offering.frozen_results,
+        "ready": (
+            total > 0 and
+            offering.locked_marks == total and
+            offering.grades_uploaded == total and
+            offering.frozen_results == total
+        ),
+    }
+
+
+def get_offering_progress(semesters=None):
+    """
+    Progress rows for every offering of the given semesters (a Semester
+    queryset, default all), served per semester from a short-lived cache.
+    Missing semesters are computed together in one annotated query, so the
+    cost does not grow with the number of offerings.
+    """
+
+    if semesters is None:
+        semesters = Semester.objects.all()
+
+    semester_ids = sorted(semesters.values_list("id", flat=True))
+
+    keys = {CACHE_KEY.format(sid): sid for sid in semester_ids}
+    cached = cache.get_many(keys)
+
+    missing = [sid for key, sid in keys.items() if key not in cached]
+
+    if missing:
+        by_semester = {sid: [] for sid in missing}
+
+        for offering in annotate_offering_progress(
+            CourseOffering.objects.filter(
+                semester_id__in=missing
+            ).select_related("course", "semester__academic_year").order_by("id")
+        ):
+            by_semester[offering.semester_id].append(_progress_row(offering))
+
+        fresh = {CACHE_KEY.format(sid): rows for sid, rows in by_semester.items()}
+        cache.set_many(fresh, CACHE_TTL)
+        cached.update(fresh)
+
+    return [
+        row
+        for sid in semester_ids
+        for row in cached[CACHE_KEY.format(sid)]
+    ]
+
+
+def invalidate_offering_progress(semester_id):
+    cache.delete(CACHE_KEY.format(semester_id))
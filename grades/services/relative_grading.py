@@ -0,0 +1,127 @@
+# grades/services/relative_grading.py
+
+from django.db.models import (
+    Avg,
+    Case,
+    CharField,
+    DecimalField,
+    F,
+    StdDev,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+
+from grades.models import MarksSubmission
+from grades.services.final_grades import upsert_final_grades
+
+# Weight of every marks component in the total. Each component is 0-100,
+# so the default unit weights give a total out of 400; grades come from
+# z-scores, so only the ratio between the weights matters.
+DEFAULT_WEIGHTS = {
+    "minor1": 1,
+    "minor2": 1,
+    "mid": 1,
+    "end": 1,
+}
+
+# (minimum z-score, grade), highest first; anything below the last is F
+DEFAULT_CUTOFFS = (
+    (1.5, "EX"),
+    (1.0, "A"),
+    (0.5, "B"),
+    (0.0, "C"),
+    (-0.5, "D"),
+    (-1.0, "P"),
+)
+
+FAIL_GRADE = "F"
+
+
+def _weighted_total(weights):
+    total = None
+
+    for field, weight in weights.items():
+        term = Coalesce(F(field), Value(0), output_field=DecimalField()) * weight
+        total = term if total is None else total + term
+
+    return total
+
+
+def compute_relative_grades(
+    offering,
+    computed_by,
+    weights=None,
+    cutoffs=None,
+    dry_run=False
+):
+    """
+    Grades every locked submission of an offering on the curve.
+
+    Totals, mean/std and the z-score buckets are all computed in the
+    database; grades are written through upsert_final_grades, which never
+    touches frozen grades. With dry_run=True nothing is written
+    and the preview is returned.
+    """
+
+    weights = weights or DEFAULT_WEIGHTS
+    cutoffs = sorted(cutoffs or DEFAULT_CUTOFFS, reverse=True)
+
+    submissions = MarksSubmission.objects.filter(
+        course_offering=offering,
+        is_locked=True
+    ).annotate(total=_weighted_total(weights))
+
+    stats = submissions.aggregate(
+        mean=Avg("total"),
+        std=StdDev("total")
+    )
+
+    if stats["mean"] is None:
+        return {"mean": None, "std": None, "grades": [], "written": 0}
+
+    mean = float(stats["mean"])
+    std = float(stats["std"] or 0) or 1
+
+    # z >= cutoff  <=>  total >= mean + cutoff * std
+    grade_case = Case(
+        *[
+            When(total__gte=mean + z * std, then=Value(grade))
+            for z, grade in cutoffs
+        ],
+        default=Value(FAIL_GRADE),
+        output_field=CharField()
+    )
+
+    rows = submissions.annotate(grade=grade_case).values_list(
+        "student_id", "student__username", "total", "grade"
+    ).order_by("-total", "student__username")
+
+    preview = [
+        {
+            "student_id": student_id,
+            "roll_no": username,
+            "total": float(total),
+            "z": round((float(total) - mean) / std, 2),
+            "grade": grade,
+        }
+        for student_id, username, total, grade in rows
+    ]
+
+    result = {
+        "mean": round(mean, 2),
+        "std": round(std, 2),
+        "grades": preview,
+        "written": 0,
+    }
+
+    if dry_run:
+        return result
+
+    result["written"] = upsert_final_grades(
+        offering,
+        {row["student_id"]: row["grade"] for row in preview},
+        computed_by
+    )
+
+    return result
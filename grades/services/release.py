@@ -0,0 +1,78 @@
+# grades/services/release.py
+
+from django.db import transaction
+from django.utils import timezone
+
+from academics.models import CourseOffering
+from grades.models import FinalGrade
+from grades.services.progress import (
+    annotate_offering_progress,
+    invalidate_offering_progress,
+)
+
+
+def _offering_status(offering):
+    total = offering.total_students
+
+    if total == 0:
+        return "No marks uploaded"
+    if offering.locked_marks != total:
+        return "Marks not locked"
+    if offering.grades_uploaded != total:
+        return f"Not fully graded ({offering.grades_uploaded}/{total})"
+    return "Ready"
+
+
+def get_semester_readiness(semester_id):
+    """
+    Per-offering release status of a semester from one annotated query.
+    """
+
+    offerings = annotate_offering_progress(
+        CourseOffering.objects.filter(
+            semester_id=semester_id
+        ).select_related("course").order_by("course__course_code", "section")
+    )
+
+    rows = [
+        {
+            "offering": o,
+            "total_students": o.total_students,
+            "marks_locked": o.total_students > 0 and o.locked_marks == o.total_students,
+            "fully_graded": o.total_students > 0 and o.grades_uploaded == o.total_students,
+            "frozen": o.total_students > 0 and o.frozen_results == o.total_students,
+            "status": _offering_status(o),
+        }
+        for o in offerings
+    ]
+
+    return {
+        "offerings": rows,
+        "ready": bool(rows) and all(r["status"] == "Ready" for r in rows),
+    }
+
+
+def release_semester(semester_id):
+    """
+    Freezes and publishes every grade of the semester with one UPDATE, in a
+    single transaction. Returns the number of grades released, or None if
+    the semester is not ready.
+    """
+
+    with transaction.atomic():
+        readiness = get_semester_readiness(semester_id)
+
+        if not readiness["ready"]:
+            return None
+
+        released = FinalGrade.objects.filter(
+            course_offering__semester_id=semester_id
+        ).update(
+            is_frozen=True,
+            is_published=True,
+            published_at=timezone.now()
+        )
+
+    invalidate_offering_progress(semester_id)
+
+    return released
@@ -0,0 +1,102 @@
+# grades/services/results.py
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+
+from academics.models import Semester
+from grades.models import FinalGrade, SemesterResult
+from grades.services.gpa import FROZEN, get_cohort_gpa
+
+
+def _up_to_semester(semester):
+    """
+    Grades of the given semester and of every semester before it
+    (ordered by academic year, year, semester).
+    """
+    start_year = semester.academic_year.start_year
+    prefix = "course_offering__semester__"
+
+    return (
+        Q(**{f"{prefix}academic_year__start_year__lt": start_year}) |
+        Q(**{
+            f"{prefix}academic_year__start_year": start_year,
+            f"{prefix}year__lt": semester.year,
+        }) |
+        Q(**{
+            f"{prefix}academic_year__start_year": start_year,
+            f"{prefix}year": semester.year,
+            f"{prefix}semester__lte": semester.semester,
+        })
+    )
+
+
+def _to_decimal(value):
+    return None if value is None else Decimal(str(value))
+
+
+def compute_semester_results(semester_id, published_by):
+    """
+    Derives SGPA and CGPA for every student with frozen grades in the
+    semester and bulk-upserts SemesterResult. Locked results are left as
+    they are.
+    """
+
+    semester = Semester.objects.select_related("academic_year").get(
+        pk=semester_id
+    )
+
+    students = FinalGrade.objects.filter(
+        FROZEN,
+        course_offering__semester=semester
+    ).values("student_id")
+
+    summaries = get_cohort_gpa(
+        students,
+        grade_filter=FROZEN & _up_to_semester(semester)
+    )
+
+    locked = set(
+        SemesterResult.objects.filter(
+            semester=semester,
+            is_locked=True
+        ).values_list("student_id", flat=True)
+    )
+
+    results = []
+
+    for student_id, summary in summaries.items():
+
+        if student_id in locked:
+            continue
+
+        sgpa = next(
+            (
+                r["sgpa"] for r in summary["semester_results"]
+                if r["semester"].pk == semester.pk
+            ),
+            None
+        )
+
+        results.append(SemesterResult(
+            student_id=student_id,
+            semester=semester,
+            sgpa=_to_decimal(sgpa),
+            cgpa=_to_decimal(summary["cgpa"]),
+            published_by=published_by,
+        ))
+
+    with transaction.atomic():
+        SemesterResult.objects.bulk_create(
+            results,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["student", "semester"],
+            update_fields=["sgpa", "cgpa", "published_by"],
+        )
+
+    return {
+        "computed": len(results),
+        "locked": len(locked),
+    }
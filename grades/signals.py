@@ -0,0 +1,55 @@
+from threading import local
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from academics.models import CourseOffering
+from grades.models import FinalGrade, MarksSubmission, offering_rows_locked
+from grades.services.progress import invalidate_offering_progress
+
+# Offerings written in the current transaction whose semester is not
+# loaded; resolved together by the first on_commit callback to run
+_pending = local()
+
+
+@receiver(offering_rows_locked, sender=MarksSubmission)
+@receiver(offering_rows_locked, sender=FinalGrade)
+def invalidate_progress_after_lock(sender, semester_ids, **kwargs):
+    for semester_id in semester_ids:
+        invalidate_offering_progress(semester_id)
+
+
+def _invalidate_pending_offerings():
+    offering_ids = getattr(_pending, "offering_ids", None)
+    if not offering_ids:
+        return
+
+    _pending.offering_ids = None
+
+    for semester_id in CourseOffering.objects.filter(
+        pk__in=offering_ids
+    ).values_list("semester_id", flat=True).distinct():
+        invalidate_offering_progress(semester_id)
+
+
+@receiver(post_save, sender=MarksSubmission)
+@receiver(post_save, sender=FinalGrade)
+@receiver(post_delete, sender=MarksSubmission)
+@receiver(post_delete, sender=FinalGrade)
+def invalidate_progress_after_write(sender, instance, **kwargs):
+    # Single-row saves and deletes (admin, shell); bulk writes
+    # invalidate in their services, locks through offering_rows_locked
+    if sender.course_offering.is_cached(instance):
+        semester_id = instance.course_offering.semester_id
+        transaction.on_commit(lambda: invalidate_offering_progress(semester_id))
+        return
+
+    # No query on the write path: the semester ids are looked up once
+    # per transaction, after it commits
+    pending = getattr(_pending, "offering_ids", None)
+    if pending is None:
+        pending = _pending.offering_ids = set()
+    pending.add(instance.course_offering_id)
+
+    transaction.on_commit(_invalidate_pending_offerings)
@@ -0,0 +1,18 @@
+from celery import shared_task
+from django.contrib.auth import get_user_model
+
+from grades.models import GradeImportJob
+from grades.services.grade_import import parse_grade_import
+from grades.services.results import compute_semester_results
+
+
+@shared_task
+def compute_semester_results_task(semester_id, user_id):
+    user = get_user_model().objects.get(pk=user_id)
+    return compute_semester_results(semester_id, user)
+
+
+@shared_task
+def parse_grade_import_task(job_id):
+    job = GradeImportJob.objects.get(pk=job_id)
+    return parse_grade_import(job).status
@@ -1,3 +1,864 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+import openpyxl
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from academics.models import (
+    AcademicYear,
+    Course,
+    CourseOffering,
+    Enrollment,
+    FacultyAssignment,
+    Semester,
+)
+from accounts.models import Department, FacultyProfile, StudentProfile, User
+from grades.models import FinalGrade, GradeImportJob, MarksSubmission, SemesterResult
+from grades.services import grade_import
+from grades.services.gpa import FROZEN, get_cohort_gpa, get_student_gpa
+from grades.services.grade_points import (
+    best_attempts,
+    grade_point,
+    is_backlog_grade,
+    is_better_attempt,
+)
+from grades.services.marks_import import MarksSheetError, parse_marks_sheet
+from grades.services.progress import get_offering_progress
+from grades.services.relative_grading import compute_relative_grades
+from grades.services.release import get_semester_readiness, release_semester
+from grades.services.results import compute_semester_results
+from grades.tasks import compute_semester_results_task, parse_grade_import_task
+from grades.utils.grade_validations import validate_grade
+
+
+class GradesTestCase(TestCase):
+    """
+    One department with two semesters of year 1:
+    MA101 (4 credits) and PH101 (3 credits) in the first,
+    CS102 (4 credits) and a PH101 re-run in the second.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="CSE")
+        cls.academic_year = AcademicYear.objects.create(
+            start_year=2025, end_year=2026, is_active=True
+        )
+        cls.sem1 = Semester.objects.create(
+            academic_year=cls.academic_year, year=1, semester=1
+        )
+        cls.sem2 = Semester.objects.create(
+            academic_year=cls.academic_year, year=1, semester=2
+        )
+
+        cls.exam = User.objects.create_user(
+            username="exam", email="exam@example.com", password="pw", role="EXAM_SECTION"
+        )
+        cls.faculty = User.objects.create_user(
+            username="fac1", email="fac1@example.com", password="pw", role="FACULTY"
+        )
+        FacultyProfile.objects.create(
+            user=cls.faculty, department=cls.department, designation="Assistant Professor"
+        )
+
+        cls.maths = cls.make_course("MA101", 4)
+        cls.physics = cls.make_course("PH101", 3)
+        cls.programming = cls.make_course("CS102", 4)
+
+        cls.maths_offering = cls.make_offering(cls.maths, cls.sem1)
+        cls.physics_offering = cls.make_offering(cls.physics, cls.sem1)
+        cls.programming_offering = cls.make_offering(cls.programming, cls.sem2)
+        cls.physics_rerun = cls.make_offering(cls.physics, cls.sem2)
+
+        cls.students = []
+        for i in range(3):
+            student = User.objects.create_user(
+                username=f"25cs{i:03d}",
+                email=f"25cs{i:03d}@example.com",
+                password="pw",
+                role="STUDENT",
+            )
+            StudentProfile.objects.create(
+                user=student, department=cls.department, year=1, section="A"
+            )
+            for offering in (
+                cls.maths_offering,
+                cls.physics_offering,
+                cls.programming_offering,
+            ):
+                Enrollment.objects.create(student=student, offering=offering)
+            cls.students.append(student)
+
+    @classmethod
+    def make_course(cls, code, credits):
+        return Course.objects.create(
+            course_code=code,
+            course_title=f"Course {code}",
+            credits=credits,
+            category="BSC",
+            department=cls.department,
+        )
+
+    @classmethod
+    def make_offering(cls, course, semester):
+        offering = CourseOffering.objects.create(
+            course=course,
+            academic_year=cls.academic_year,
+            semester=semester,
+            department=cls.department,
+            year=semester.year,
+            section="A",
+        )
+        FacultyAssignment.objects.create(faculty=cls.faculty, offering=offering)
+        return offering
+
+    def grade(self, student, offering, letter, attempt=1, frozen=True, published=True):
+        return FinalGrade.objects.create(
+            student=student,
+            course=offering.course,
+            course_offering=offering,
+            grade_letter=letter,
+            attempt_number=attempt,
+            published_by=self.exam,
+            is_published=published,
+            is_frozen=frozen,
+        )
+
+
+class GpaTests(GradesTestCase):
+
+    def grade_first_student(self, retake=True):
+        student = self.students[0]
+        self.grade(student, self.maths_offering, "A")
+        self.grade(student, self.physics_offering, "F")
+        self.grade(student, self.programming_offering, "EX")
+        if retake:
+            self.grade(student, self.physics_rerun, "B", attempt=2)
+        return student
+
+    def test_sgpa_per_semester_and_best_attempt_cgpa(self):
+        student = self.grade_first_student()
+
+        summary = get_student_gpa(student)
+
+        self.assertEqual(
+            [(r["semester"], r["sgpa"], r["credits"]) for r in summary["semester_results"]],
+            [
+                (self.sem1, round(36 / 7, 2), 7),
+                (self.sem2, round(64 / 7, 2), 7),
+            ],
+        )
+        # MA101 A, PH101 best attempt B, CS102 EX
+        self.assertEqual(summary["cgpa"], round(100 / 11, 2))
+        self.assertEqual(summary["backlogs"], [])
+
+    def test_failed_course_without_a_pass_is_a_backlog(self):
+        student = self.grade_first_student(retake=False)
+
+        summary = get_student_gpa(student)
+
+        self.assertEqual(
+            [g.course_id for g in summary["backlogs"]], [self.physics.id]
+        )
+        self.assertEqual(summary["cgpa"], round(76 / 11, 2))
+
+    def test_only_published_grades_count_by_default(self):
+        student = self.students[0]
+        self.grade(student, self.maths_offering, "A")
+        self.grade(student, self.physics_offering, "C", published=False)
+
+        self.assertEqual(get_student_gpa(student)["cgpa"], 9)
+        self.assertEqual(
+            get_student_gpa(student, grade_filter=FROZEN)["cgpa"],
+            round((36 + 21) / 7, 2),
+        )
+
+    def test_student_summary_is_one_query(self):
+        student = self.grade_first_student()
+
+        with self.assertNumQueries(1):
+            summary = get_student_gpa(student)
+            # Related rows were selected with the grades
+            [r["semester"].academic_year.start_year for r in summary["semester_results"]]
+            [g.course.credits for g in summary["grades"]]
+
+    def test_cohort_matches_the_per_student_summaries(self):
+        self.grade_first_student()
+        for student, letters in zip(self.students[1:], (("B", "C"), ("F", "D"))):
+            self.grade(student, self.maths_offering, letters[0])
+            self.grade(student, self.physics_offering, letters[1])
+
+        with self.assertNumQueries(1):
+            cohort = get_cohort_gpa(User.objects.filter(role="STUDENT"))
+
+        self.assertEqual(set(cohort), {s.id for s in self.students})
+        for student in self.students:
+            expected = get_student_gpa(student)
+            self.assertEqual(cohort[student.id]["cgpa"], expected["cgpa"])
+            self.assertEqual(
+                [r["sgpa"] for r in cohort[student.id]["semester_results"]],
+                [r["sgpa"] for r in expected["semester_results"]],
+            )
+
+    def test_result_dashboard_renders_the_summary(self):
+        student = self.grade_first_student()
+        self.client.force_login(student)
+
+        response = self.client.get(reverse("grades:student_view_grades"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cgpa"], round(100 / 11, 2))
+
+
+class SemesterResultTests(GradesTestCase):
+
+    def setUp(self):
+        first, second, third = self.students
+        self.grade(first, self.maths_offering, "A")
+        self.grade(first, self.physics_offering, "F")
+        self.grade(first, self.programming_offering, "EX")
+        self.grade(first, self.physics_rerun, "B", attempt=2)
+
+        self.grade(second, self.maths_offering, "B")
+        self.grade(second, self.physics_offering, "B")
+        # Not frozen yet: ignored by the pipeline
+        self.grade(second, self.programming_offering, "A", frozen=False)
+
+        self.grade(third, self.maths_offering, "C")
+
+    def results(self, semester):
+        return {
+            r.student_id: (r.sgpa, r.cgpa)
+            for r in SemesterResult.objects.filter(semester=semester)
+        }
+
+    def test_results_use_frozen_grades_up_to_the_semester(self):
+        summary = compute_semester_results(self.sem1.id, self.exam)
+
+        self.assertEqual(summary, {"computed": 3, "locked": 0})
+        first, second, third = self.students
+        self.assertEqual(self.results(self.sem1), {
+            first.id: (Decimal("5.14"), Decimal("5.14")),
+            second.id: (Decimal("8.00"), Decimal("8.00")),
+            third.id: (Decimal("7.00"), Decimal("7.00")),
+        })
+
+        summary = compute_semester_results(self.sem2.id, self.exam)
+
+        # Only the first student has frozen grades in the second semester
+        self.assertEqual(summary["computed"], 1)
+        self.assertEqual(self.results(self.sem2), {
+            first.id: (Decimal("9.14"), Decimal("9.09")),
+        })
+
+    def test_recomputing_updates_and_skips_locked_results(self):
+        compute_semester_results(self.sem1.id, self.exam)
+        first, second, _ = self.students
+        SemesterResult.objects.filter(student=first).lock_all()
+
+        FinalGrade.objects.filter(student=second).update(grade_letter="A")
+        FinalGrade.objects.filter(student=first).update(grade_letter="A")
+
+        summary = compute_semester_results(self.sem1.id, self.exam)
+
+        self.assertEqual(summary, {"computed": 2, "locked": 1})
+        results = self.results(self.sem1)
+        self.assertEqual(results[second.id], (Decimal("9.00"), Decimal("9.00")))
+        self.assertEqual(results[first.id], (Decimal("5.14"), Decimal("5.14")))
+        self.assertEqual(SemesterResult.objects.count(), 3)
+
+    def test_exam_section_starts_the_computation_in_the_background(self):
+        url = reverse("grades:exam_compute_semester_results", args=[self.sem1.id])
+
+        with mock.patch.object(compute_semester_results_task, "delay") as delay:
+            self.client.force_login(self.students[0])
+            self.assertEqual(self.client.post(url).status_code, 403)
+
+            self.client.force_login(self.exam)
+            self.client.post(url)
+
+        delay.assert_called_once_with(self.sem1.id, self.exam.id)
+
+
+class GradePointTests(TestCase):
+
+    def test_lookup_normalises_letters(self):
+        self.assertEqual(grade_point("EX"), 10)
+        self.assertEqual(grade_point(" a "), 9)
+        self.assertEqual(grade_point("Q"), 0)
+        self.assertEqual(grade_point(None), 0)
+
+    def test_backlog_grades(self):
+        for letter in ("F", "X", "R", "?"):
+            self.assertTrue(is_backlog_grade(letter))
+        self.assertFalse(is_backlog_grade("M"))
+
+    def test_validation_accepts_exactly_the_graded_letters(self):
+        self.assertTrue(validate_grade("ex"))
+        self.assertTrue(validate_grade("M"))
+        self.assertFalse(validate_grade("Ex+"))
+        self.assertFalse(validate_grade(None))
+
+    def test_best_attempt_prefers_higher_points_then_later_attempts(self):
+        first = FinalGrade(course_id=1, grade_letter="B", attempt_number=1)
+        second = FinalGrade(course_id=1, grade_letter="F", attempt_number=2)
+        third = FinalGrade(course_id=1, grade_letter="B", attempt_number=3)
+
+        self.assertTrue(is_better_attempt(first, second))
+        self.assertTrue(is_better_attempt(third, first))
+        self.assertIs(best_attempts([first, second])[1], first)
+        self.assertIs(best_attempts([second, third, first])[1], third)
+
+
+class RelativeGradingTests(GradesTestCase):
+
+    def setUp(self):
+        # Totals 90 / 60 / 30: mean 60, population std ~24.49
+        for student, (minor1, minor2, mid, end) in zip(self.students, (
+            (20, 20, 20, 30),
+            (15, 15, 10, 20),
+            (5, 5, 10, 10),
+        )):
+            MarksSubmission.objects.create(
+                student=student,
+                course_offering=self.maths_offering,
+                minor1=minor1,
+                minor2=minor2,
+                mid=mid,
+                end=end,
+                submitted_by=self.faculty,
+                is_locked=True,
+            )
+
+    def letters(self):
+        return dict(
+            FinalGrade.objects.filter(
+                course_offering=self.maths_offering
+            ).values_list("student__username", "grade_letter")
+        )
+
+    def test_dry_run_previews_without_writing(self):
+        result = compute_relative_grades(self.maths_offering, self.exam, dry_run=True)
+
+        self.assertEqual(result["mean"], 60)
+        self.assertEqual(
+            [(row["roll_no"], row["total"], row["grade"]) for row in result["grades"]],
+            [("25cs000", 90, "A"), ("25cs001", 60, "C"), ("25cs002", 30, "F")],
+        )
+        self.assertEqual(result["written"], 0)
+        self.assertFalse(FinalGrade.objects.exists())
+
+    def test_grades_are_bulk_written_and_frozen_ones_kept(self):
+        self.grade(self.students[2], self.maths_offering, "P")
+
+        # Aggregate, graded rows, existing grades, last attempts and one
+        # insert inside a savepoint
+        with self.assertNumQueries(7):
+            result = compute_relative_grades(self.maths_offering, self.exam)
+
+        self.assertEqual(result["written"], 2)
+        self.assertEqual(
+            self.letters(), {"25cs000": "A", "25cs001": "C", "25cs002": "P"}
+        )
+
+    def test_weights_cutoffs_and_unlocked_submissions(self):
+        MarksSubmission.objects.filter(student=self.students[2]).update(is_locked=False)
+
+        result = compute_relative_grades(
+            self.maths_offering,
+            self.exam,
+            weights={"end": 1},
+            cutoffs=[(0.5, "EX"), (-0.5, "P")],
+        )
+
+        # Only the two locked submissions, graded on the end exam alone
+        self.assertEqual(result["mean"], 25)
+        self.assertEqual(self.letters(), {"25cs000": "EX", "25cs001": "F"})
+        self.assertTrue(
+            FinalGrade.objects.get(student=self.students[1]).is_backlog
+        )
+
+
+def make_workbook(rows, name="sheet.xlsx"):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    output = BytesIO()
+    wb.save(output)
+    return SimpleUploadedFile(
+        name,
+        output.getvalue(),
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+
+MARKS_HEADER = ["Roll No", "Minor1", "Minor2", "Mid", "End"]
+
+
+class MarksUploadTests(GradesTestCase):
+
+    def setUp(self):
+        self.url = reverse("grades:faculty_submit_marks", args=[self.maths_offering.id])
+        self.client.force_login(self.faculty)
+
+    def upload(self, rows):
+        return self.client.post(self.url, {"file": make_workbook([MARKS_HEADER] + rows)})
+
+    def student_map(self):
+        return {s.username: s.id for s in self.students}
+
+    def test_parser_reports_every_row_error_in_one_pass(self):
+        sheet = make_workbook([MARKS_HEADER] + [
+            ["25cs000", 10, 12, "abc", 40],
+            ["25cs000", 10, 10, 10, 10],
+            ["99xx999", 1, 1, 1, 1],
+            [None, 1, 1, 1, 1],
+            ["25cs001", 101, -1, None, 20],
+        ])
+
+        marks, errors = parse_marks_sheet(sheet, self.student_map())
+
+        self.assertEqual(errors, [
+            "Row 2: Invalid Mid",
+            "Row 3: Duplicate Roll No",
+            "Row 4: Student not found",
+            "Row 5: Missing Roll No",
+            "Row 6: Invalid Minor1",
+            "Row 6: Invalid Minor2",
+            "File must contain ALL students exactly once.",
+        ])
+        self.assertEqual(marks[self.students[0].id], [10, 12, None, 40])
+
+    def test_parser_rejects_a_wrong_header(self):
+        with self.assertRaises(MarksSheetError):
+            parse_marks_sheet(
+                make_workbook([["Roll", "Marks"], ["25cs000", 10]]),
+                self.student_map(),
+            )
+
+    def test_upload_creates_then_updates_submissions(self):
+        self.upload([["25cs000", 10, 10, 20, 30], ["25cs001", 5, 5, 5, 5], ["25cs002", 1, 2, 3, None]])
+        self.upload([["25cs000", 12, 10, 20, 30], ["25cs001", 5, 5, 5, 5], ["25cs002", 1, 2, 3, 4]])
+
+        submissions = {
+            m.student.username: (m.minor1, m.end)
+            for m in MarksSubmission.objects.filter(course_offering=self.maths_offering)
+        }
+        self.assertEqual(submissions, {
+            "25cs000": (12, 30),
+            "25cs001": (5, 5),
+            "25cs002": (1, 4),
+        })
+
+    def test_invalid_upload_writes_nothing(self):
+        response = self.upload([["25cs000", 10, 10, 20, 300]])
+
+        self.assertIn("Row 2: Invalid End", response.context["errors"])
+        self.assertFalse(MarksSubmission.objects.exists())
+
+    def test_marks_can_only_be_locked_when_complete(self):
+        self.upload([["25cs000", 10, 10, 20, 30], ["25cs001", 5, 5, 5, 5], ["25cs002", 1, 2, 3, None]])
+
+        response = self.client.post(self.url, {"lock_marks": "1"})
+        self.assertEqual(response.context["errors"], ["Cannot lock: Some marks are missing."])
+
+        self.upload([["25cs000", 10, 10, 20, 30], ["25cs001", 5, 5, 5, 5], ["25cs002", 1, 2, 3, 4]])
+        self.client.post(self.url, {"lock_marks": "1"})
+
+        self.assertFalse(MarksSubmission.objects.filter(is_locked=False).exists())
+        response = self.upload([["25cs000", 0, 0, 0, 0], ["25cs001", 5, 5, 5, 5], ["25cs002", 1, 2, 3, 4]])
+        self.assertEqual(
+            response.context["errors"], ["Marks are locked. No further changes allowed."]
+        )
+
+
+GRADE_HEADER = ["Roll No", "Name", "Course Code", "Course Name", "Grade"]
+
+
+class GradeImportTests(GradesTestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        for student in self.students:
+            MarksSubmission.objects.create(
+                student=student,
+                course_offering=self.maths_offering,
+                submitted_by=self.faculty,
+                is_locked=True,
+            )
+
+        self.client.force_login(self.exam)
+
+    def upload(self, rows):
+        url = reverse("grades:exam_upload_final_grades", args=[self.maths_offering.id])
+
+        with mock.patch.object(
+            parse_grade_import_task, "delay", side_effect=parse_grade_import_task
+        ), self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"file": make_workbook(rows, "grades.xlsx")})
+
+        return GradeImportJob.objects.latest("id")
+
+    def grade_rows(self, letters):
+        return [GRADE_HEADER] + [
+            [student.username, "", "MA101", "", letter]
+            for student, letter in zip(self.students, letters)
+        ]
+
+    def assertFileDeleted(self, job):
+        self.assertEqual(job.file.name, "")
+        self.assertEqual(
+            list(GradeImportJob.objects.filter(pk=job.pk).values_list("file", flat=True)),
+            [""],
+        )
+
+    def test_valid_file_is_staged_then_applied(self):
+        job = self.upload(self.grade_rows(["A", "b", "F"]))
+
+        self.assertEqual(job.status, "ready")
+        self.assertEqual((job.total_rows, job.error_count, job.message), (3, 0, ""))
+        self.assertFalse(FinalGrade.objects.exists())
+        path = job.file.path
+
+        self.client.post(
+            reverse("grades:exam_grade_import", args=[job.id]), {"confirm": "1"}
+        )
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "applied")
+        self.assertEqual(
+            dict(FinalGrade.objects.values_list("student__username", "grade_letter")),
+            {"25cs000": "A", "25cs001": "B", "25cs002": "F"},
+        )
+        self.assertFileDeleted(job)
+        self.assertFalse(os.path.exists(path))
+
+    def test_row_errors_block_applying(self):
+        rows = self.grade_rows(["A", "Z", "B"])
+        rows.append(["25cs000", "", "MA101", "", "C"])
+        rows.append(["nobody1", "", "MA101", "", "C"])
+
+        job = self.upload(rows)
+
+        self.assertEqual(job.status, "ready")
+        self.assertEqual(
+            list(job.rows.exclude(error="").values_list("row_number", "error")),
+            [
+                (3, "Invalid grade"),
+                (5, "Duplicate Roll No"),
+                (6, "Student not found (nobody1)"),
+            ],
+        )
+        self.assertFalse(grade_import.can_apply(job))
+
+    def test_unusable_file_fails_and_is_deleted(self):
+        job = self.upload([["Roll", "Grade"], ["25cs000", "A"]])
+
+        self.assertEqual(job.status, "failed")
+        self.assertIn("Invalid format", job.message)
+        self.assertFileDeleted(job)
+
+    def test_unexpected_error_while_staging_fails_the_job(self):
+        with mock.patch.object(
+            grade_import, "_stage_chunk", side_effect=RuntimeError("boom")
+        ), self.assertLogs("grades.services.grade_import", "ERROR"):
+            job = self.upload(self.grade_rows(["A", "B", "C"]))
+
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.message, "The file could not be processed")
+        self.assertFalse(job.rows.exists())
+        self.assertFileDeleted(job)
+
+
+class OfferingProgressCacheTests(GradesTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.submissions = [
+            MarksSubmission.objects.create(
+                student=student,
+                course_offering=self.maths_offering,
+                submitted_by=self.faculty,
+            )
+            for student in self.students
+        ]
+
+    def progress(self):
+        row = next(
+            r for r in get_offering_progress(Semester.objects.filter(pk=self.sem1.pk))
+            if r["offering"] == self.maths_offering
+        )
+        return row["locked_marks"], row["grades_uploaded"], row["frozen_results"]
+
+    def test_progress_is_served_from_the_cache(self):
+        self.assertEqual(self.progress(), (0, 0, 0))
+
+        # Only the semester id lookup
+        with self.assertNumQueries(1):
+            self.progress()
+
+    def test_locking_and_freezing_invalidate_the_cache(self):
+        self.assertEqual(self.progress(), (0, 0, 0))
+
+        self.submissions[0].lock()
+        self.assertEqual(self.progress(), (1, 0, 0))
+
+        MarksSubmission.objects.filter(course_offering=self.maths_offering).lock_all()
+        self.assertEqual(self.progress(), (3, 0, 0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            grades = [
+                self.grade(student, self.maths_offering, "A", frozen=False)
+                for student in self.students
+            ]
+        self.assertEqual(self.progress(), (3, 3, 0))
+
+        grades[0].freeze()
+        self.assertEqual(self.progress(), (3, 3, 1))
+
+        FinalGrade.objects.filter(course_offering=self.maths_offering).freeze_all()
+        self.assertEqual(self.progress(), (3, 3, 3))
+
+    def test_single_row_deletes_invalidate_the_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grade(self.students[0], self.maths_offering, "A")
+        self.assertEqual(self.progress(), (0, 1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FinalGrade.objects.get().delete()
+
+        self.assertEqual(self.progress(), (0, 0, 0))
+
+    def test_single_row_writes_look_up_the_semester_once_after_commit(self):
+        self.assertEqual(self.progress(), (0, 0, 0))
+        submissions = list(MarksSubmission.objects.all())
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            # Just the DELETE per row
+            with self.assertNumQueries(3):
+                for submission in submissions:
+                    submission.delete()
+
+        # One semester lookup for the whole transaction
+        with self.assertNumQueries(1):
+            for callback in callbacks:
+                callback()
+
+        self.assertIsNone(cache.get(f"grades:offering_progress:{self.sem1.pk}"))
+
+    def test_loaded_offering_needs_no_lookup(self):
+        self.assertEqual(self.progress(), (0, 0, 0))
+        submission = MarksSubmission.objects.select_related("course_offering").first()
+
+        # The DELETE, and no semester lookup after commit
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(1):
+            submission.delete()
+
+        self.assertIsNone(cache.get(f"grades:offering_progress:{self.sem1.pk}"))
+
+
+class SemesterReleaseTests(GradesTestCase):
+
+    def setUp(self):
+        for offering in (self.maths_offering, self.physics_offering):
+            for student in self.students:
+                MarksSubmission.objects.create(
+                    student=student,
+                    course_offering=offering,
+                    submitted_by=self.faculty,
+                    is_locked=True,
+                )
+
+    def grade_offering(self, offering, attempt=1):
+        for student in self.students:
+            self.grade(
+                student, offering, "B", attempt=attempt, frozen=False, published=False
+            )
+
+    def statuses(self):
+        readiness = get_semester_readiness(self.sem1.id)
+        return readiness["ready"], {
+            row["offering"].course.course_code: row["status"]
+            for row in readiness["offerings"]
+        }
+
+    def test_readiness_is_one_query(self):
+        with self.assertNumQueries(1):
+            get_semester_readiness(self.sem1.id)
+
+    def test_semester_is_ready_once_every_offering_is_graded(self):
+        MarksSubmission.objects.filter(
+            course_offering=self.physics_offering, student=self.students[0]
+        ).update(is_locked=False)
+        self.grade_offering(self.maths_offering)
+        self.grade(self.students[0], self.physics_offering, "A", published=False)
+
+        self.assertEqual(self.statuses(), (False, {
+            "MA101": "Ready",
+            "PH101": "Marks not locked",
+        }))
+
+        MarksSubmission.objects.update(is_locked=True)
+        self.assertEqual(
+            self.statuses()[1]["PH101"], "Not fully graded (1/3)"
+        )
+
+        FinalGrade.objects.filter(course_offering=self.physics_offering).delete()
+        self.grade_offering(self.physics_offering)
+
+        self.assertEqual(self.statuses(), (True, {"MA101": "Ready", "PH101": "Ready"}))
+
+    def test_release_freezes_and_publishes_the_whole_semester(self):
+        self.grade_offering(self.maths_offering)
+
+        self.assertIsNone(release_semester(self.sem1.id))
+        self.assertFalse(FinalGrade.objects.filter(is_published=True).exists())
+
+        self.grade_offering(self.physics_offering)
+        self.grade_offering(self.physics_rerun, attempt=2)
+
+        self.assertEqual(release_semester(self.sem1.id), 6)
+        self.assertEqual(
+            FinalGrade.objects.filter(
+                course_offering__semester=self.sem1, is_frozen=True, is_published=True
+            ).count(),
+            6,
+        )
+        # Other semesters are untouched
+        self.assertFalse(
+            FinalGrade.objects.filter(course_offering=self.physics_rerun, is_published=True).exists()
+        )
+
+    def test_release_view_requires_the_exam_section(self):
+        self.grade_offering(self.maths_offering)
+        self.grade_offering(self.physics_offering)
+        url = reverse("grades:exam_release_semester_results", args=[self.sem1.id])
+
+        self.client.force_login(self.faculty)
+        self.assertEqual(self.client.post(url).status_code, 403)
+
+        self.client.force_login(self.exam)
+        response = self.client.get(url)
+        self.assertTrue(response.context["readiness"]["ready"])
+
+        self.client.post(url)
+        self.assertEqual(FinalGrade.objects.filter(is_published=True).count(), 6)
+
+
+class LockEnforcementTests(GradesTestCase):
+
+    def setUp(self):
+        self.submission = MarksSubmission.objects.create(
+            student=self.students[0],
+            course_offering=self.maths_offering,
+            minor1=10,
+            submitted_by=self.faculty,
+        )
+
+    def stored_minor1(self):
+        return MarksSubmission.objects.values_list("minor1", flat=True).get()
+
+    def test_unlocked_rows_can_be_edited(self):
+        self.submission.minor1 = 12
+        self.submission.save()
+
+        self.assertEqual(self.stored_minor1(), 12)
+
+    def test_editing_an_unlocked_row_is_one_update(self):
+        self.submission.minor1 = 12
+
+        with self.assertNumQueries(1):
+            self.submission.save()
+
+        self.assertEqual(self.stored_minor1(), 12)
+
+    def test_update_fields_limit_the_written_columns(self):
+        MarksSubmission.objects.update(minor2=7)
+        self.submission.minor1 = 12
+
+        with self.assertNumQueries(1):
+            self.submission.save(update_fields=["minor1"])
+
+        stored = MarksSubmission.objects.get()
+        self.assertEqual((stored.minor1, stored.minor2), (12, 7))
+
+    def test_a_deleted_row_is_inserted_again(self):
+        MarksSubmission.objects.all().delete()
+        self.submission.minor1 = 12
+
+        self.submission.save()
+
+        self.assertEqual(self.stored_minor1(), 12)
+
+    def test_locked_rows_cannot_be_edited(self):
+        self.submission.lock()
+        self.submission.minor1 = 0
+
+        with self.assertRaisesMessage(ValidationError, "Locked marks cannot be modified."):
+            self.submission.save()
+
+        self.assertEqual(self.stored_minor1(), 10)
+
+    def test_stale_copy_cannot_overwrite_a_row_locked_since_loading(self):
+        stale = MarksSubmission.objects.get()
+        MarksSubmission.objects.lock_all()
+
+        stale.minor1 = 0
+        with self.assertRaises(ValidationError):
+            stale.save()
+
+        self.assertEqual(self.stored_minor1(), 10)
+
+    def test_rejected_save_leaves_the_enclosing_transaction_usable(self):
+        self.submission.lock()
+
+        with transaction.atomic():
+            with self.assertRaises(ValidationError):
+                self.submission.save()
+
+            # Would raise TransactionManagementError if the block were broken
+            self.submission.student.refresh_from_db()
+            FinalGrade.objects.count()
+
+    def test_lock_persists_only_the_flag(self):
+        self.submission.minor1 = 99
+        self.submission.lock()
+
+        stored = MarksSubmission.objects.get()
+        self.assertTrue(stored.is_locked)
+        self.assertEqual(stored.minor1, 10)
+
+    def test_each_model_uses_its_own_lock_field(self):
+        grade = self.grade(self.students[0], self.maths_offering, "B", frozen=False)
+        grade.freeze()
+        grade.grade_letter = "A"
+        with self.assertRaisesMessage(ValidationError, "Frozen grades cannot be modified."):
+            grade.save()
+
+        result = SemesterResult.objects.create(
+            student=self.students[0],
+            semester=self.sem1,
+            sgpa=Decimal("8.00"),
+            published_by=self.exam,
+            is_locked=True,
+        )
+        result.sgpa = Decimal("9.00")
+        with self.assertRaises(ValidationError):
+            result.save()
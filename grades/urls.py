@@ -23,12 +23,24 @@ urlpatterns = [
         name="exam_upload_final_grades"
     ),
 
+    path(
+        "exam/grade-import/<int:job_id>/",
+        views.exam_grade_import,
+        name="exam_grade_import"
+    ),
+
     path(
         "exam/semester/<int:semester_id>/upload-results/",
         views.exam_upload_semester_results,
         name="exam_upload_semester_results"
     ),
 
+    path(
+        "exam/semester/<int:semester_id>/compute-results/",
+        views.exam_compute_semester_results,
+        name="exam_compute_semester_results"
+    ),
+
     path(
         "exam/offering/<int:offering_id>/freeze/",
         views.exam_freeze_results,
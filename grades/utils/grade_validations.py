@@ -1,6 +1,8 @@
 # grades/utils/grade_validations.py
 
-ALLOWED_GRADES = ["EX", "A", "B", "C", "D", "P", "M", "F", "X", "R"]
+from grades.services.grade_points import GRADE_POINTS
+
+ALLOWED_GRADES = list(GRADE_POINTS)
 
 
 def validate_grade(grade):
@@ -1,14 +1,43 @@
 from django.contrib import admin
-from .models import Notification, NotificationRecipient
+from django.db import transaction
+
+from .models import Notification, NotificationArchive, NotificationRecipient
+from .services import publish_broadcast, reset_audience_unread
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ("title", "notification_type", "sender", "created_at")
+    list_display = ("title", "notification_type", "is_broadcast", "dispatch_status", "sender", "created_at")
     search_fields = ("title", "message")
-    list_filter = ("notification_type", "created_at")
+    list_filter = ("notification_type", "is_broadcast", "dispatch_status", "created_at")
+    readonly_fields = (
+        "is_global",
+        "is_broadcast",
+        "dispatch_status",
+        "recipients_total",
+        "recipients_dispatched",
+        "dispatched_at",
+    )
+
+    def save_model(self, request, obj, form, change):
+        # Notifications written here have no recipient rows: they are
+        # broadcasts matched to their audience by the targeting fields
+        if change:
+            super().save_model(request, obj, form, change)
+            if obj.is_broadcast:
+                transaction.on_commit(lambda: reset_audience_unread(obj))
+            else:
+                # Keep the recipient rows' copy in step for inbox filters
+                obj.recipients_entries.update(notification_type=obj.notification_type)
+        else:
+            publish_broadcast(obj)
 
 
 @admin.register(NotificationRecipient)
 class NotificationRecipientAdmin(admin.ModelAdmin):
     list_display = ("notification", "user", "is_read", "read_at")
-    list_filter = ("is_read",)
\ No newline at end of file
+    list_filter = ("is_read",)
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ("title", "user", "notification_type", "created_at", "read_at", "archived_at")
+    list_filter = ("notification_type",)
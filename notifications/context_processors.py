@@ -1,10 +1,7 @@
-from notifications.models import NotificationRecipient
+from notifications.services import get_unread_count
 
 def unread_notifications(request):
     if request.user.is_authenticated:
-        count = NotificationRecipient.objects.filter(
-            user=request.user,
-            is_read=False
-        ).count()
+        count = get_unread_count(request.user)
         return {"unread_notifications_count": count}
     return {}
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.services import ARCHIVE_BATCH_SIZE, archive_read_notifications
+
+
+class Command(BaseCommand):
+    help = "Archive read notifications and drop broadcasts older than the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.NOTIFICATION_RETENTION_DAYS,
+            help="Archive read notifications older than this many days.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ARCHIVE_BATCH_SIZE,
+            help="Rows moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_read_notifications(
+            older_than_days=options["days"],
+            batch_size=options["batch_size"]
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} notification(s)."))
@@ -0,0 +1,153 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_existing_broadcasts(apps, schema_editor):
+    # Global / role notifications created without recipient rows (e.g. from
+    # the admin) were only ever shown by matching at read time.
+    Notification = apps.get_model("notifications", "Notification")
+    Notification.objects.filter(
+        models.Q(is_global=True) | models.Q(target_role__isnull=False),
+        recipients_entries__isnull=True
+    ).update(is_broadcast=True)
+
+
+def copy_from_notification(apps, schema_editor):
+    NotificationRecipient = apps.get_model("notifications", "NotificationRecipient")
+    Notification = apps.get_model("notifications", "Notification")
+
+    notification = Notification.objects.filter(pk=models.OuterRef("notification_id"))
+
+    NotificationRecipient.objects.update(
+        created_at=models.Subquery(notification.values("created_at")[:1]),
+        notification_type=models.Subquery(notification.values("notification_type")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0004_alter_academicyear_id_alter_course_id_and_more'),
+        ('accounts', '0006_otpverification_purpose'),
+        ('notifications', '0003_notification_course_offering_notification_is_global_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('notification_type', models.CharField(max_length=10)),
+                ('created_at', models.DateTimeField()),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NotificationRead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NotificationReadState',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_read_state', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('read_all_before', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='accounts.department'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='dispatch_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='sent', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='dispatched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='is_broadcast',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='recipients_dispatched',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='recipients_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notificationrecipient',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='notificationrecipient',
+            name='notification_type',
+            field=models.CharField(choices=[('INFO', 'Info'), ('WARNING', 'Warning'), ('CRITICAL', 'Critical')], default='INFO', max_length=10),
+        ),
+        # Backfill before the indexes below are built, so each is built once
+        migrations.RunPython(mark_existing_broadcasts, migrations.RunPython.noop),
+        migrations.RunPython(copy_from_notification, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['is_broadcast', '-created_at', '-id'], name='notif_broadcast_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['is_broadcast', 'notification_type', '-created_at', '-id'], name='notif_broadcast_type_created'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationrecipient',
+            index=models.Index(fields=['user', '-created_at', '-notification'], name='notif_recipient_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationrecipient',
+            index=models.Index(fields=['user', 'is_read', '-created_at', '-notification'], name='notif_recipient_user_read'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationrecipient',
+            index=models.Index(fields=['user', 'notification_type', '-created_at', '-notification'], name='notif_recipient_user_type'),
+        ),
+        migrations.AddField(
+            model_name='notificationarchive',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='notificationread',
+            name='notification',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reads', to='notifications.notification'),
+        ),
+        migrations.AddField(
+            model_name='notificationread',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_reads', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='notificationarchive',
+            index=models.Index(fields=['user', '-created_at'], name='notif_archive_user_created'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='notificationread',
+            unique_together={('user', 'notification')},
+        ),
+    ]
@@ -48,12 +48,64 @@ class Notification(models.Model):
         blank=True,
         related_name="notifications"
     )
+    department = models.ForeignKey(
+        "accounts.Department",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="notifications"
+    )
     link = models.URLField(blank=True, null=True)
 
+    # Broadcasts are stored once and matched to users at read time
+    # (is_global / target_role / department / course_offering);
+    # everything else is delivered through NotificationRecipient rows.
+    is_broadcast = models.BooleanField(default=False)
+
+    # Direct deliveries are fanned out by a background task
+    DISPATCH_PENDING = "pending"
+    DISPATCH_SENDING = "sending"
+    DISPATCH_SENT = "sent"
+    DISPATCH_FAILED = "failed"
+
+    DISPATCH_STATUS_CHOICES = [
+        (DISPATCH_PENDING, "Pending"),
+        (DISPATCH_SENDING, "Sending"),
+        (DISPATCH_SENT, "Sent"),
+        (DISPATCH_FAILED, "Failed"),
+    ]
+
+    dispatch_status = models.CharField(
+        max_length=10,
+        choices=DISPATCH_STATUS_CHOICES,
+        default=DISPATCH_SENT
+    )
+    recipients_total = models.PositiveIntegerField(default=0)
+    recipients_dispatched = models.PositiveIntegerField(default=0)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Broadcast half of the inbox keyset pagination, optionally
+            # filtered by type
+            models.Index(
+                fields=["is_broadcast", "-created_at", "-id"],
+                name="notif_broadcast_created_id"
+            ),
+            models.Index(
+                fields=["is_broadcast", "notification_type", "-created_at", "-id"],
+                name="notif_broadcast_type_created"
+            ),
+        ]
+
+    @property
+    def dispatch_progress(self):
+        if not self.recipients_total:
+            return 100 if self.dispatch_status == self.DISPATCH_SENT else 0
+        return round(self.recipients_dispatched * 100 / self.recipients_total)
 
     def __str__(self):
         return self.title
@@ -73,14 +125,115 @@ class NotificationRecipient(models.Model):
     is_read = models.BooleanField(default=False)
     read_at = models.DateTimeField(null=True, blank=True)
 
+    # Copied from the notification so a user's inbox is paged on this
+    # table's own (user, created_at) indexes
+    notification_type = models.CharField(
+        max_length=10,
+        choices=Notification.NOTIFICATION_TYPE_CHOICES,
+        default=Notification.INFO
+    )
+    created_at = models.DateTimeField()
+
     class Meta:
         unique_together = ("notification", "user")
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-notification"],
+                name="notif_recipient_user_created"
+            ),
+            models.Index(
+                fields=["user", "is_read", "-created_at", "-notification"],
+                name="notif_recipient_user_read"
+            ),
+            models.Index(
+                fields=["user", "notification_type", "-created_at", "-notification"],
+                name="notif_recipient_user_type"
+            ),
+        ]
 
     def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.read_at = timezone.now()
-            self.save()
+        from notifications.services import decrement_unread
+
+        if self.is_read:
+            return False
+
+        self.is_read = True
+        self.read_at = timezone.now()
+
+        # Conditional UPDATE: a second click must not decrement twice
+        updated = NotificationRecipient.objects.filter(
+            pk=self.pk,
+            is_read=False
+        ).update(is_read=True, read_at=self.read_at)
+
+        if updated:
+            decrement_unread(self.user_id)
+
+        return bool(updated)
             
     def __str__(self):
         return f"{self.user} → {self.notification}"
+
+
+class NotificationRead(models.Model):
+    """
+    Read receipt for a broadcast notification (the read-set).
+    """
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.CASCADE,
+        related_name="reads"
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="notification_reads"
+    )
+
+    read_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("user", "notification")
+
+
+class NotificationReadState(models.Model):
+    """
+    Read watermark: every broadcast created up to read_all_before is read.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_read_state"
+    )
+
+    read_all_before = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user} read up to {self.read_all_before}"
+
+
+class NotificationArchive(models.Model):
+    """
+    Compact copy of a read, expired direct notification; written by the
+    retention job so NotificationRecipient only holds recent rows.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_notifications"
+    )
+
+    title = models.CharField(max_length=200)
+    notification_type = models.CharField(max_length=10)
+    created_at = models.DateTimeField()
+    read_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="notif_archive_user_created"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} → {self.title}"
@@ -1,19 +1,390 @@
-from .models import Notification, NotificationRecipient
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, Case, Exists, F, OuterRef, Q, QuerySet, Subquery, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from academics.models import Enrollment, FacultyAssignment
+from accounts.models import FacultyProfile, StudentProfile
+
+from .models import (
+    Notification,
+    NotificationArchive,
+    NotificationRead,
+    NotificationReadState,
+    NotificationRecipient,
+)
+
+UNREAD_CACHE_KEY = "notifications:unread:{}"
+UNREAD_CACHE_TTL = 60 * 60 * 24
+
+DISPATCH_CHUNK_SIZE = 1000
+# Explicit recipient ids travel in the task message; larger audiences
+# must be described by the targeting fields
+MAX_EXPLICIT_RECIPIENTS = 1000
+INBOX_PAGE_SIZE = 20
+ARCHIVE_BATCH_SIZE = 1000
+
+
+# ---------------------------------------------------------------
+# Inbox (direct rows + broadcasts matched at read time)
+# ---------------------------------------------------------------
+
+def broadcast_filter(user):
+    """
+    Q matching the broadcasts addressed to this user. Every targeting
+    field that is set must match; faculty match the offerings they teach.
+    """
+    if user.role == "FACULTY":
+        departments = FacultyProfile.objects.filter(user=user).values("department")
+        offerings = FacultyAssignment.objects.filter(
+            faculty=user,
+            is_active=True
+        ).values("offering")
+    else:
+        departments = StudentProfile.objects.filter(user=user).values("department")
+        offerings = Enrollment.objects.filter(
+            student=user,
+            is_active=True
+        ).values("offering")
+
+    return (
+        Q(is_broadcast=True) &
+        (Q(target_role__isnull=True) | Q(target_role=user.role)) &
+        (Q(department__isnull=True) | Q(department__in=Subquery(departments))) &
+        (Q(course_offering__isnull=True) | Q(course_offering__in=Subquery(offerings)))
+    )
+
+
+def _broadcasts(user):
+    """
+    Broadcasts addressed to the user, annotated with is_read (a read
+    receipt, or created before the user's read watermark).
+    """
+
+    watermark = NotificationReadState.objects.filter(
+        user=user
+    ).values("read_all_before")
+
+    return Notification.objects.filter(
+        broadcast_filter(user)
+    ).annotate(
+        has_receipt=Exists(
+            NotificationRead.objects.filter(notification=OuterRef("pk"), user=user)
+        ),
+        is_read=Case(
+            When(
+                Q(has_receipt=True) |
+                Q(created_at__lte=Subquery(watermark)),
+                then=Value(True)
+            ),
+            default=Value(False),
+            output_field=BooleanField()
+        )
+    )
+
+
+def visible_notifications(user):
+    """
+    Notifications the user may open: their direct ones and the broadcasts
+    addressed to them. Meant for lookups by pk; pages come from
+    get_inbox_page.
+    """
+    return Notification.objects.filter(
+        Exists(NotificationRecipient.objects.filter(notification=OuterRef("pk"), user=user)) |
+        broadcast_filter(user)
+    )
+
+
+def _encode_cursor(notification):
+    return f"{notification.created_at.isoformat()}_{notification.pk}"
+
+
+def _decode_cursor(cursor):
+    created_at, _, pk = (cursor or "").rpartition("_")
+    try:
+        return parse_datetime(created_at), int(pk)
+    except (TypeError, ValueError):
+        return None, None
+
+
+def get_inbox_page(
+    user,
+    cursor=None,
+    size=INBOX_PAGE_SIZE,
+    unread=False,
+    notification_type=None
+):
+    """
+    One keyset page of the user's inbox, newest first: a list of
+    Notifications with is_read set, and the cursor of the next page (None
+    on the last one).
+
+    The page is merged from two queries of at most size + 1 rows each, the
+    user's recipient rows and the broadcasts addressed to them, so its
+    cost does not grow with the Notification table. Each seeks on
+    (created_at, notification id) instead of OFFSET, along its own index:
+    the recipient rows carry copies of created_at and notification_type
+    for that.
+    """
+    created_at, pk = _decode_cursor(cursor)
+
+    direct = NotificationRecipient.objects.filter(
+        user=user
+    ).select_related("notification__sender")
+
+    broadcasts = _broadcasts(user).select_related("sender")
+
+    if unread:
+        direct = direct.filter(is_read=False)
+        broadcasts = broadcasts.filter(is_read=False)
+
+    if notification_type:
+        direct = direct.filter(notification_type=notification_type)
+        broadcasts = broadcasts.filter(notification_type=notification_type)
+
+    if created_at is not None:
+        direct = direct.filter(
+            Q(created_at__lt=created_at) |
+            Q(created_at=created_at, notification_id__lt=pk)
+        )
+        broadcasts = broadcasts.filter(
+            Q(created_at__lt=created_at) |
+            Q(created_at=created_at, pk__lt=pk)
+        )
+
+    notifications = []
+
+    for entry in direct.order_by("-created_at", "-notification_id")[:size + 1]:
+        entry.notification.is_read = entry.is_read
+        notifications.append(entry.notification)
+
+    rows = list(islice(
+        heapq.merge(
+            notifications,
+            broadcasts.order_by("-created_at", "-id")[:size + 1],
+            key=lambda n: (n.created_at, n.pk),
+            reverse=True
+        ),
+        size + 1
+    ))
+
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        next_cursor = _encode_cursor(rows[-1])
+
+    return rows, next_cursor
+
+
+def mark_read(user, notification):
+    """
+    Marks one notification read for the user. Returns True if it was
+    unread before.
+    """
+
+    if not notification.is_broadcast:
+        entry = NotificationRecipient.objects.filter(
+            notification=notification,
+            user=user
+        ).first()
+        if entry is None:
+            return False
+        return entry.mark_as_read()
+
+    if not _broadcasts(user).filter(pk=notification.pk, is_read=False).exists():
+        return False
+
+    try:
+        NotificationRead.objects.create(notification=notification, user=user)
+    except IntegrityError:
+        return False
+
+    decrement_unread(user.id)
+    return True
+
+
+def mark_all_read(user, notification_type=None, course_offering=None):
+    """
+    Marks the user's whole inbox read, or only one type and/or offering.
+    Direct rows are flipped with a single UPDATE; broadcasts move the read
+    watermark when unfiltered and get read receipts otherwise.
+    """
+
+    filters = {}
+    if notification_type:
+        filters["notification_type"] = notification_type
+    if course_offering:
+        filters["course_offering"] = course_offering
+
+    now = timezone.now()
+
+    direct = NotificationRecipient.objects.filter(user=user, is_read=False)
+    if notification_type:
+        direct = direct.filter(notification_type=notification_type)
+    if course_offering:
+        direct = direct.filter(notification__course_offering=course_offering)
+
+    direct.update(is_read=True, read_at=now)
+
+    if not filters:
+        NotificationReadState.objects.update_or_create(
+            user=user,
+            defaults={"read_all_before": now}
+        )
+    else:
+        unread = _broadcasts(user).filter(
+            is_read=False,
+            **filters
+        ).values_list("id", flat=True)
+
+        NotificationRead.objects.bulk_create(
+            [NotificationRead(notification_id=pk, user=user) for pk in unread],
+            ignore_conflicts=True
+        )
+
+    reset_unread([user.id])
+
+
+# ---------------------------------------------------------------
+# Unread counter
+# ---------------------------------------------------------------
+
+def _unread_key(user_id):
+    return UNREAD_CACHE_KEY.format(user_id)
+
+
+def get_unread_count(user):
+    """
+    Cached unread counter; recounted lazily when missing from the cache.
+    """
+    key = _unread_key(user.id)
+    count = cache.get(key)
+
+    if count is None:
+        count = (
+            NotificationRecipient.objects.filter(user=user, is_read=False).count() +
+            _broadcasts(user).filter(is_read=False).count()
+        )
+        # add() so a concurrent update is not overwritten
+        cache.add(key, count, UNREAD_CACHE_TTL)
+
+    return count
+
+
+def decrement_unread(user_id, by=1):
+    key = _unread_key(user_id)
+    try:
+        if cache.decr(key, by) < 0:
+            cache.delete(key)
+    except ValueError:
+        pass
+
+
+def reset_unread(user_ids):
+    cache.delete_many([_unread_key(user_id) for user_id in user_ids])
+
+
+def reset_audience_unread(notification):
+    """
+    Drops the cached counters of everyone a broadcast is addressed to, so
+    only they recount.
+    """
+    user_ids = audience(notification).order_by().values_list(
+        "id", flat=True
+    ).iterator(chunk_size=DISPATCH_CHUNK_SIZE)
+
+    for chunk in _chunks(user_ids, DISPATCH_CHUNK_SIZE):
+        reset_unread(chunk)
+
+
+# ---------------------------------------------------------------
+# Sending
+# ---------------------------------------------------------------
+
+def audience(notification):
+    """
+    Users addressed by a notification's targeting fields.
+    """
+    users = get_user_model().objects.filter(is_active=True)
+
+    if notification.target_role:
+        users = users.filter(role=notification.target_role)
+
+    if notification.department_id:
+        users = users.filter(
+            Q(studentprofile__department_id=notification.department_id) |
+            Q(facultyprofile__department_id=notification.department_id)
+        )
+
+    if notification.course_offering_id:
+        # Same rule as broadcast_filter: faculty teach, everyone else enrolls
+        users = users.filter(
+            Q(
+                Exists(FacultyAssignment.objects.filter(
+                    faculty=OuterRef("pk"),
+                    offering_id=notification.course_offering_id,
+                    is_active=True
+                )),
+                role="FACULTY"
+            ) |
+            Q(
+                Exists(Enrollment.objects.filter(
+                    student=OuterRef("pk"),
+                    offering_id=notification.course_offering_id,
+                    is_active=True
+                )),
+                ~Q(role="FACULTY")
+            )
+        )
+
+    return users
 
 
 def send_notification(
     *,
     title,
     message,
-    recipients,
+    recipients=None,
     sender=None,
     link=None,
-    notification_type=Notification.INFO
+    notification_type=Notification.INFO,
+    target_role=None,
+    department=None,
+    course_offering=None
 ):
     """
-    Central notification creator.
-    recipients → queryset or list of User objects
+    Central notification creator for direct deliveries.
+    recipients → a short list of Users or user ids (at most
+    MAX_EXPLICIT_RECIPIENTS); when omitted, the targeting fields select
+    the audience, which the task resolves itself.
+
+    Only the Notification is written here; the recipient rows are
+    inserted by dispatch_notification_task once the transaction commits.
     """
+    from .tasks import dispatch_notification_task
+
+    user_ids = None
+
+    if isinstance(recipients, QuerySet):
+        raise TypeError(
+            "Pass a list of recipients, or the targeting fields for a large audience."
+        )
+
+    if recipients is not None:
+        user_ids = [getattr(user, "pk", user) for user in recipients]
+
+        if len(user_ids) > MAX_EXPLICIT_RECIPIENTS:
+            raise ValueError(
+                f"More than {MAX_EXPLICIT_RECIPIENTS} recipients; "
+                f"use the targeting fields instead."
+            )
 
     notification = Notification.objects.create(
         title=title,
@@ -21,14 +392,220 @@ def send_notification(
         sender=sender,
         link=link,
         notification_type=notification_type,
+        target_role=target_role,
+        department=department,
+        course_offering=course_offering,
+        dispatch_status=Notification.DISPATCH_PENDING,
     )
 
-    NotificationRecipient.objects.bulk_create([
-        NotificationRecipient(
-            notification=notification,
-            user=user
-        )
-        for user in recipients
-    ])
+    transaction.on_commit(
+        lambda: dispatch_notification_task.delay(notification.id, user_ids)
+    )
 
     return notification
+
+
+def _chunks(ids, size):
+    ids = iter(ids)
+    while chunk := list(islice(ids, size)):
+        yield chunk
+
+
+def dispatch_notification(notification_id, user_ids=None):
+    """
+    Inserts the recipient rows of a direct notification in chunks, each
+    in its own short transaction, recording progress on the Notification.
+    ignore_conflicts makes a retried dispatch skip rows already inserted.
+    """
+
+    notifications = Notification.objects.filter(pk=notification_id)
+    notification = notifications.get()
+
+    if user_ids is None:
+        users = audience(notification).order_by("id").values_list("id", flat=True)
+        total = users.count()
+        user_ids = users.iterator(chunk_size=DISPATCH_CHUNK_SIZE)
+    else:
+        total = len(user_ids)
+
+    notifications.update(
+        dispatch_status=Notification.DISPATCH_SENDING,
+        recipients_total=total,
+        recipients_dispatched=0
+    )
+
+    try:
+        for chunk in _chunks(user_ids, DISPATCH_CHUNK_SIZE):
+            NotificationRecipient.objects.bulk_create(
+                [
+                    NotificationRecipient(
+                        notification_id=notification_id,
+                        user_id=user_id,
+                        notification_type=notification.notification_type,
+                        created_at=notification.created_at
+                    )
+                    for user_id in chunk
+                ],
+                ignore_conflicts=True
+            )
+
+            notifications.update(
+                recipients_dispatched=F("recipients_dispatched") + len(chunk)
+            )
+
+            # Recount rather than increment: a retry may re-send a chunk
+            reset_unread(chunk)
+    except Exception:
+        notifications.update(dispatch_status=Notification.DISPATCH_FAILED)
+        raise
+
+    notifications.update(
+        dispatch_status=Notification.DISPATCH_SENT,
+        dispatched_at=timezone.now()
+    )
+
+    return total
+
+
+def send_broadcast(
+    *,
+    title,
+    message,
+    sender=None,
+    link=None,
+    notification_type=Notification.INFO,
+    target_role=None,
+    department=None,
+    course_offering=None
+):
+    """
+    Stores a broadcast once; its audience (everyone, a role, a department
+    and/or an offering's students and faculty) is resolved at read time.
+    """
+
+    return publish_broadcast(Notification(
+        title=title,
+        message=message,
+        sender=sender,
+        link=link,
+        notification_type=notification_type,
+        target_role=target_role,
+        department=department,
+        course_offering=course_offering,
+    ))
+
+
+def publish_broadcast(notification):
+    """
+    Saves a new Notification as a broadcast (send_broadcast and the admin
+    both go through here) and, once committed, drops the cached counters
+    of its audience.
+    """
+
+    notification.is_broadcast = True
+    notification.is_global = not (
+        notification.target_role or
+        notification.department_id or
+        notification.course_offering_id
+    )
+    notification.save()
+
+    transaction.on_commit(lambda: reset_audience_unread(notification))
+
+    return notification
+
+
+# ---------------------------------------------------------------
+# Retention
+# ---------------------------------------------------------------
+
+def archive_read_notifications(older_than_days=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Moves read direct notifications older than the retention period into
+    NotificationArchive, one short transaction per batch, then deletes the
+    direct notifications left without recipients, the expired broadcasts
+    (with their read receipts) and the receipts already covered by a read
+    watermark. Broadcasts are not archived per user: once past the
+    retention period they simply leave every inbox. Returns the number of
+    rows archived.
+    """
+
+    if older_than_days is None:
+        older_than_days = settings.NOTIFICATION_RETENTION_DAYS
+
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+
+    expired = NotificationRecipient.objects.filter(
+        is_read=True,
+        created_at__lt=cutoff
+    ).order_by("id").values_list(
+        "id",
+        "user_id",
+        "notification__title",
+        "notification_type",
+        "created_at",
+        "read_at"
+    )
+
+    archived = 0
+
+    while batch := list(expired[:batch_size]):
+        with transaction.atomic():
+            NotificationArchive.objects.bulk_create([
+                NotificationArchive(
+                    user_id=user_id,
+                    title=title,
+                    notification_type=notification_type,
+                    created_at=created_at,
+                    read_at=read_at
+                )
+                for _, user_id, title, notification_type, created_at, read_at in batch
+            ])
+
+            NotificationRecipient.objects.filter(
+                id__in=[row[0] for row in batch]
+            ).delete()
+
+        archived += len(batch)
+
+    _delete_in_batches(
+        Notification.objects.filter(
+            is_broadcast=False,
+            created_at__lt=cutoff,
+            recipients_entries__isnull=True
+        ),
+        batch_size
+    )
+
+    expired_broadcasts = Notification.objects.filter(
+        is_broadcast=True,
+        created_at__lt=cutoff
+    ).order_by("pk")
+
+    while batch := list(expired_broadcasts[:batch_size]):
+        Notification.objects.filter(pk__in=[n.pk for n in batch]).delete()
+
+        # Unread ones drop out of their audience's counters
+        for notification in batch:
+            reset_audience_unread(notification)
+
+    _delete_in_batches(
+        NotificationRead.objects.filter(
+            read_at__lt=cutoff
+        ).filter(
+            Exists(NotificationReadState.objects.filter(
+                user=OuterRef("user"),
+                read_all_before__gte=OuterRef("notification__created_at")
+            ))
+        ),
+        batch_size
+    )
+
+    return archived
+
+
+def _delete_in_batches(queryset, batch_size):
+    ids = queryset.order_by("pk").values_list("pk", flat=True)
+
+    while batch := list(ids[:batch_size]):
+        queryset.model.objects.filter(pk__in=batch).delete()
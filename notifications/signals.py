@@ -1,8 +1,8 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from assignments.models import Assignment
-from notifications.models import Notification, NotificationRecipient
-from academics.models import Enrollment
+from notifications.models import Notification
+from notifications.services import send_broadcast
 
 
 @receiver(post_save, sender=Assignment)
@@ -13,25 +13,11 @@ def notify_assignment_created(sender, instance, created, **kwargs):
 
     course = instance.offering.course
 
-    # Create notification
-    notification = Notification.objects.create(
+    # Stored once; enrolled students see it at read time
+    send_broadcast(
         title=f"New Assignment: {instance.title}",
         message=f"A new assignment has been posted for {course.course_title}.",
-        notification_type="INFO",
+        notification_type=Notification.INFO,
+        target_role="STUDENT",
         course_offering=instance.offering
     )
-
-    # Get enrolled students
-    student_ids = Enrollment.objects.filter(
-        offering=instance.offering,
-        is_active=True
-    ).values_list("student_id", flat=True)
-
-    # Create notification recipients
-    NotificationRecipient.objects.bulk_create([
-        NotificationRecipient(
-            notification=notification,
-            user_id=student_id
-        )
-        for student_id in student_ids
-    ])
\ No newline at end of file
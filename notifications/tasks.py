@@ -0,0 +1,20 @@
+from celery import shared_task
+
+from notifications.models import Notification
+from notifications.services import archive_read_notifications, dispatch_notification
+
+
+# Safe to retry: recipient rows are inserted with ignore_conflicts
+@shared_task(
+    autoretry_for=(Exception,),
+    dont_autoretry_for=(Notification.DoesNotExist,),
+    max_retries=5,
+    retry_backoff=True
+)
+def dispatch_notification_task(notification_id, user_ids=None):
+    return dispatch_notification(notification_id, user_ids)
+
+
+@shared_task
+def archive_read_notifications_task():
+    return archive_read_notifications()
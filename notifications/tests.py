@@ -1,3 +1,486 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from academics.models import (
+    AcademicYear,
+    Course,
+    CourseOffering,
+    Enrollment,
+    FacultyAssignment,
+    Semester,
+)
+from accounts.models import Department, FacultyProfile, StudentProfile, User
+from notifications.models import (
+    Notification,
+    NotificationArchive,
+    NotificationRead,
+    NotificationReadState,
+    NotificationRecipient,
+)
+from notifications import services
+from notifications.services import (
+    archive_read_notifications,
+    dispatch_notification,
+    get_inbox_page,
+    get_unread_count,
+    mark_all_read,
+    mark_read,
+    send_broadcast,
+    send_notification,
+)
+from notifications.tasks import dispatch_notification_task
+
+
+class NotificationTestCase(TestCase):
+    """
+    CSE with one faculty member teaching CS201 to three students, and one
+    ECE student outside the offering.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cse = Department.objects.create(name="CSE")
+        cls.ece = Department.objects.create(name="ECE")
+        academic_year = AcademicYear.objects.create(start_year=2025, end_year=2026)
+        semester = Semester.objects.create(academic_year=academic_year, year=2, semester=1)
+
+        cls.faculty = User.objects.create_user(
+            username="fac1", email="fac1@example.com", password="pw", role="FACULTY"
+        )
+        FacultyProfile.objects.create(
+            user=cls.faculty, department=cls.cse, designation="Assistant Professor"
+        )
+
+        course = Course.objects.create(
+            course_code="CS201", course_title="Data Structures", credits=4,
+            category="PCC", department=cls.cse,
+        )
+        cls.offering = CourseOffering.objects.create(
+            course=course, academic_year=academic_year, semester=semester,
+            department=cls.cse, year=2, section="A",
+        )
+        FacultyAssignment.objects.create(faculty=cls.faculty, offering=cls.offering)
+
+        cls.students = []
+        for i in range(3):
+            student = User.objects.create_user(
+                username=f"24cs{i:03d}", email=f"24cs{i:03d}@example.com",
+                password="pw", role="STUDENT",
+            )
+            StudentProfile.objects.create(user=student, department=cls.cse, year=2, section="A")
+            Enrollment.objects.create(student=student, offering=cls.offering)
+            cls.students.append(student)
+
+        cls.outsider = User.objects.create_user(
+            username="24ec000", email="24ec000@example.com", password="pw", role="STUDENT"
+        )
+        StudentProfile.objects.create(user=cls.outsider, department=cls.ece, year=2, section="A")
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def send(self, recipients=None, **fields):
+        """
+        send_notification with the dispatch task run in-process on commit.
+        """
+        fields.setdefault("title", "Direct")
+        fields.setdefault("message", "Hello")
+
+        with mock.patch.object(
+            dispatch_notification_task, "delay", side_effect=dispatch_notification
+        ), self.captureOnCommitCallbacks(execute=True):
+            return send_notification(recipients=recipients, **fields)
+
+    def broadcast(self, **fields):
+        fields.setdefault("title", "Broadcast")
+        fields.setdefault("message", "Hello all")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            return send_broadcast(**fields)
+
+
+class UnreadCounterTests(NotificationTestCase):
+
+    def test_counter_is_recounted_once_then_served_from_the_cache(self):
+        self.send(self.students[:2])
+        self.broadcast(course_offering=self.offering)
+
+        self.assertEqual(get_unread_count(self.students[0]), 2)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.students[0]), 2)
+
+    def test_reading_decrements_the_cached_counter_once(self):
+        direct = self.send(self.students[:1])
+        broadcast = self.broadcast()
+        student = self.students[0]
+        self.assertEqual(get_unread_count(student), 2)
+
+        self.assertTrue(mark_read(student, direct))
+        self.assertFalse(mark_read(student, direct))
+        self.assertTrue(mark_read(student, broadcast))
+        self.assertFalse(mark_read(student, broadcast))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(student), 0)
+
+    def test_new_notifications_refresh_the_counters_of_their_audience(self):
+        student, other = self.students[0], self.students[1]
+        self.assertEqual(get_unread_count(student), 0)
+        self.assertEqual(get_unread_count(other), 0)
+
+        self.send([student])
+        self.assertEqual(get_unread_count(student), 1)
+        self.assertEqual(get_unread_count(other), 0)
+
+        self.broadcast(course_offering=self.offering)
+        self.assertEqual(get_unread_count(student), 2)
+        self.assertEqual(get_unread_count(other), 1)
+        self.assertEqual(get_unread_count(self.outsider), 0)
+
+    def test_counter_matches_a_recount_after_marking_rows_directly(self):
+        self.send(self.students)
+        student = self.students[0]
+        self.assertEqual(get_unread_count(student), 1)
+
+        NotificationRecipient.objects.get(user=student).mark_as_read()
+
+        self.assertEqual(get_unread_count(student), 0)
+        self.assertEqual(
+            NotificationRecipient.objects.filter(is_read=False).count(), 2
+        )
+        self.assertEqual(Notification.objects.get().dispatch_status, Notification.DISPATCH_SENT)
+
+
+class InboxTests(NotificationTestCase):
+
+    def inbox(self, user, **kwargs):
+        notifications, _ = get_inbox_page(user, **kwargs)
+        return [(n.title, n.is_read) for n in notifications]
+
+    def test_direct_and_broadcast_notifications_are_merged_newest_first(self):
+        student = self.students[0]
+        self.send([student], title="first")
+        self.broadcast(title="second")
+        self.send([student], title="third")
+        self.broadcast(title="fourth", course_offering=self.offering)
+
+        mark_read(student, Notification.objects.get(title="first"))
+        mark_read(student, Notification.objects.get(title="second"))
+
+        self.assertEqual(self.inbox(student), [
+            ("fourth", False), ("third", False), ("second", True), ("first", True),
+        ])
+        self.assertEqual(self.inbox(student, unread=True), [
+            ("fourth", False), ("third", False),
+        ])
+
+    def test_broadcast_targeting(self):
+        self.broadcast(title="everyone")
+        self.broadcast(title="students", target_role="STUDENT")
+        self.broadcast(title="ece", department=self.ece)
+        self.broadcast(title="cs201", course_offering=self.offering)
+        self.broadcast(title="cs201 students", course_offering=self.offering, target_role="STUDENT")
+
+        def titles(user):
+            return {title for title, _ in self.inbox(user)}
+
+        self.assertEqual(
+            titles(self.students[0]), {"everyone", "students", "cs201", "cs201 students"}
+        )
+        self.assertEqual(titles(self.outsider), {"everyone", "students", "ece"})
+        # Faculty see broadcasts of the offerings they teach
+        self.assertEqual(titles(self.faculty), {"everyone", "cs201"})
+
+    def test_page_is_two_queries_however_large_the_inbox(self):
+        for i in range(5):
+            self.send(self.students, title=f"direct {i}")
+            self.broadcast(title=f"broadcast {i}")
+
+        with self.assertNumQueries(2):
+            notifications, cursor = get_inbox_page(self.students[0], size=4)
+
+        self.assertEqual(len(notifications), 4)
+        self.assertIsNotNone(cursor)
+
+    def test_pages_with_equal_timestamps_have_no_gaps_or_repeats(self):
+        student = self.students[0]
+        for i in range(3):
+            self.send([student], title=f"direct {i}")
+            self.broadcast(title=f"broadcast {i}")
+
+        moment = timezone.now()
+        Notification.objects.update(created_at=moment)
+        NotificationRecipient.objects.update(created_at=moment)
+
+        seen, cursor = [], None
+        while True:
+            notifications, cursor = get_inbox_page(student, cursor, size=2)
+            self.assertLessEqual(len(notifications), 2)
+            seen += [n.pk for n in notifications]
+            if cursor is None:
+                break
+
+        # Ties on created_at fall back to the notification id, across
+        # both the recipient rows and the broadcasts
+        self.assertEqual(
+            seen,
+            list(Notification.objects.order_by("-id").values_list("id", flat=True))
+        )
+
+    def test_type_filter_pages_through_both_parts(self):
+        student = self.students[0]
+        for i in range(2):
+            self.send([student], title=f"direct warning {i}", notification_type=Notification.WARNING)
+            self.send([student], title=f"direct info {i}")
+            self.broadcast(title=f"broadcast warning {i}", notification_type=Notification.WARNING)
+
+        first, cursor = get_inbox_page(student, size=3, notification_type=Notification.WARNING)
+        second, last = get_inbox_page(
+            student, cursor, size=3, notification_type=Notification.WARNING
+        )
+
+        self.assertEqual([n.title for n in first + second], [
+            "broadcast warning 1", "direct warning 1", "broadcast warning 0",
+            "direct warning 0",
+        ])
+        self.assertIsNone(last)
+
+    def test_broadcast_only_resets_the_counters_of_its_audience(self):
+        self.assertEqual(get_unread_count(self.outsider), 0)
+        self.assertEqual(get_unread_count(self.students[0]), 0)
+
+        self.broadcast(course_offering=self.offering)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.outsider), 0)
+        self.assertEqual(get_unread_count(self.students[0]), 1)
+
+    def test_notifications_created_in_the_admin_are_broadcasts(self):
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pw", role="ADMIN"
+        )
+        self.assertEqual(get_unread_count(self.students[0]), 0)
+        self.client.force_login(admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("admin:notifications_notification_add"), {
+                "title": "Holiday",
+                "message": "College closed tomorrow",
+                "notification_type": Notification.INFO,
+                "target_role": "STUDENT",
+            })
+
+        notification = Notification.objects.get()
+        self.assertTrue(notification.is_broadcast)
+        self.assertFalse(notification.is_global)
+        self.assertEqual(self.inbox(self.students[0]), [("Holiday", False)])
+        self.assertEqual(get_unread_count(self.students[0]), 1)
+        self.assertEqual(self.inbox(self.faculty), [])
+
+    def test_only_visible_notifications_can_be_opened(self):
+        direct = self.send([self.students[0]])
+        self.client.force_login(self.students[1])
+
+        response = self.client.post(
+            reverse("ajax_mark_notification_read", args=[direct.pk])
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(NotificationRecipient.objects.filter(is_read=True).exists())
+
+
+class DispatchTests(NotificationTestCase):
+
+    def test_explicit_recipients_travel_as_ids_after_commit(self):
+        with mock.patch.object(dispatch_notification_task, "delay") as delay:
+            with self.captureOnCommitCallbacks() as callbacks:
+                notification = send_notification(
+                    title="t", message="m", recipients=[self.students[0], self.students[1].pk]
+                )
+            delay.assert_not_called()
+
+            callbacks[0]()
+
+        delay.assert_called_once_with(
+            notification.id, [self.students[0].pk, self.students[1].pk]
+        )
+        self.assertEqual(notification.dispatch_status, Notification.DISPATCH_PENDING)
+
+    def test_targeted_sends_are_resolved_by_the_task(self):
+        with mock.patch.object(dispatch_notification_task, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                notification = send_notification(
+                    title="t", message="m", course_offering=self.offering
+                )
+
+        delay.assert_called_once_with(notification.id, None)
+
+        self.assertEqual(dispatch_notification(notification.id), 4)
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.dispatch_status, Notification.DISPATCH_SENT)
+        self.assertEqual(notification.dispatch_progress, 100)
+        self.assertEqual(
+            set(notification.recipients_entries.values_list("user", flat=True)),
+            {s.pk for s in self.students} | {self.faculty.pk},
+        )
+
+    def test_querysets_and_large_lists_are_rejected(self):
+        with self.assertRaises(TypeError):
+            send_notification(
+                title="t", message="m", recipients=User.objects.filter(role="STUDENT")
+            )
+
+        with mock.patch.object(services, "MAX_EXPLICIT_RECIPIENTS", 2), \
+                self.assertRaises(ValueError):
+            send_notification(title="t", message="m", recipients=self.students)
+
+        self.assertFalse(Notification.objects.exists())
+
+    def test_failed_dispatch_is_recorded_and_retried(self):
+        notification = Notification.objects.create(
+            title="t", message="m", dispatch_status=Notification.DISPATCH_PENDING
+        )
+
+        with mock.patch.object(
+            NotificationRecipient.objects, "bulk_create", side_effect=RuntimeError("db down")
+        ), self.assertRaises(RuntimeError):
+            dispatch_notification(notification.id, [self.students[0].pk])
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.dispatch_status, Notification.DISPATCH_FAILED)
+
+        # A retry re-sends the whole list; rows already there are skipped
+        NotificationRecipient.objects.create(
+            notification=notification, user=self.students[0],
+            created_at=notification.created_at
+        )
+        self.assertEqual(dispatch_notification(notification.id, [self.students[0].pk]), 1)
+        self.assertEqual(notification.recipients_entries.count(), 1)
+
+        self.assertEqual(dispatch_notification_task.max_retries, 5)
+        self.assertIn(Exception, dispatch_notification_task.autoretry_for)
+
+
+class MarkAllReadTests(NotificationTestCase):
+
+    def unread_titles(self, user):
+        notifications, _ = get_inbox_page(user, unread=True)
+        return {n.title for n in notifications}
+
+    def test_whole_inbox_moves_the_watermark(self):
+        student = self.students[0]
+        self.send([student])
+        self.broadcast()
+        self.assertEqual(get_unread_count(student), 2)
+
+        mark_all_read(student)
+
+        self.assertEqual(get_unread_count(student), 0)
+        self.assertTrue(NotificationReadState.objects.filter(user=student).exists())
+        self.assertFalse(NotificationRead.objects.exists())
+
+        # Later broadcasts are past the watermark
+        self.broadcast(title="later")
+        self.assertEqual(self.unread_titles(student), {"later"})
+        self.assertEqual(get_unread_count(student), 1)
+
+    def test_filters_only_mark_matching_notifications(self):
+        student = self.students[0]
+        self.send([student], title="direct warning", notification_type=Notification.WARNING)
+        self.send([student], title="direct info")
+        self.broadcast(title="broadcast warning", notification_type=Notification.WARNING)
+        self.broadcast(title="cs201", course_offering=self.offering)
+
+        mark_all_read(student, notification_type=Notification.WARNING)
+        self.assertEqual(self.unread_titles(student), {"direct info", "cs201"})
+
+        mark_all_read(student, course_offering=self.offering)
+        self.assertEqual(self.unread_titles(student), {"direct info"})
+        self.assertEqual(get_unread_count(student), 1)
+        self.assertFalse(NotificationReadState.objects.exists())
+
+    def test_view_marks_one_offering(self):
+        student = self.students[0]
+        self.broadcast(title="cs201", course_offering=self.offering)
+        self.broadcast(title="everyone")
+        self.client.force_login(student)
+
+        response = self.client.post(
+            reverse("mark_all_notifications_read"), {"offering": self.offering.pk}
+        )
+
+        self.assertRedirects(response, reverse("student_notifications"))
+        self.assertEqual(self.unread_titles(student), {"everyone"})
+
+    def test_view_rejects_a_malformed_offering(self):
+        student = self.students[0]
+        self.broadcast()
+        self.client.force_login(student)
+
+        response = self.client.post(
+            reverse("mark_all_notifications_read"), {"offering": "abc"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(get_unread_count(student), 1)
+
+
+class ArchiveTests(NotificationTestCase):
+
+    def age(self, notification, days):
+        created_at = timezone.now() - timedelta(days=days)
+        Notification.objects.filter(pk=notification.pk).update(created_at=created_at)
+        notification.recipients_entries.update(created_at=created_at)
+
+    def test_read_expired_direct_rows_are_archived(self):
+        old = self.send(self.students[:2], title="old")
+        recent = self.send(self.students[:1], title="recent")
+        self.age(old, 200)
+        mark_read(self.students[0], old)
+        mark_read(self.students[0], recent)
+
+        self.assertEqual(archive_read_notifications(older_than_days=180), 1)
+
+        archived = NotificationArchive.objects.get()
+        self.assertEqual(
+            (archived.user, archived.title, archived.notification_type),
+            (self.students[0], "old", Notification.INFO)
+        )
+        # The unread copy and the recent row stay in the inbox
+        self.assertEqual(
+            set(NotificationRecipient.objects.values_list("user", "notification")),
+            {(self.students[1].pk, old.pk), (self.students[0].pk, recent.pk)}
+        )
+
+    def test_direct_notifications_without_recipients_are_deleted(self):
+        old = self.send(self.students[:1])
+        self.age(old, 200)
+        mark_read(self.students[0], old)
+
+        archive_read_notifications(older_than_days=180, batch_size=1)
+
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(NotificationArchive.objects.count(), 1)
+
+    def test_expired_broadcasts_are_deleted_with_their_receipts(self):
+        student = self.students[0]
+        old = self.broadcast(title="old", course_offering=self.offering)
+        recent = self.broadcast(title="recent")
+        self.age(old, 200)
+        mark_read(student, old)
+        self.assertEqual(get_unread_count(self.students[1]), 2)
+
+        archive_read_notifications(older_than_days=180)
 
-# Create your tests here.
+        self.assertEqual(list(Notification.objects.all()), [recent])
+        self.assertFalse(NotificationRead.objects.exists())
+        self.assertFalse(NotificationArchive.objects.exists())
+        self.assertEqual(get_unread_count(self.students[1]), 1)
@@ -2,12 +2,16 @@ from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, redirect, render
 
 from academics.models import CourseOffering
-from .models import Notification, NotificationRecipient
-from django.http import JsonResponse
-from django.contrib.auth import get_user_model
+from .services import (
+    get_inbox_page,
+    get_unread_count,
+    mark_all_read,
+    mark_read,
+    send_broadcast,
+    visible_notifications,
+)
+from django.http import HttpResponseBadRequest, JsonResponse
 from accounts.utils import is_hod
-from django.db.models import Q
-User = get_user_model()
 
 @login_required
 def faculty_send_notification(request):
@@ -41,44 +45,33 @@ def faculty_send_notification(request):
             facultyassignment__is_active=True
         )
 
-        # Create notification linked to course offering
-        notification = Notification.objects.create(
-            title=title,
-            message=message,
-            notification_type=notification_type,
-            sender=request.user,
-            course_offering=course_offering
-        )
-
         # --------------------------------
         # RECIPIENT LOGIC (Professional)
+        # Broadcasts are stored once and resolved at read time
         # --------------------------------
 
         if recipient_scope == "students":
             # Students enrolled in this subject
-            recipients = User.objects.filter(
-                enrollment__offering=course_offering,
-                enrollment__is_active = True
-            ).distinct()
+            send_broadcast(
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                sender=request.user,
+                target_role="STUDENT",
+                course_offering=course_offering
+            )
 
         elif recipient_scope == "department" and hod:
             # Entire department students
-            recipients = User.objects.filter(
-                studentprofile__department=faculty_profile.department
+            send_broadcast(
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                sender=request.user,
+                target_role="STUDENT",
+                department=faculty_profile.department
             )
 
-        else:
-            return redirect("faculty_send_notification")
-
-        # Create delivery entries
-        NotificationRecipient.objects.bulk_create([
-            NotificationRecipient(
-                notification=notification,
-                user=user
-            )
-            for user in recipients
-        ])
-
         return redirect("faculty_send_notification")
 
     return render(
@@ -90,62 +83,51 @@ def faculty_send_notification(request):
         }
     )
 
-@login_required
-def student_notifications(request):
+def _inbox(request):
+    """
+    The user's inbox as one keyset page, filtered by ?type=.
+    """
+    filter_type = request.GET.get("type")
+    cursor = request.GET.get("before")
 
-    notifications = (
-        NotificationRecipient.objects
-        .select_related("notification", "notification__sender")
-        .filter(user=request.user)
-        .order_by("-notification__created_at")
+    notifications, next_cursor = get_inbox_page(
+        request.user,
+        cursor,
+        unread=filter_type == "unread",
+        notification_type=filter_type if filter_type in ["INFO", "WARNING", "CRITICAL"] else None
     )
 
-    filter_type = request.GET.get("type")
-
-    if filter_type == "unread":
-        notifications = notifications.filter(is_read=False)
+    return {
+        "notifications": notifications,
+        "next_cursor": next_cursor,
+        "is_first_page": not cursor,
+        "unread_count": get_unread_count(request.user)
+    }
 
-    elif filter_type in ["INFO", "WARNING", "CRITICAL"]:
-        notifications = notifications.filter(
-            notification__notification_type=filter_type
-        )
 
-    unread_count = notifications.filter(is_read=False).count()
+@login_required
+def student_notifications(request):
 
     return render(
         request,
         "student/notifications.html",
-        {
-            "notifications": notifications,
-            "unread_count": unread_count
-        }
+        _inbox(request)
     )
 
 
 @login_required
 def mark_notification_read(request, pk):
-    nr = get_object_or_404(
-        NotificationRecipient,
-        pk=pk,
-        user=request.user
-    )
-    nr.mark_as_read()
+    notification = get_object_or_404(visible_notifications(request.user), pk=pk)
+    mark_read(request.user, notification)
     return redirect("student_notifications")
 
 @login_required
 def ajax_mark_notification_read(request, pk):
     if request.method == "POST":
-        nr = get_object_or_404(
-            NotificationRecipient,
-            pk=pk,
-            user=request.user
-        )
-        nr.mark_as_read()
+        notification = get_object_or_404(visible_notifications(request.user), pk=pk)
+        mark_read(request.user, notification)
 
-        unread_count = NotificationRecipient.objects.filter(
-            user=request.user,
-            is_read=False
-        ).count()
+        unread_count = get_unread_count(request.user)
 
         return JsonResponse({
             "success": True,
@@ -155,35 +137,39 @@ def ajax_mark_notification_read(request, pk):
     return JsonResponse({"success": False}, status=400)
 
 @login_required
-def faculty_notifications(request):
-
-    if not hasattr(request.user, "facultyprofile"):
-        return redirect("student_dashboard")
-
-    notifications = (
-        NotificationRecipient.objects
-        .select_related("notification", "notification__sender")
-        .filter(user=request.user)
-        .order_by("-notification__created_at")
+def mark_all_notifications_read(request):
+    inbox = "faculty_notifications" if hasattr(request.user, "facultyprofile") else "student_notifications"
+
+    if request.method != "POST":
+        return redirect(inbox)
+
+    notification_type = request.POST.get("type")
+    if notification_type not in ["INFO", "WARNING", "CRITICAL"]:
+        notification_type = None
+
+    course_offering = None
+    offering_id = request.POST.get("offering")
+    if offering_id:
+        if not offering_id.isdigit():
+            return HttpResponseBadRequest("offering must be a number.")
+        course_offering = get_object_or_404(CourseOffering, id=offering_id)
+
+    mark_all_read(
+        request.user,
+        notification_type=notification_type,
+        course_offering=course_offering
     )
 
-    filter_type = request.GET.get("type")
-
-    if filter_type == "unread":
-        notifications = notifications.filter(is_read=False)
+    return redirect(inbox)
 
-    elif filter_type in ["INFO", "WARNING", "CRITICAL"]:
-        notifications = notifications.filter(
-            notification__notification_type=filter_type
-        )
+@login_required
+def faculty_notifications(request):
 
-    unread_count = notifications.filter(is_read=False).count()
+    if not hasattr(request.user, "facultyprofile"):
+        return redirect("student_dashboard")
 
     return render(
         request,
         "faculty/faculty_notifications.html",
-        {
-            "notifications": notifications,
-            "unread_count": unread_count
-        }
+        _inbox(request)
     )